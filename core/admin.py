@@ -1,67 +1,383 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.http import StreamingHttpResponse
+from django.db import connections
+from django.utils.functional import cached_property
+from django.shortcuts import render
+from django.urls import path
+from .fees import run_fees
+from .forms import AssessmentForm, AssessmentInlineFormSet, GradeBandForm, MarkImportForm
+from .grading import active_scale, enrollments_for, recompute_final_marks
+from .importers import MarkImportError, import_marks, parse_mark_file
+from .replicas import replica_reads
+from .results import course_statistics
+from .transcripts import stream_transcripts
 from .models import (
     Student, Course, Lecturer, Enrollment, Attendance,
-    Assessment, StudentMark, Payment
+    Assessment, StudentMark, Payment, GradeBand, FeeRun
 )
 
+# --- විශාල වගු (millions of rows) සඳහා ---
+
+EXACT_COUNT_LIMIT = 10_000
+
+
+def estimated_row_count(queryset):
+    """ PostgreSQL statistics (pg_class.reltuples) වලින් වගුවේ ආසන්න පේළි ගණන; නොමැති නම් None """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # reltuples = -1: ANALYZE කිසි දිනෙක ධාවනය වී නැත
+    return row[0] if row and row[0] >= 0 else None
+
+
+class ApproximatePage(Page):
+    """ ගණන නිවැරදි නොවන විට ඊළඟ පිටුවක් ඇත්දැයි num_pages නොව exists() query එකකින් """
+
+    @cached_property
+    def _has_next(self):
+        top = self.number * self.paginator.per_page
+        return self.paginator.object_list[top:top + 1].exists()
+
+    def has_next(self):
+        return self._has_next
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Changelist පිටුවක සම්පූර්ණ COUNT(*) වළක්වයි. Filter නැති විට PostgreSQL
+    ඇස්තමේන්තුව (estimate) භාවිතා කරයි; නැත්නම් EXACT_COUNT_LIMIT දක්වා පමණක්
+    ගණන් කරයි (LIMIT සහිත subquery) - ඊට වැඩි නම් ගණන එම සීමාවේ නවතී.
+
+    එවිට (approximate) ගණන "10,000+" / "about N" ලෙස පෙන්වා, num_pages ට වඩා
+    ඉදිරි පිටු වලටද යා හැක - පිටුවක් ඇත්දැයි exists() මගින් පරීක්ෂා කරයි.
+    """
+    approximate = False
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset)
+            if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+                self.approximate = self.estimated = True # reltuples - අඩු හෝ වැඩි විය හැක
+                return estimate
+        count = queryset[:EXACT_COUNT_LIMIT + 1].count()
+        self.approximate = count > EXACT_COUNT_LIMIT
+        return count
+
+    def count_label(self):
+        if not self.approximate:
+            return f"{self.count:,}"
+        return f"about {self.count:,}" if self.estimated else f"{EXACT_COUNT_LIMIT:,}+"
+
+    def validate_number(self, number):
+        self.count # approximate නියම කිරීමට
+        if not self.approximate:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().validate_number(number) # PageNotAnInteger
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.approximate:
+            self.current_page = super().page(number)
+            return self.current_page
+        bottom = (number - 1) * self.per_page
+        # පිටු අංකය ගණනින් නොව දත්ත වලින් සීමා කිරීම (හිස් පිටුව = EmptyPage -> admin ?e=1)
+        if number > 1 and not self.object_list[bottom:bottom + 1].exists():
+            raise EmptyPage(self.error_messages['no_results'])
+        self.current_page = ApproximatePage(self.object_list[bottom:bottom + self.per_page], number, self)
+        return self.current_page
+
+
+class LargeTableChangeList(ChangeList):
+    """ Approximate ගණනකදී පිටු අංක ලැයිස්තුව වෙනුවට Previous / Next links (admin/core/pagination.html) """
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.approximate_count = None
+        if getattr(self.paginator, 'approximate', False) and self.multi_page:
+            page = getattr(self.paginator, 'current_page', None)
+            self.approximate_count = self.paginator.count_label()
+            self.previous_page_url = (
+                self.get_query_string({PAGE_VAR: self.page_num - 1}) if self.page_num > 1 else None
+            )
+            self.next_page_url = (
+                self.get_query_string({PAGE_VAR: self.page_num + 1}) if page is not None and page.has_next() else None
+            )
+
+
+class FinalGradeFilter(admin.SimpleListFilter):
+    """
+    final_grade විකල්ප grading scale එකෙන් (cache කර ඇත) + 'Pending' - Enrollment
+    වගුවේ SELECT DISTINCT final_grade (index නැති full scan) නොමැතිව.
+    """
+    title = 'final grade'
+    parameter_name = 'final_grade'
+
+    def lookups(self, request, model_admin):
+        grades = dict.fromkeys(grade for grade, gp in reversed(active_scale().results)) # ඉහළම ශ්‍රේණිය මුලින්
+        return [(grade, grade) for grade in [*grades, 'Pending']]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(final_grade=self.value())
+        return queryset
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """ විශාල වගු: estimated / bounded counts, සම්පූර්ණ වගුවේ දෙවන COUNT(*) නැත """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return LargeTableChangeList
+
+    def changelist_view(self, request, extra_context=None):
+        # ලැයිස්තු පිටුව (GET) read replica එකකින්; actions (POST) primary වෙත
+        return replica_reads(super().changelist_view)(request, extra_context)
+
+
 # --- Admin Panel එක පහසු කිරීමට Inlines ---
 
 class AssessmentInline(admin.TabularInline):
     """ Course Admin පිටුවේම CA කොටස් (Assessments) ඇතුළත් කිරීමට """
     model = Assessment
+    formset = AssessmentInlineFormSet # weights එකතුව <= 100%
     extra = 1 # අලුතින් එකතු කිරීමට පෙන්වන හිස් තැන් ගණන
 
 class StudentMarkInline(admin.TabularInline):
     """ Student Admin පිටුවේම ලකුණු (Marks) ඇතුළත් කිරීමට """
     model = StudentMark
     extra = 0
+    autocomplete_fields = ('assessment',)
 
 # --- Model Admin සැකසුම් ---
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
-    list_display = ('code', 'name', 'lecturer', 'credits', 'semester')
+    list_display = ('code', 'name', 'lecturer', 'credits', 'semester', 'total_weight', 'assessment_count')
+    list_select_related = ('lecturer',)
     search_fields = ('code', 'name')
     list_filter = ('semester', 'credits')
+    autocomplete_fields = ('lecturer',)
     inlines = [AssessmentInline] # Course එක සාදන විටම CA කොටස් ද සෑදීමට
+    actions = ['recompute_grades']
+
+    change_form_template = 'admin/core/course/change_form.html'
+
+    def get_urls(self):
+        urls = [
+            path(
+                '<path:object_id>/statistics/',
+                self.admin_site.admin_view(self.statistics_view),
+                name='core_course_statistics',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def statistics_view(self, request, object_id):
+        """ ලකුණු distribution, ශ්‍රේණි histogram සහ class ranking (cache කර ඇත) """
+        course = self.get_object(request, object_id)
+        if course is None:
+            return self._get_obj_does_not_exist_redirect(request, self.model._meta, object_id)
+        if not self.has_view_permission(request, course):
+            raise PermissionDenied
+        statistics = course_statistics(course)
+        largest_bin = max([row['count'] for row in statistics['distribution']] + [1])
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'original': course,
+            'title': f'Result statistics: {course.code}',
+            'statistics': statistics,
+            'distribution': [
+                {**row, 'width': round(100 * row['count'] / largest_bin)} for row in statistics['distribution']
+            ],
+        }
+        return render(request, 'admin/core/course/statistics.html', context)
+
+    @admin.action(description='Recompute grades for all enrollments in selected courses')
+    def recompute_grades(self, request, queryset):
+        """ පාඨමාලාවෙන් පාඨමාලාවට set-based ලෙස (save() නැත) - එක් එක් පාඨමාලාවට පණිවිඩයක් """
+        courses = list(queryset.order_by('code'))
+        total_processed = total_changed = 0
+        for number, course in enumerate(courses, start=1):
+            processed, changed = recompute_final_marks(enrollments_for(course=course))
+            total_processed += processed
+            total_changed += changed
+            messages.info(request, f"[{number}/{len(courses)}] {course.code}: {processed} enrollments, {changed} changed.")
+        messages.success(
+            request, f"Recomputed {total_processed} enrollments in {len(courses)} courses ({total_changed} grades changed)."
+        )
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ('student_id', 'name', 'email', 'user')
+    list_select_related = ('user',)
     search_fields = ('student_id', 'name')
+    raw_id_fields = ('user',)
     inlines = [StudentMarkInline] # Student පිටුවේම ලකුණු බැලීමට/ඇතුළත් කිරීමට
+    actions = ['download_transcripts']
+
+    @admin.action(description='Download transcripts for selected students (zip)')
+    def download_transcripts(self, request, queryset):
+        """ Zip එක stream කරයි - විශාල cohorts සඳහා `generate_transcripts` command එක (process pool) """
+        response = StreamingHttpResponse(stream_transcripts(queryset), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="transcripts.zip"'
+        return response
 
 @admin.register(Enrollment)
-class EnrollmentAdmin(admin.ModelAdmin):
+class EnrollmentAdmin(LargeTableAdmin):
     list_display = ('student', 'course', 'final_mark', 'final_grade', 'grade_point')
+    list_select_related = ('student', 'course')
     # ගණනය කළ ක්ෂේත්‍ර Admin Panel එකේ වෙනස් කළ නොහැකි ලෙස පෙන්වීම
     readonly_fields = ('final_mark', 'final_grade', 'grade_point') 
-    list_filter = ('course', 'final_grade')
-    search_fields = ('student__student_id', 'student__name')
+    # සියලුම පාඨමාලා filter links ලෙස නොව - course code එක search එකෙන් (=CS101)
+    list_filter = ('course__semester', FinalGradeFilter)
+    search_fields = ('student__student_id', 'student__name', '=course__code')
+    autocomplete_fields = ('student', 'course')
+    actions = ['recompute_grades']
+
+    @admin.action(description='Recompute grades for selected enrollments')
+    def recompute_grades(self, request, queryset):
+        """ තෝරාගත් Enrollments set-based ලෙස (batch aggregate + bulk_update) නැවත ගණනය කිරීම """
+        processed, changed = recompute_final_marks(queryset)
+        messages.success(request, f"Recomputed {processed} enrollments ({changed} grades changed).")
 
 @admin.register(Assessment)
 class AssessmentAdmin(admin.ModelAdmin):
+    form = AssessmentForm # weights එකතුව <= 100%
     list_display = ('course', 'name', 'weight')
-    list_filter = ('course',)
+    list_select_related = ('course',)
+    list_filter = ('course__semester',)
+    search_fields = ('course__code', 'name')
+    autocomplete_fields = ('course',)
 
 @admin.register(StudentMark)
-class StudentMarkAdmin(admin.ModelAdmin):
+class StudentMarkAdmin(LargeTableAdmin):
     list_display = ('student', 'assessment_name', 'marks')
-    search_fields = ('student__student_id', 'student__name')
-    list_filter = ('assessment__course',)
+    list_select_related = ('student', 'assessment__course') # assessment_name -> Assessment.__str__ -> course
+    search_fields = ('student__student_id', 'student__name', '=assessment__course__code')
+    list_filter = ('assessment__course__semester',)
+    autocomplete_fields = ('student', 'assessment')
+
+    change_list_template = 'admin/core/studentmark/change_list.html'
 
     @admin.display(description='Assessment')
     def assessment_name(self, obj):
         return obj.assessment
 
-# --- අනෙක් Models ලියාපදිංචි කිරීම ---
-admin.site.register(Lecturer)
-admin.site.register(Attendance)
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_marks_view), name='core_studentmark_import'),
+        ]
+        return urls + super().get_urls()
+
+    def import_marks_view(self, request):
+        """ ලකුණු පත්‍රිකාවක් (mark sheet) එකවර import කිරීම """
+        if not self.has_add_permission(request) or not self.has_change_permission(request):
+            raise PermissionDenied
+        report = None
+        form = MarkImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                rows = parse_mark_file(upload, upload.name)
+                report = import_marks(rows, assessment=form.cleaned_data['assessment'])
+            except MarkImportError as exc:
+                messages.error(request, str(exc))
+            else:
+                level = messages.WARNING if report.errors else messages.SUCCESS
+                messages.add_message(request, level, str(report))
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import marks',
+            'form': form,
+            'report': report,
+        }
+        return render(request, 'admin/core/studentmark/import_marks.html', context)
+
+@admin.register(Lecturer)
+class LecturerAdmin(admin.ModelAdmin):
+    list_display = ('name', 'email')
+    search_fields = ('name', 'email')
+
+@admin.register(Attendance)
+class AttendanceAdmin(LargeTableAdmin):
+    list_display = ('__str__', 'status')
+    list_select_related = ('student', 'course') # Attendance.__str__ -> student, course
+    list_filter = ('status', 'course__semester')
+    search_fields = ('student__student_id', '=course__code')
+    autocomplete_fields = ('student', 'course')
 
 # --- පහත කේතය core/admin.py ගොනුවේ අවසානයටම එකතු කරන්න ---
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(LargeTableAdmin):
     list_display = ('student', 'description', 'amount', 'status', 'due_date')
+    list_select_related = ('student',)
     list_filter = ('status', 'due_date')
-    search_fields = ('student__student_id', 'student__name', 'description')
\ No newline at end of file
+    search_fields = ('student__student_id', 'student__name', 'description')
+    autocomplete_fields = ('student', 'fee_run')
+
+@admin.register(GradeBand)
+class GradeBandAdmin(admin.ModelAdmin):
+    list_display = ('grade', 'min_mark', 'grade_point')
+    form = GradeBandForm # 0 band එක වෙනත් අගයකට ගෙන යා නොහැක
+
+    def has_delete_permission(self, request, obj=None):
+        # 0 band එක නැත්නම් GradingScale ශ්‍රේණිගත කිරීම ප්‍රතික්ෂේප කරයි (core/grading.py)
+        if obj is not None and obj.min_mark == 0:
+            return False
+        return super().has_delete_permission(request, obj)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None) # Bulk delete මගින් 0 band එක ඉවත් නොවීමට
+        return actions
+
+@admin.register(FeeRun)
+class FeeRunAdmin(admin.ModelAdmin):
+    """ ගාස්තු නියමයක් සුරකින විට ඉලක්ක ශිෂ්‍යයන් සියල්ලටම Payments එකවර සාදයි """
+    list_display = ('run_id', 'description', 'amount', 'due_date', 'course', 'semester', 'payments_created', 'created_at')
+    list_select_related = ('course',)
+    readonly_fields = ('payments_created', 'created_at')
+    search_fields = ('run_id', 'description')
+    autocomplete_fields = ('course',)
+    actions = ['rerun_fee_runs']
+
+    def get_readonly_fields(self, request, obj=None):
+        # ධාවනය කළ නියමයක් වෙනස් කිරීමෙන් එකම run_id යටතේ වෙනස් Payments සෑදීම වැළැක්වීම
+        if obj is not None:
+            return [field.name for field in self.model._meta.fields]
+        return self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            messages.success(request, str(run_fees(obj)))
+
+    @admin.action(description='Re-run selected fee runs (create missing payments)')
+    def rerun_fee_runs(self, request, queryset):
+        for fee_run in queryset:
+            messages.success(request, str(run_fees(fee_run)))
@@ -0,0 +1,102 @@
+import asyncio
+
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.cache import parse_etags
+from django.views.decorators.http import require_GET
+
+from .attendance import with_summary_percentage
+from .gpa import asummary_gpa
+from .models import AttendanceSummary, Enrollment, Payment
+
+# -----------------
+# Async (ASGI) read-only JSON API - Mobile app සඳහා
+# -----------------
+# ස්වාධීන queries asyncio.gather මගින් සමගාමීව (concurrently) ක්‍රියාත්මක කරයි.
+# ETag = ශිෂ්‍යයාගේ data version (StudentMiddleware); වෙනසක් නැත්නම් දත්ත කියවීමකින් තොරව 304.
+
+
+async def _enrollments(student_pk):
+    enrollments = (
+        Enrollment.objects.filter(student_id=student_pk)
+        .select_related('course')
+        .order_by('course__semester', 'course__code')
+    )
+    return [
+        {
+            'course': e.course.code,
+            'name': e.course.name,
+            'semester': e.course.semester,
+            'credits': e.course.credits,
+            'final_mark': e.final_mark,
+            'final_grade': e.final_grade,
+            'grade_point': e.grade_point,
+        }
+        async for e in enrollments.aiterator()
+    ]
+
+
+async def _gpa(student_pk):
+    sgpa_by_semester, cgpa = await asummary_gpa(student_pk)
+    return {
+        'semesters': [{'semester': s, 'sgpa': sgpa} for s, sgpa in sorted(sgpa_by_semester.items())],
+        'cgpa': cgpa,
+    }
+
+
+async def _attendance(student_pk):
+    rows = with_summary_percentage(
+        AttendanceSummary.objects.filter(student_id=student_pk).order_by('course__code').values('course__code')
+    )
+    return [
+        {
+            'course': row['course__code'],
+            'present': row['present'],
+            'total': row['total'],
+            'percentage': row['percentage'],
+        }
+        async for row in rows.aiterator()
+    ]
+
+
+async def _payments(student_pk):
+    payments = Payment.objects.filter(student_id=student_pk).order_by('status', '-due_date')
+    return [
+        {
+            'description': p.description,
+            'amount': p.amount,
+            'due_date': p.due_date,
+            'status': p.status,
+        }
+        async for p in payments.aiterator()
+    ]
+
+
+@require_GET
+async def student_dashboard_api(request):
+    """ ලොග් වූ ශිෂ්‍යයාගේ enrollments, GPA, පැමිණීම සහ ගෙවීම් (JSON) """
+    # StudentMiddleware - User -> Student සහ data version එක් query එකකින් (DB එකෙන්)
+    link = await request.astudent_link()
+    if link.role == 'anonymous':
+        return JsonResponse({'error': "Authentication required."}, status=401)
+    student_pk = link.student_id
+    if student_pk is None:
+        return JsonResponse({'error': "No student record for this user."}, status=404)
+
+    etag = f'"{student_pk}-{link.version}"'
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    enrollments, gpa, attendance, payments = await asyncio.gather(
+        _enrollments(student_pk), _gpa(student_pk), _attendance(student_pk), _payments(student_pk),
+    )
+    response = JsonResponse({
+        'enrollments': enrollments,
+        'gpa': gpa,
+        'attendance': attendance,
+        'payments': payments,
+    })
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,239 @@
+import datetime
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, NullIf
+
+from .models import Attendance, AttendanceSummary, Enrollment
+from .versioning import bump_student_versions
+
+# -----------------
+# Roster attendance (එක් පාඨමාලාවක, එක් දිනයක සම්පූර්ණ නාමලේඛනය)
+# -----------------
+
+VALID_STATUSES = {code for code, label in Attendance.STATUS_CHOICES}
+
+
+def enrolled_students(course):
+    """ පාඨමාලාවට ලියාපදිංචි ශිෂ්‍යයන් {student_id: student_pk} - එක් query එකකි """
+    return dict(
+        Enrollment.objects.filter(course=course)
+        .values_list('student__student_id', 'student_id')
+    )
+
+
+def record_roster(course, date, statuses):
+    """
+    {student_id: 'P' / 'A'} නාමලේඛනයක් එක් batched upsert එකකින් සටහන් කරයි.
+    (saved, errors) ලබා දෙයි - errors යනු {student_id: message}.
+    """
+    roster = enrolled_students(course)
+    errors = {}
+    records = []
+    for student_id, status in statuses.items():
+        if student_id not in roster:
+            errors[student_id] = "Student is not enrolled in this course."
+        elif not isinstance(status, str) or status not in VALID_STATUSES: # JSON list / dict ද විය හැක
+            errors[student_id] = f"Invalid status '{status}'."
+        else:
+            records.append(Attendance(student_id=roster[student_id], course=course, date=date, status=status))
+
+    with transaction.atomic():
+        Attendance.objects.bulk_create(
+            records,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['student', 'course', 'date'],
+            update_fields=['status'],
+        )
+        apply_attendance((record.student_id, course.pk, date, record.status) for record in records)
+    bump_student_versions(record.student_id for record in records)
+    return len(records), errors
+
+
+def with_attendance_percentage(queryset):
+    return queryset.annotate(
+        present=Count('id', filter=Q(status='P')),
+        total=Count('id'),
+    ).annotate(
+        percentage=Cast(F('present'), FloatField()) * 100.0 / Cast(F('total'), FloatField()),
+    )
+
+
+# -----------------
+# Attendance summary (bitset) - (student, course) එකකට එක් පේළියක්
+# -----------------
+# first_date සිට n වන දිනය = n වන bit එක. ප්‍රතිශත සහ at-risk scans සඳහා
+# Attendance පේළි scan නොකර present_count / absent_count (popcount) භාවිතා කරයි.
+
+SUMMARY_FIELDS = ['first_date', 'recorded_bits', 'present_bits', 'present_count', 'absent_count']
+DEFAULT_AT_RISK_THRESHOLD = 80
+
+
+def _to_int(bits):
+    return int.from_bytes(bytes(bits or b''), 'little')
+
+
+def _to_bytes(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+
+def _store(summary, first_date, recorded, present):
+    if recorded:
+        # Normalise: bit 0 සැමවිටම පළමු සටහන් කළ දිනය (build_summaries හා සමාන) - මුල් දිනය
+        # මකා / වෙනත් දිනයකට ගෙන ගිය විට trailing zero bits ගණනින් දකුණට shift කර first_date ඉදිරියට
+        shift = (recorded & -recorded).bit_length() - 1
+        if shift:
+            recorded, present = recorded >> shift, present >> shift
+            first_date += datetime.timedelta(days=shift)
+    summary.first_date = first_date
+    summary.recorded_bits = _to_bytes(recorded)
+    summary.present_bits = _to_bytes(present)
+    summary.present_count = present.bit_count()
+    summary.absent_count = recorded.bit_count() - summary.present_count
+    return summary
+
+
+def summary_days(summary):
+    """ Summary එකේ {date: 'P' / 'A'} (parity පරීක්ෂා / debugging සඳහා) """
+    recorded, present = _to_int(summary.recorded_bits), _to_int(summary.present_bits)
+    days = {}
+    day = 0
+    while recorded >> day:
+        if recorded >> day & 1:
+            days[summary.first_date + datetime.timedelta(days=day)] = 'P' if present >> day & 1 else 'A'
+        day += 1
+    return days
+
+
+def apply_attendance(changes):
+    """
+    Attendance වෙනස්කම් (student_pk, course_pk, date, status හෝ මකා දැමූ විට None)
+    summaries වලට එකතු කරයි - එක් SELECT එකක් සහ එක් upsert එකකි.
+    """
+    changes = list(changes)
+    if not changes:
+        return 0
+    student_ids = {change[0] for change in changes}
+    course_ids = {change[1] for change in changes}
+
+    with transaction.atomic(savepoint=False): # select_for_update; roster transaction එක තුළ savepoint අවශ්‍ය නැත
+        summaries = {
+            (s.student_id, s.course_id): s
+            for s in AttendanceSummary.objects.select_for_update()
+            .filter(student_id__in=student_ids, course_id__in=course_ids)
+        }
+        touched = {}
+        for student_id, course_id, date, status in changes:
+            date = Attendance._meta.get_field('date').to_python(date) # str -> date
+            key = (student_id, course_id)
+            summary = summaries.get(key) or AttendanceSummary(student_id=student_id, course_id=course_id)
+            summaries[key] = touched[key] = summary
+            recorded, present = _to_int(summary.recorded_bits), _to_int(summary.present_bits)
+            first_date = summary.first_date or date
+            if date < first_date:
+                # පෙර දිනයක් - bits එම දින ගණනින් වමට (shift) කර bit 0 නව දිනය කිරීම
+                shift = (first_date - date).days
+                recorded, present, first_date = recorded << shift, present << shift, date
+            bit = 1 << (date - first_date).days
+            if status is None:
+                recorded &= ~bit
+            else:
+                recorded |= bit
+            present = present | bit if status == 'P' else present & ~bit
+            _store(summary, first_date, recorded, present)
+
+        empty = [s.pk for s in touched.values() if s.pk is not None and not s.present_count + s.absent_count]
+        if empty:
+            AttendanceSummary.objects.filter(pk__in=empty).delete()
+        AttendanceSummary.objects.bulk_create(
+            [s for s in touched.values() if s.present_count + s.absent_count],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['student', 'course'],
+            update_fields=SUMMARY_FIELDS,
+        )
+    return len(touched)
+
+
+def build_summaries(attendance, chunk_size=5000):
+    """ Attendance queryset එකේ පේළි වලින් AttendanceSummary objects (generator, නොසුරකින ලද) """
+    rows = (
+        attendance.order_by('student_id', 'course_id', 'date')
+        .values_list('student_id', 'course_id', 'date', 'status')
+        .iterator(chunk_size=chunk_size)
+    )
+    for (student_id, course_id), records in groupby(rows, key=lambda row: row[:2]):
+        recorded = present = 0
+        first_date = None
+        for _, _, date, status in records:
+            first_date = first_date or date
+            bit = 1 << (date - first_date).days
+            recorded |= bit
+            if status == 'P':
+                present |= bit
+        yield _store(AttendanceSummary(student_id=student_id, course_id=course_id), first_date, recorded, present)
+
+
+def rebuild_summaries(course_ids=None, batch_size=1000):
+    """ Attendance වගුවෙන් summaries මුල සිට නැවත ගොඩනැගීම (සියල්ල හෝ course_ids) """
+    attendance = Attendance.objects.all()
+    summaries = AttendanceSummary.objects.all()
+    if course_ids is not None:
+        course_ids = list(course_ids)
+        attendance = attendance.filter(course_id__in=course_ids)
+        summaries = summaries.filter(course_id__in=course_ids)
+
+    count = 0
+    batch = []
+    with transaction.atomic():
+        summaries.delete()
+        for summary in build_summaries(attendance):
+            batch.append(summary)
+            if len(batch) >= batch_size:
+                count += len(AttendanceSummary.objects.bulk_create(batch))
+                batch = []
+        count += len(AttendanceSummary.objects.bulk_create(batch))
+    return count
+
+
+def with_summary_percentage(queryset):
+    """ Summaries values() queryset එකකට present, total, percentage (Attendance පේළි scan නොකරයි) """
+    return queryset.annotate(
+        present=Sum('present_count'),
+        total=Sum(F('present_count') + F('absent_count')),
+    ).annotate(
+        percentage=Cast(F('present'), FloatField()) * 100.0 / NullIf(Cast(F('total'), FloatField()), 0.0),
+    )
+
+
+def student_attendance_percentages(course):
+    """ පාඨමාලාවේ එක් එක් ශිෂ්‍යයාගේ පැමිණීමේ ප්‍රතිශතය - summaries වලින් """
+    return with_summary_percentage(
+        AttendanceSummary.objects.filter(course=course)
+        .order_by('student__student_id')
+        .values('student__student_id', 'student__name')
+    )
+
+
+def course_attendance_percentages(courses=None):
+    """ පාඨමාලා අනුව සමස්ත පැමිණීමේ ප්‍රතිශතය - summaries වලින් """
+    summaries = AttendanceSummary.objects.all()
+    if courses is not None:
+        summaries = summaries.filter(course__in=courses)
+    return with_summary_percentage(summaries.order_by('course__code').values('course__code'))
+
+
+def at_risk(threshold=DEFAULT_AT_RISK_THRESHOLD, semester=None, min_sessions=1):
+    """
+    පැමිණීම threshold% ට අඩු (student, course) summaries. present * 100 < threshold * total
+    ලෙස සසඳයි (integer division නැත) - Attendance පේළි කියවන්නේ නැත.
+    """
+    summaries = AttendanceSummary.objects.alias(
+        sessions=F('present_count') + F('absent_count'),
+        scaled_present=F('present_count') * 100,
+    ).filter(sessions__gte=min_sessions, scaled_present__lt=F('sessions') * threshold)
+    if semester is not None:
+        summaries = summaries.filter(course__semester=semester)
+    return summaries.select_related('student', 'course').order_by('course__code', 'student__student_id')
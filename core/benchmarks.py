@@ -0,0 +1,191 @@
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import synthetic
+from .gpa import summary_gpa
+from .models import Enrollment, Student
+
+# -----------------
+# Benchmark suite (synthetic දත්ත මත views සහ model methods)
+# -----------------
+# එක් එක් දත්ත ප්‍රමාණය සඳහා synthetic දත්ත transaction එකක් තුළ සාදා, මැනීමෙන්
+# පසු rollback කරයි. ප්‍රතිඵල JSON ලෙස - commits අතර regressions සැසඳීමට.
+# Caches (sessions, page cache ඇතුළුව) suite එකට පමණක් වූ LocMem caches වලින් -
+# cold cases සඳහා ඒවා clear කිරීම සැබෑ (production / shared) caches ස්පර්ශ නොකරයි.
+
+DEFAULT_SIZES = (100, 1_000, 5_000)
+HOST = '127.0.0.1' # settings.ALLOWED_HOSTS
+BENCHMARK_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'},
+    'pages': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-pages'},
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _percentile(ordered, fraction):
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(func, repeat, setup=None):
+    """
+    func() repeat වරක් ධාවනය කර query ගණන, latency percentiles (ms) සහ
+    peak memory (tracemalloc, KiB) ලබා දෙයි. setup() කාලය මනින්නේ නැත.
+    """
+    samples = []
+    queries = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+
+    # tracemalloc ධාවනය මන්දගාමී කරයි - memory වෙනම එක් ධාවනයකින්
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        'repeat': repeat,
+        'queries': max(queries),
+        'ms': {
+            'p50': round(_percentile(samples, .5), 3),
+            'p95': round(_percentile(samples, .95), 3),
+            'p99': round(_percentile(samples, .99), 3),
+            'mean': round(statistics.fmean(samples), 3),
+        },
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def _cases(seed_prefix):
+    """ (name, func, setup) - synthetic දත්ත සාදා ඇති විට ක්‍රියාත්මක කරයි """
+    student = Student.objects.filter(student_id__startswith=seed_prefix).order_by('pk').first()
+    enrollment = Enrollment.objects.filter(student=student).select_related('course').first()
+    student.user = User.objects.create_user(f'{seed_prefix.lower()}-bench-student')
+    student.save()
+    admin = User.objects.create_superuser(f'{seed_prefix.lower()}-bench-admin', email='', password=None)
+
+    student_client = Client(HTTP_HOST=HOST)
+    student_client.force_login(student.user)
+    admin_client = Client(HTTP_HOST=HOST)
+    admin_client.force_login(admin)
+
+    def clear_page_cache():
+        caches['pages'].clear()
+
+    def get(client, url, **params):
+        def request():
+            response = client.get(url, params)
+            assert response.status_code == 200, f"{url}: {response.status_code}"
+        return request
+
+    return [
+        ('Enrollment.calculate_final_mark', enrollment.calculate_final_mark, None),
+        ('Student.calculate_sgpa', lambda: student.calculate_sgpa(enrollment.course.semester), None),
+        ('Student.calculate_cgpa', student.calculate_cgpa, None),
+        ('summary_gpa', lambda: summary_gpa(Student.objects.get(pk=student.pk)), None),
+        ('view:student_dashboard (cold)', get(student_client, reverse('student-dashboard')), clear_page_cache),
+        ('view:student_dashboard (cached)', get(student_client, reverse('student-dashboard')), None),
+        ('view:api_student_dashboard', get(student_client, reverse('api-student-dashboard')), None),
+        ('view:course_list', get(student_client, reverse('course-list')), cache.clear),
+        ('view:student_report', get(student_client, reverse('student-report-search'),
+                                    student_id_query=student.student_id), None),
+        ('view:lecturer_report', get(student_client, reverse('lecturer-report-search')), None),
+        ('admin:enrollment_changelist', get(admin_client, reverse('admin:core_enrollment_changelist')), None),
+        ('admin:studentmark_changelist', get(admin_client, reverse('admin:core_studentmark_changelist')), None),
+        ('admin:payment_changelist', get(admin_client, reverse('admin:core_payment_changelist')), None),
+        ('admin:attendance_changelist', get(admin_client, reverse('admin:core_attendance_changelist')), None),
+    ]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes=DEFAULT_SIZES, repeat=20, courses=None, seed=42, prefix='BENCH', only=None, log=None):
+    """
+    එක් එක් ශිෂ්‍ය ගණන (size) සඳහා synthetic දත්ත සාදා සියලු cases මනියි.
+    සියල්ල rollback කරයි - දත්ත සමුදාය (database) වෙනස් නොවේ.
+    """
+    results = {
+        'revision': _git_revision(),
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'database': connection.vendor,
+        'seed': seed,
+        'sizes': {},
+    }
+    with override_settings(CACHES=BENCHMARK_CACHES):
+        for size in sizes:
+            size_result = {}
+            try:
+                with transaction.atomic():
+                    started = time.perf_counter()
+                    counts = synthetic.generate(
+                        students=size, courses=courses or max(10, size // 20), seed=seed, prefix=prefix,
+                    )
+                    size_result['dataset'] = {**counts, 'generate_s': round(time.perf_counter() - started, 3)}
+                    size_result['cases'] = {}
+                    for name, func, setup in _cases(prefix):
+                        if only and not any(part in name for part in only):
+                            continue
+                        func() # warm-up (imports, template loading)
+                        size_result['cases'][name] = measure(func, repeat, setup)
+                        if log is not None:
+                            log(size, name, size_result['cases'][name])
+                    raise _Rollback
+            except _Rollback:
+                pass
+            # Rollback කළ දත්ත වලින් render කළ පිටු / sessions (suite එකේ caches පමණි)
+            cache.clear()
+            caches['pages'].clear()
+            results['sizes'][str(size)] = size_result
+    return results
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    පෙර JSON ප්‍රතිඵල සමඟ සසඳයි - p50 latency threshold ට වඩා වැඩි වූ හෝ
+    query ගණන වැඩි වූ cases [(size, name, field, before, after)] ලෙස.
+    """
+    regressions = []
+    for size, size_result in current['sizes'].items():
+        before_cases = baseline.get('sizes', {}).get(size, {}).get('cases', {})
+        for name, after in size_result.get('cases', {}).items():
+            before = before_cases.get(name)
+            if before is None:
+                continue
+            if after['queries'] > before['queries']:
+                regressions.append((size, name, 'queries', before['queries'], after['queries']))
+            if after['ms']['p50'] > before['ms']['p50'] * (1 + threshold):
+                regressions.append((size, name, 'p50_ms', before['ms']['p50'], after['ms']['p50']))
+    return regressions
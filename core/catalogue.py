@@ -0,0 +1,64 @@
+import hashlib
+
+from .models import Course
+from .versioning import bump_cache_versions, cache_version
+
+# -----------------
+# Public course catalogue (keyset pagination + cache)
+# -----------------
+# OFFSET වෙනුවට course code අනුව (keyset) පිටු වෙන් කරයි - පිටුව කොතරම් ගැඹුරු වුවද
+# index range scan එකක් පමණි. Render කළ fragment එක cache කර, Course හෝ Lecturer
+# save වූ විට version එක (DB එකේ - CacheVersion) වෙනස් කිරීමෙන් සියලුම workers හි
+# අවලංගු (invalidate) කරයි.
+
+PAGE_SIZE = 50
+CACHE_TIMEOUT = 300 # තත්පර - පැරණි versions වල fragments memory එකේ රැඳෙන උපරිම කාලය
+VERSION_KEY = 'course-catalogue-version'
+
+
+def catalogue_version():
+    return cache_version(VERSION_KEY)
+
+
+def bump_catalogue_version():
+    """ Course / Lecturer වෙනස් වූ විට signals මගින් කැඳවයි """
+    bump_cache_versions([VERSION_KEY])
+
+
+def catalogue_page(semester=None, credits=None, lecturer_id=None, after=None, before=None, page_size=PAGE_SIZE):
+    """
+    පෙරහන් (filters) අනුව එක් පිටුවක පාඨමාලා.
+    (courses, previous_cursor, next_cursor) ලබා දෙයි - cursor යනු course code එකකි.
+    """
+    courses = Course.objects.select_related('lecturer')
+    if semester is not None:
+        courses = courses.filter(semester=semester)
+    if credits is not None:
+        courses = courses.filter(credits=credits)
+    if lecturer_id is not None:
+        courses = courses.filter(lecturer_id=lecturer_id)
+
+    if before is not None:
+        # පෙර පිටුව: code < before, පසුපසට කියවා නැවත හරවයි
+        rows = list(courses.filter(code__lt=before).order_by('-code')[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        previous_cursor = rows[0].code if has_more and rows else None
+        next_cursor = rows[-1].code if rows else None
+        return rows, previous_cursor, next_cursor
+
+    if after is not None:
+        courses = courses.filter(code__gt=after)
+    rows = list(courses.order_by('code')[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    previous_cursor = rows[0].code if after is not None and rows else None
+    next_cursor = rows[-1].code if has_more else None
+    return rows, previous_cursor, next_cursor
+
+
+def fragment_cache_key(**params):
+    """ පෙරහන් සහ cursor අනුව render කළ fragment එකේ cache key එක """
+    parts = '|'.join(f"{name}={params[name]}" for name in sorted(params))
+    digest = hashlib.md5(parts.encode()).hexdigest()
+    return f"course-catalogue:{catalogue_version()}:{digest}"
@@ -0,0 +1,103 @@
+import time
+
+from django.db import transaction
+
+from .ledger import refresh_balances
+from .models import Enrollment, FeeRun, Payment, Student
+from .versioning import bump_student_versions
+
+# -----------------
+# Bulk fee generation (Fee runs)
+# -----------------
+# PaymentAdmin හරහා ශිෂ්‍යයෙන් ශිෂ්‍යයාට ගාස්තු ඇතුළත් කිරීම වෙනුවට, FeeRun නියමයක
+# ඉලක්ක ශිෂ්‍යයන් එක් query එකකින් සොයා Payments batch වශයෙන් bulk_create කරයි.
+
+DEFAULT_BATCH_SIZE = 1000
+
+# නැවත ධාවනයකදී (rerun) මෙම fields එකම විය යුතුය
+RULE_FIELDS = ('description', 'amount', 'due_date', 'course', 'semester')
+
+
+class FeeRunError(Exception):
+    """ එකම run_id එක වෙනත් නියමයක් (rule) සමඟ නැවත භාවිතා කළ විට """
+
+
+class FeeRunReport:
+    """ Fee run එකක ප්‍රතිඵල සහ වේගය (throughput) """
+
+    def __init__(self, fee_run, targeted, created, seconds):
+        self.fee_run = fee_run
+        self.targeted = targeted
+        self.created = created
+        self.seconds = seconds
+
+    @property
+    def skipped(self):
+        return self.targeted - self.created # පෙර ධාවනයකින් දැනටමත් ඇති Payments
+
+    @property
+    def rate(self):
+        return self.targeted / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.fee_run.run_id}: {self.created} payments created, {self.skipped} already present "
+            f"({self.targeted} students in {self.seconds:.2f}s, {self.rate:,.0f} students/s)"
+        )
+
+
+def target_students(course=None, semester=None):
+    """ නියමයට අදාළ ශිෂ්‍ය pks - එක් query එකකි """
+    if course is None and semester is None:
+        return list(Student.objects.order_by('pk').values_list('pk', flat=True))
+    enrollments = Enrollment.objects.all()
+    if course is not None:
+        enrollments = enrollments.filter(course=course)
+    if semester is not None:
+        enrollments = enrollments.filter(course__semester=semester)
+    return list(enrollments.order_by('student_id').values_list('student_id', flat=True).distinct())
+
+
+def get_fee_run(run_id, **rule):
+    """
+    run_id එකට අදාළ FeeRun එක ලබා දෙයි (නැත්නම් සාදයි). දැනටමත් ඇති run එකක
+    නියමය වෙනස් නම් FeeRunError - එකම run_id එකකින් ගාස්තු දෙකක් නොසෑදේ.
+    """
+    fee_run, created = FeeRun.objects.get_or_create(run_id=run_id, defaults=rule)
+    if not created:
+        changed = [field for field in RULE_FIELDS if field in rule and getattr(fee_run, field) != rule[field]]
+        if changed:
+            raise FeeRunError(f"Fee run '{run_id}' already exists with a different {', '.join(changed)}.")
+    return fee_run
+
+
+def run_fees(fee_run, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    FeeRun එකේ ඉලක්ක ශිෂ්‍යයන්ට Payments සාදයි. (fee_run, student) unique constraint
+    සහ ignore_conflicts නිසා නැවත ධාවනය කිරීම ආරක්ෂිතයි - නැති Payments පමණක් එකතු වේ.
+    """
+    started = time.perf_counter()
+    student_ids = target_students(course=fee_run.course_id, semester=fee_run.semester)
+
+    with transaction.atomic():
+        before = Payment.objects.filter(fee_run=fee_run).count()
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+            Payment.objects.bulk_create(
+                [
+                    Payment(
+                        student_id=student_id, fee_run=fee_run, description=fee_run.description,
+                        amount=fee_run.amount, due_date=fee_run.due_date,
+                    )
+                    for student_id in batch
+                ],
+                ignore_conflicts=True,
+            )
+            # bulk_create signals නොයවයි - ශේෂය සහ dashboard version මෙහිදීම
+            refresh_balances(batch)
+            bump_student_versions(batch)
+        total = Payment.objects.filter(fee_run=fee_run).count()
+        FeeRun.objects.filter(pk=fee_run.pk).update(payments_created=total)
+    fee_run.payments_created = total
+
+    return FeeRunReport(fee_run, len(student_ids), total - before, time.perf_counter() - started)
@@ -0,0 +1,68 @@
+from django import forms
+from django.db.models import Sum
+
+from .models import Assessment, GradeBand
+
+MAX_TOTAL_WEIGHT = 100
+
+
+class MarkImportForm(forms.Form):
+    """ Admin හරහා ලකුණු පත්‍රිකාවක් (CSV / XLSX) upload කිරීමට """
+    file = forms.FileField(help_text="CSV or XLSX with columns: student_id, marks (and course, assessment).")
+    assessment = forms.ModelChoiceField(
+        queryset=Assessment.objects.select_related('course').order_by('course__code', 'name'),
+        required=False,
+        help_text="If selected, every row is imported for this assessment.",
+    )
+
+
+class AssessmentForm(forms.ModelForm):
+    """ එම පාඨමාලාවේ අනෙක් Assessments සමඟ weights එකතුව 100% නොඉක්මවිය යුතුය """
+
+    class Meta:
+        model = Assessment
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        course, weight = cleaned_data.get('course'), cleaned_data.get('weight')
+        if course is not None and weight is not None:
+            others = (
+                Assessment.objects.filter(course=course).exclude(pk=self.instance.pk)
+                .aggregate(total=Sum('weight'))['total'] or 0
+            )
+            if others + weight > MAX_TOTAL_WEIGHT:
+                self.add_error('weight', (
+                    f"{course.code} already has {others}% in other assessments; "
+                    f"at most {MAX_TOTAL_WEIGHT - others}% can be added."
+                ))
+        return cleaned_data
+
+
+class GradeBandForm(forms.ModelForm):
+    """ 0 සිට ආරම්භ වන band එක (අසමත් ශ්‍රේණිය) වෙනත් band එකක් නොමැතිව ඉවත් කළ නොහැක """
+
+    class Meta:
+        model = GradeBand
+        fields = '__all__'
+
+    def clean_min_mark(self):
+        min_mark = self.cleaned_data['min_mark']
+        moving_zero = self.instance.pk is not None and self.instance.min_mark == 0 and min_mark != 0
+        if moving_zero:
+            raise forms.ValidationError("The lowest grade band must start at 0; add another band at 0 first.")
+        return min_mark
+
+
+class AssessmentInlineFormSet(forms.BaseInlineFormSet):
+    """ Course Admin පිටුවේ Assessments - ඉවත් නොකළ පේළි වල weights එකතුව 100% නොඉක්මවිය යුතුය """
+
+    def clean(self):
+        super().clean()
+        total = sum(
+            form.cleaned_data.get('weight') or 0
+            for form in self.forms
+            if form.cleaned_data and not form.cleaned_data.get('DELETE')
+        )
+        if total > MAX_TOTAL_WEIGHT:
+            raise forms.ValidationError(f"Assessment weights add up to {total}%; they must not exceed {MAX_TOTAL_WEIGHT}%.")
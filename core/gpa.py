@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+from .models import Enrollment, StudentGPASummary
+
+# -----------------
+# GPA Summary (materialized) නඩත්තුව
+# -----------------
+# Student.calculate_sgpa() / calculate_cgpa() සෑම Enrollment එකක්ම Python හි loop කරයි.
+# මෙහිදී (student, semester) අනුව Credit Points සහ Credits GROUP BY query එකකින්
+# ගණනය කර StudentGPASummary වගුවේ ගබඩා කරයි.
+
+CREDIT_POINTS = ExpressionWrapper(
+    F('grade_point') * F('course__credits'),
+    output_field=DecimalField(max_digits=10, decimal_places=2),
+)
+
+
+def semester_totals(enrollments):
+    """
+    Enrollments queryset එක (student, semester) අනුව GROUP BY කර
+    {(student_id, semester): (credit_points, credits)} ලබා දෙයි.
+    """
+    rows = (
+        enrollments
+        .filter(grade_point__isnull=False)
+        .order_by()
+        .values('student_id', 'course__semester')
+        .annotate(credit_points=Sum(CREDIT_POINTS), credits=Sum('course__credits'))
+    )
+    return {
+        (row['student_id'], row['course__semester']): (row['credit_points'], row['credits'])
+        for row in rows
+    }
+
+
+def refresh_gpa_summaries(student_ids=None):
+    """
+    ලබා දෙන ශිෂ්‍යයන්ගේ (හෝ student_ids=None නම් සියලුම) GPA summary පේළි
+    නැවත ගණනය කරයි. Enrollment / Course වෙනස් වූ විට signals මගින් කැඳවයි.
+    """
+    enrollments = Enrollment.objects.all()
+    summaries = StudentGPASummary.objects.all()
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        if not student_ids:
+            return 0
+        enrollments = enrollments.filter(student_id__in=student_ids)
+        summaries = summaries.filter(student_id__in=student_ids)
+
+    totals = semester_totals(enrollments)
+    rows = [
+        StudentGPASummary(student_id=student_id, semester=semester, credit_points=points, credits=credits)
+        for (student_id, semester), (points, credits) in totals.items()
+    ]
+
+    with transaction.atomic():
+        # තවදුරටත් GP නැති වාර (semesters) ඉවත් කිරීම
+        stale = summaries.order_by().values_list('pk', 'student_id', 'semester')
+        stale_pks = [pk for pk, student_id, semester in stale if (student_id, semester) not in totals]
+        if stale_pks:
+            StudentGPASummary.objects.filter(pk__in=stale_pks).delete()
+        StudentGPASummary.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['student', 'semester'],
+            update_fields=['credit_points', 'credits'],
+        )
+    return len(rows)
+
+
+def gpa_from_summaries(summaries):
+    """ StudentGPASummary පේළි වලින් ({semester: sgpa}, cgpa) """
+    sgpa_by_semester = {}
+    total_credit_points = Decimal('0.0')
+    total_credits = 0
+    for summary in summaries:
+        sgpa_by_semester[summary.semester] = summary.sgpa
+        total_credit_points += summary.credit_points
+        total_credits += summary.credits
+
+    if total_credits == 0:
+        return sgpa_by_semester, Decimal('0.00')
+    cgpa = (total_credit_points / Decimal(total_credits)).quantize(Decimal('0.01'))
+    return sgpa_by_semester, cgpa
+
+
+def summary_gpa(student):
+    """
+    GPA summary වගුවෙන් ({semester: sgpa}, cgpa) ලබා දෙයි - උපරිම එක් query එකකි.
+    """
+    return gpa_from_summaries(student.gpa_summaries.all()) # prefetch කර ඇත්නම් query එකක් නැත
+
+
+async def asummary_gpa(student_pk):
+    """ summary_gpa() හි async අනුවාදය (async ORM) """
+    summaries = [s async for s in StudentGPASummary.objects.filter(student_id=student_pk)]
+    return gpa_from_summaries(summaries)
@@ -0,0 +1,274 @@
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .gpa import refresh_gpa_summaries
+from .models import Assessment, Course, Enrollment, GradeBand, StudentMark
+from .results import forget_course_statistics
+from .versioning import bump_student_versions
+
+try:
+    import numpy as np
+except ImportError:  # NumPy නොමැති නම් classify_many() bisect මගින් ක්‍රියා කරයි
+    np = None
+
+# -----------------
+# Grading scale (ශ්‍රේණි පරිමාණය)
+# -----------------
+# GradeBand වගුව හිස් නම් භාවිතා වන පෙරනිමි පරිමාණය (min_mark, grade, GP)
+DEFAULT_GRADE_BANDS = (
+    (Decimal('85'), 'A+', Decimal('4.00')),
+    (Decimal('80'), 'A',  Decimal('4.00')),
+    (Decimal('75'), 'A-', Decimal('3.70')),
+    (Decimal('70'), 'B+', Decimal('3.30')),
+    (Decimal('65'), 'B',  Decimal('3.00')),
+    (Decimal('60'), 'B-', Decimal('2.70')),
+    (Decimal('55'), 'C+', Decimal('2.30')),
+    (Decimal('50'), 'C',  Decimal('2.00')),
+    (Decimal('45'), 'C-', Decimal('1.70')),
+    (Decimal('40'), 'D+', Decimal('1.30')),
+    (Decimal('35'), 'D',  Decimal('1.00')),
+    (Decimal('0'),  'E',  Decimal('0.00')), # Fail
+)
+
+
+class GradingScale:
+    """
+    Grade bands, ආරෝහණ (ascending) boundary array එකක් ලෙස සකසා ඇත.
+    එක් ලකුණක් bisect මගින්ද, ලකුණු batch එකක් NumPy searchsorted මගින්ද සොයයි.
+    (grade, GP) tuples එක් වරක් පමණක් සාදා නැවත භාවිතා කරයි.
+    """
+
+    def __init__(self, bands):
+        bands = sorted(bands, key=lambda band: band[0])
+        if not bands:
+            raise ValueError("A grading scale needs at least one band.")
+        if bands[0][0] > 0:
+            # නැත්නම් පහළම boundary එකට අඩු (අසමත්) ලකුණු වලට එම band එකේ (සමත්) ශ්‍රේණිය ලැබේ
+            raise ValueError(f"The lowest grade band must start at 0, not {bands[0][0]}.")
+        self.boundaries = [min_mark for min_mark, grade, gp in bands]
+        self.results = [(grade, gp) for min_mark, grade, gp in bands]
+        self._float_boundaries = None
+
+    @classmethod
+    def load(cls):
+        """ GradeBand වගුවෙන් (හිස් නම් DEFAULT_GRADE_BANDS) පරිමාණය සාදයි """
+        return cls(_configured_bands() or DEFAULT_GRADE_BANDS)
+
+    def classify(self, mark):
+        """ එක් ලකුණක් සඳහා (grade, GP) - පහළම band එක 0 සිට (ඍණ ලකුණු එයට) """
+        index = bisect_right(self.boundaries, mark) - 1
+        return self.results[max(index, 0)]
+
+    def classify_many(self, marks):
+        """ ලකුණු ලැයිස්තුවක් එකවර (grade, GP) ලැයිස්තුවක් බවට පරිවර්තනය කරයි """
+        if np is None:
+            return [self.classify(mark) for mark in marks]
+        if self._float_boundaries is None:
+            self._float_boundaries = np.array([float(b) for b in self.boundaries], dtype=np.float64)
+        values = np.fromiter((float(mark) for mark in marks), dtype=np.float64)
+        indexes = np.searchsorted(self._float_boundaries, values, side='right') - 1
+        np.maximum(indexes, 0, out=indexes)
+        results = self.results
+        return [results[i] for i in indexes.tolist()]
+
+
+def _configured_bands():
+    return tuple(GradeBand.objects.order_by('min_mark').values_list('min_mark', 'grade', 'grade_point'))
+
+
+# Process එකකට cache කළ පරිමාණය - එක් ලකුණක් (get_grade_from_mark) DB query එකකින්
+# තොරව. මෙම process එකේ GradeBand වෙනස්කම් signals මගින් වහාම ඉවත් කරයි; වෙනත්
+# process එකක වෙනස්කම් SCALE_RECHECK_SECONDS ඇතුළත bands නැවත කියවා හඳුනා ගනී
+# (boundary arrays නැවත සාදන්නේ bands වෙනස් වූ විට පමණි). Bulk recompute සැමවිටම
+# GradingScale.load() මගින් නැවුම් bands භාවිතා කරයි.
+SCALE_RECHECK_SECONDS = 30
+_active_scale = (None, None, None) # (bands, GradingScale, checked_at)
+
+
+def active_scale():
+    """ DB එකේ bands වලට අනුරූප පරිමාණය (cache කර ඇත) """
+    global _active_scale
+    bands, scale, checked_at = _active_scale
+    now = time.monotonic()
+    if scale is not None and now - checked_at < SCALE_RECHECK_SECONDS:
+        return scale
+    current = _configured_bands()
+    if scale is None or bands != current:
+        scale = GradingScale(current or DEFAULT_GRADE_BANDS)
+    _active_scale = (current, scale, now)
+    return scale
+
+
+def clear_scale_cache():
+    """ GradeBand වෙනස් වූ විට signals මගින් කැඳවයි (ඊළඟ ඇමතුමේදී bands නැවත කියවයි) """
+    global _active_scale
+    _active_scale = (None, None, None)
+
+# -----------------
+# Bulk grade computation engine
+# -----------------
+# Enrollment.calculate_final_mark() එකම ගණනය කිරීම, නමුත් එක් Enrollment එකකට
+# queries කිහිපයක් වෙනුවට, batch එකකට queries දෙකකින් (marks + bulk_update).
+
+DEFAULT_BATCH_SIZE = 500
+
+GRADE_FIELDS = ('final_mark', 'final_grade', 'grade_point')
+
+
+def enrollments_for(course=None, semester=None):
+    """ Course එකක්, වාරයක් (semester) හෝ සියල්ල සඳහා Enrollment queryset එක """
+    enrollments = Enrollment.objects.all()
+    if course is not None:
+        enrollments = enrollments.filter(course=course)
+    if semester is not None:
+        enrollments = enrollments.filter(course__semester=semester)
+    return enrollments
+
+
+def refresh_course_weights(course_ids=None):
+    """
+    පාඨමාලා වල total_weight සහ assessment_count එක් GROUP BY query එකකින්
+    නැවත ගණනය කරයි. Assessment වෙනස් වූ විට signals මගින් කැඳවයි.
+    """
+    courses = Course.objects.all()
+    assessments = Assessment.objects.all()
+    if course_ids is not None:
+        course_ids = [pk for pk in set(course_ids) if pk is not None]
+        if not course_ids:
+            return 0
+        courses = courses.filter(pk__in=course_ids)
+        assessments = assessments.filter(course_id__in=course_ids)
+
+    totals = {
+        course_id: (total_weight, count)
+        for course_id, total_weight, count in assessments.order_by().values('course_id')
+        .annotate(total_weight=Sum('weight'), count=Count('id'))
+        .values_list('course_id', 'total_weight', 'count')
+    }
+    dirty = []
+    for course in courses.only('id', 'total_weight', 'assessment_count'):
+        total_weight, count = totals.get(course.pk, (0, 0))
+        if (course.total_weight, course.assessment_count) != (total_weight, count):
+            course.total_weight, course.assessment_count = total_weight, count
+            dirty.append(course)
+    Course.objects.bulk_update(dirty, ['total_weight', 'assessment_count'], batch_size=1000)
+    return len(dirty)
+
+
+def _weighted_totals(batch, weights):
+    """
+    Batch එකේ සියලුම (student, course) යුගල සඳහා weighted mark සහ ලකුණු ගණන
+    එක් query එකකින් ලබා ගනී. weights = {assessment_id: (course_id, weight)} -
+    පාඨමාලාවට එක් වරක් පමණක් කියවා, calls අතර නැවත භාවිතා කරයි.
+    """
+    course_ids = {e.course_id for e in batch}
+    missing = course_ids - {course_id for course_id, weight in weights.values()}
+    if missing:
+        weights.update(
+            (pk, (course_id, Decimal(weight) / Decimal('100.0')))
+            for pk, course_id, weight in Assessment.objects.filter(course_id__in=missing)
+            .values_list('pk', 'course_id', 'weight')
+        )
+    assessment_ids = [pk for pk, (course_id, weight) in weights.items() if course_id in course_ids]
+    rows = (
+        StudentMark.objects
+        .filter(student_id__in={e.student_id for e in batch}, assessment_id__in=assessment_ids)
+        .values_list('student_id', 'assessment_id', 'marks')
+    )
+
+    totals = defaultdict(lambda: [Decimal('0.0'), 0])
+    for student_id, assessment_id, marks in rows.iterator():
+        course_id, weight = weights[assessment_id]
+        entry = totals[(student_id, course_id)]
+        entry[0] += marks * weight
+        entry[1] += 1
+    return totals
+
+
+def _final_mark(enrollment, total_weighted_mark, marks_present):
+    """
+    calculate_final_mark() හි තර්කනයම - පාඨමාලාවේ weights 100% නොවේ නම් හෝ
+    සියලුම CA කොටස් සඳහා ලකුණු නැත්නම් None (ලකුණු ගණන සැසඳීමකින් පමණි)
+    """
+    course = enrollment.course
+    if course.total_weight == 100 and marks_present == course.assessment_count:
+        return total_weighted_mark.quantize(Decimal('0.01'))
+    return None
+
+
+def _apply_result(enrollment, final_mark, grade, gp):
+    """ ගණනය කළ අගයන් Enrollment එකට දමයි - වෙනස් වූයේ නම් True ලබා දෙයි """
+    changed = (
+        enrollment.final_mark != final_mark
+        or enrollment.final_grade != grade
+        or enrollment.grade_point != gp
+    )
+    enrollment.final_mark = final_mark
+    enrollment.final_grade = grade
+    enrollment.grade_point = gp
+    return changed
+
+
+def recompute_final_marks(enrollments=None, course=None, semester=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    ලබා දෙන Enrollments (queryset) සඳහා final_mark, final_grade සහ grade_point
+    batch වශයෙන් ගණනය කර bulk_update මගින් සටහන් කරයි.
+
+    enrollments ලබා නොදුන්නේ නම්, course / semester අනුව (හෝ සියල්ල) තෝරා ගනී.
+    (processed, changed) ගණන් ලබා දෙයි.
+    """
+    if enrollments is None:
+        enrollments = enrollments_for(course=course, semester=semester)
+    enrollments = (
+        enrollments
+        .select_related('course')
+        .only('id', 'student_id', 'course_id', 'course__total_weight', 'course__assessment_count', *GRADE_FIELDS)
+        .order_by('pk')
+    )
+
+    scale = GradingScale.load()
+    weights = {}
+    processed = changed = 0
+    batch = []
+
+    def flush():
+        nonlocal processed, changed
+        totals = _weighted_totals(batch, weights)
+        final_marks = [
+            _final_mark(e, *totals.get((e.student_id, e.course_id), (Decimal('0.0'), 0)))
+            for e in batch
+        ]
+        # සම්පූර්ණ ලකුණු ඇති සියල්ල එකවර ශ්‍රේණිගත කිරීම
+        grades = iter(scale.classify_many([mark for mark in final_marks if mark is not None]))
+
+        dirty = []
+        for enrollment, final_mark in zip(batch, final_marks):
+            grade, gp = next(grades) if final_mark is not None else ("Pending", None)
+            if _apply_result(enrollment, final_mark, grade, gp):
+                dirty.append(enrollment)
+        if dirty:
+            Enrollment.objects.bulk_update(dirty, GRADE_FIELDS, batch_size=batch_size)
+            # bulk_update signals යවන්නේ නැති නිසා GPA summary, data version සහ පාඨමාලා
+            # සංඛ්‍යාලේඛන (statistics) cache එක මෙහිදීම යාවත්කාලීන කිරීම
+            student_ids = {e.student_id for e in dirty}
+            refresh_gpa_summaries(student_ids)
+            bump_student_versions(student_ids)
+            forget_course_statistics({e.course_id for e in dirty})
+        processed += len(batch)
+        changed += len(dirty)
+        batch.clear()
+
+    with transaction.atomic():
+        for enrollment in enrollments.iterator(chunk_size=batch_size):
+            batch.append(enrollment)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+    return processed, changed
@@ -0,0 +1,192 @@
+import csv
+import io
+import itertools
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .grading import recompute_final_marks
+from .models import Assessment, Enrollment, Student, StudentMark
+from .versioning import bump_student_versions
+
+# -----------------
+# Bulk mark import (CSV / XLSX)
+# -----------------
+# ලකුණු පත්‍රිකා (mark sheets) පේළියෙන් පේළිය generator එකක් ලෙස කියවා,
+# chunk වශයෙන් StudentMark වගුවට upsert කරයි. වැරදි පේළි වාර්තාවට එකතු වේ,
+# සම්පූර්ණ ගොනුව නවතින්නේ නැත.
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# පේළි තීරු (columns): student_id, marks, සහ (assessment ලබා නොදුන්නේ නම්) course + assessment
+REQUIRED_COLUMNS = ('student_id', 'marks')
+ASSESSMENT_COLUMNS = ('course', 'assessment')
+
+
+class MarkImportError(Exception):
+    """ ගොනුවම කියවිය නොහැකි විට (උදා: තීරු නැත, openpyxl නැත) """
+
+
+class MarkImportReport:
+    """ Import එකක ප්‍රතිඵල - ගොනුවේ පේළි අංක සමඟ දෝෂ (errors) """
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.enrollments_recomputed = 0
+        self.errors = [] # [(line_number, message)]
+
+    def add_error(self, line_number, message):
+        self.errors.append((line_number, message))
+
+    def write_errors(self, stream):
+        writer = csv.writer(stream)
+        writer.writerow(['line', 'error'])
+        writer.writerows(self.errors)
+
+    def __str__(self):
+        return (
+            f"{self.rows_imported}/{self.rows_read} rows imported, "
+            f"{len(self.errors)} errors, {self.enrollments_recomputed} enrollments recomputed"
+        )
+
+
+def _normalise_header(header):
+    return [str(column or '').strip().lower() for column in header]
+
+
+def _row(header, values):
+    # කෙටි පේළි (අවසාන cells නැති) None වලින් පුරවයි - සෑම පේළියකම header එකේ සියලු තීරු ඇත
+    values = list(values)
+    return dict(zip(header, values + [None] * (len(header) - len(values))))
+
+
+def _csv_rows(stream):
+    reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    header = _normalise_header(next(reader, []))
+    for line_number, values in enumerate(reader, start=2):
+        if any(values):
+            yield line_number, _row(header, values)
+
+
+def _xlsx_rows(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise MarkImportError("XLSX import requires the 'openpyxl' package.")
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _normalise_header(next(rows, []))
+        for line_number, values in enumerate(rows, start=2):
+            if any(value not in (None, '') for value in values):
+                yield line_number, _row(header, values)
+    finally:
+        workbook.close()
+
+
+def parse_mark_file(stream, filename):
+    """ Binary stream එකක් ගොනු නාමය අනුව CSV හෝ XLSX ලෙස (line_number, row_dict) generator එකක් කරයි """
+    if filename.lower().endswith('.xlsx'):
+        return _xlsx_rows(stream)
+    return _csv_rows(stream)
+
+
+def import_marks(rows, assessment=None, chunk_size=DEFAULT_CHUNK_SIZE, recompute=True):
+    """
+    (line_number, row) පේළි StudentMark වගුවට upsert කරයි.
+
+    assessment ලබා දුන්නේ නම් සියලුම පේළි එම Assessment එකටය; නැත්නම් සෑම
+    පේළියකම 'course' (code) සහ 'assessment' (name) තීරු තිබිය යුතුය.
+    """
+    report = MarkImportReport()
+
+    # Lookup dictionaries - එක් query එක බැගින්
+    student_pks = dict(Student.objects.values_list('student_id', 'pk'))
+    if assessment is not None:
+        assessment_keys = None
+    else:
+        assessment_keys = {
+            (code.lower(), name.lower()): (pk, course_id)
+            for pk, course_id, code, name in Assessment.objects.values_list(
+                'pk', 'course_id', 'course__code', 'name'
+            )
+        }
+
+    # Header එක (පළමු පේළියේ තීරු) එක් වරක් පමණක්, කිසිවක් ලිවීමට පෙර පරීක්ෂා කිරීම
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return report
+    required = REQUIRED_COLUMNS if assessment is not None else REQUIRED_COLUMNS + ASSESSMENT_COLUMNS
+    missing = [column for column in required if column not in first[1]]
+    if missing:
+        raise MarkImportError(f"Missing column(s): {', '.join(missing)}")
+
+    affected_students, affected_courses = set(), set()
+    chunk = {} # (student_pk, assessment_pk) -> StudentMark (ගොනුවේ අවසාන අගය පවතී)
+
+    def flush():
+        with transaction.atomic():
+            StudentMark.objects.bulk_create(
+                chunk.values(),
+                update_conflicts=True,
+                unique_fields=['student', 'assessment'],
+                update_fields=['marks'],
+            )
+        chunk.clear()
+
+    for line_number, row in itertools.chain([first], rows):
+        report.rows_read += 1
+        if row.get('marks') in (None, ''):
+            report.add_error(line_number, "Missing marks.")
+            continue
+
+        student_id = str(row['student_id'] or '').strip()
+        student_pk = student_pks.get(student_id)
+        if student_pk is None:
+            report.add_error(line_number, f"Student ID '{student_id}' not found.")
+            continue
+
+        if assessment is not None:
+            assessment_pk, course_id = assessment.pk, assessment.course_id
+        else:
+            key = (str(row.get('course') or '').strip().lower(), str(row.get('assessment') or '').strip().lower())
+            if key not in assessment_keys:
+                report.add_error(line_number, f"Assessment '{row.get('assessment')}' for course '{row.get('course')}' not found.")
+                continue
+            assessment_pk, course_id = assessment_keys[key]
+
+        try:
+            marks = Decimal(str(row['marks']).strip())
+            if not marks.is_finite(): # NaN / Infinity
+                raise InvalidOperation
+            marks = marks.quantize(Decimal('0.01'))
+        except (InvalidOperation, ValueError):
+            report.add_error(line_number, f"Invalid marks '{row['marks']}'.")
+            continue
+        if not 0 <= marks <= 100:
+            report.add_error(line_number, f"Marks {marks} must be between 0 and 100.")
+            continue
+
+        chunk[(student_pk, assessment_pk)] = StudentMark(
+            student_id=student_pk, assessment_id=assessment_pk, marks=marks
+        )
+        affected_students.add(student_pk)
+        affected_courses.add(course_id)
+        report.rows_imported += 1
+        if len(chunk) >= chunk_size:
+            flush()
+
+    if chunk:
+        flush()
+    bump_student_versions(affected_students)
+
+    # බලපෑමට ලක් වූ Enrollments පමණක් නැවත ගණනය කිරීම
+    if recompute and affected_students:
+        enrollments = Enrollment.objects.filter(
+            student_id__in=affected_students, course_id__in=affected_courses
+        )
+        report.enrollments_recomputed, changed = recompute_final_marks(enrollments)
+
+    return report
@@ -0,0 +1,132 @@
+import logging
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .grading import recompute_final_marks
+from .models import Enrollment, RecomputeJob
+
+logger = logging.getLogger('core.jobs')
+
+# -----------------
+# Recompute job queue (DB table - බාහිර broker එකක් අවශ්‍ය නැත)
+# -----------------
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_STALE_AFTER = 600 # තත්පර - මෙයට වඩා පැරණි Running jobs නැවත Pending කරයි
+MAX_ATTEMPTS = 3 # අසාර්ථක job එකක් උත්සාහ කරන උපරිම වාර ගණන - ඉන්පසු Failed
+RETRY_DELAY = 30 # තත්පර - අසාර්ථක වූ job එකක් නැවත claim කිරීමට පෙර
+
+
+def enqueue_enrollments(enrollments):
+    """
+    Enrollments queryset එක සඳහා Pending jobs සාදයි. දැනටමත් Pending job එකක්
+    ඇති Enrollments, unique_pending_recompute_job constraint එක මගින් මඟ හැරේ.
+    """
+    jobs = [RecomputeJob(enrollment_id=pk) for pk in enrollments.values_list('pk', flat=True)]
+    RecomputeJob.objects.bulk_create(jobs, batch_size=1000, ignore_conflicts=True)
+    return len(jobs)
+
+
+def enqueue_on_commit(enrollments):
+    """ Signals සඳහා - transaction එක commit වූ පසු පමණක් enqueue කරයි """
+    transaction.on_commit(lambda: enqueue_enrollments(enrollments))
+
+
+def job_status(student):
+    """ ශිෂ්‍යයාගේ (Student හෝ pk) අවසන් නොවූ jobs ගණන {status: count} """
+    rows = (
+        RecomputeJob.objects.filter(enrollment__student=student)
+        .order_by()
+        .values_list('status')
+        .annotate(count=Count('id'))
+    )
+    return dict(rows)
+
+
+def requeue_stale(stale_after=DEFAULT_STALE_AFTER):
+    """ Worker එකක් නැවතුනු (crash) විට ඉතිරි වූ Running jobs නැවත Pending කිරීම """
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = RecomputeJob.objects.filter(status='Running', claimed_at__lt=cutoff)
+    requeued = 0
+    for job in stale.only('id', 'enrollment_id'):
+        # එම Enrollment එකට අලුත් Pending job එකක් දැනටමත් ඇත්නම් මෙය ඉවත් කිරීම
+        if RecomputeJob.objects.filter(enrollment_id=job.enrollment_id, status='Pending').exists():
+            job.delete()
+        else:
+            RecomputeJob.objects.filter(pk=job.pk).update(status='Pending', claimed_by='', claimed_at=None)
+            requeued += 1
+    return requeued
+
+
+def claim_jobs(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Pending jobs batch එකක් මෙම worker එකට වෙන් කර (Running) ලබා දෙයි.
+    UPDATE ... WHERE status='Pending' නිසා එකම job එක worker දෙකකට නොලැබේ.
+    """
+    token = uuid.uuid4().hex
+    # නැවත උත්සාහ කරන jobs (claimed_at = අසාර්ථක වූ වේලාව) RETRY_DELAY ට පසුව පමණි
+    ready = Q(claimed_at__isnull=True) | Q(claimed_at__lte=timezone.now() - timedelta(seconds=RETRY_DELAY))
+    pending = list(
+        RecomputeJob.objects.filter(ready, status='Pending').order_by('id').values_list('pk', flat=True)[:batch_size]
+    )
+    if not pending:
+        return []
+    RecomputeJob.objects.filter(pk__in=pending, status='Pending').update(
+        status='Running', claimed_by=token, claimed_at=timezone.now()
+    )
+    return list(RecomputeJob.objects.filter(claimed_by=token, status='Running'))
+
+
+def _job_failed(job, error):
+    """ MAX_ATTEMPTS දක්වා නැවත Pending (RETRY_DELAY පසුව), ඉන්පසු Failed """
+    attempts = job.attempts + 1
+    if attempts >= MAX_ATTEMPTS:
+        RecomputeJob.objects.filter(pk=job.pk).update(status='Failed', attempts=attempts, error=error)
+    elif RecomputeJob.objects.filter(enrollment_id=job.enrollment_id, status='Pending').exists():
+        job.delete() # මේ අතර අලුත් Pending job එකක් එකතු වී ඇත - එය මෙය ආවරණය කරයි
+    else:
+        RecomputeJob.objects.filter(pk=job.pk).update(
+            status='Pending', attempts=attempts, error=error, claimed_by='', claimed_at=timezone.now(),
+        )
+
+
+def run_jobs(jobs):
+    """
+    වෙන් කළ jobs වල Enrollments එකවර (bulk) ගණනය කර, සාර්ථක jobs ඉවත් කරයි. Batch එක
+    අසාර්ථක වුවහොත් jobs එකින් එක නැවත ධාවනය කරයි - දෝෂ සහිත Enrollment එක පමණක් ගැටලුවේ.
+    """
+    if not jobs:
+        return 0
+    pks = [job.pk for job in jobs]
+    try:
+        enrollments = Enrollment.objects.filter(pk__in=[job.enrollment_id for job in jobs])
+        recompute_final_marks(enrollments)
+    except Exception:
+        if len(jobs) > 1:
+            logger.warning("Recompute batch of %d jobs failed, retrying one by one", len(jobs))
+            return sum(run_jobs([job]) for job in jobs)
+        logger.exception("Recompute job %s failed (attempt %d)", jobs[0].pk, jobs[0].attempts + 1)
+        _job_failed(jobs[0], traceback.format_exc())
+        return 0
+    RecomputeJob.objects.filter(pk__in=pks).delete()
+    return len(jobs)
+
+
+def work(batch_size=DEFAULT_BATCH_SIZE, poll_interval=2.0, once=False, stop=lambda: False):
+    """ Worker loop: jobs නැති වන තෙක් (once) හෝ stop() True වන තෙක් ක්‍රියාත්මක වේ """
+    processed = 0
+    while not stop():
+        jobs = claim_jobs(batch_size)
+        if jobs:
+            processed += run_jobs(jobs)
+            continue
+        if once:
+            break
+        time.sleep(poll_interval)
+    return processed
@@ -0,0 +1,101 @@
+import csv
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Min, Sum
+
+from .models import Payment, StudentBalance
+
+# -----------------
+# Fee ledger (ගෙවිය යුතු ශේෂය සහ overdue වාර්තා)
+# -----------------
+# ශිෂ්‍යයා අනුව Pending ගෙවීම් GROUP BY query එකකින් ගණනය කර StudentBalance
+# වගුවේ ගබඩා කරයි. Payment (status, due_date) / (student, status) indexes භාවිතා වේ.
+
+EXPORT_CHUNK_SIZE = 2000
+OVERDUE_CSV_HEADER = ('student_id', 'name', 'description', 'amount', 'due_date', 'days_overdue')
+
+
+def pending_totals(payments):
+    """ Payments queryset එකේ Pending ගෙවීම් {student_id: (outstanding, count, next_due_date)} ලෙස """
+    rows = (
+        payments
+        .filter(status='Pending')
+        .order_by()
+        .values('student_id')
+        .annotate(outstanding=Sum('amount'), pending_count=Count('id'), next_due_date=Min('due_date'))
+    )
+    return {
+        row['student_id']: (row['outstanding'], row['pending_count'], row['next_due_date'])
+        for row in rows
+    }
+
+
+def refresh_balances(student_ids=None):
+    """
+    ලබා දෙන ශිෂ්‍යයන්ගේ (හෝ student_ids=None නම් සියලුම) ශේෂ නැවත ගණනය කරයි.
+    Pending ගෙවීම් නැති ශිෂ්‍යයන්ගේ පේළි ඉවත් කරයි (ශේෂය 0).
+    """
+    payments = Payment.objects.all()
+    balances = StudentBalance.objects.all()
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        if not student_ids:
+            return 0
+        payments = payments.filter(student_id__in=student_ids)
+        balances = balances.filter(student_id__in=student_ids)
+
+    totals = pending_totals(payments)
+    rows = [
+        StudentBalance(student_id=student_id, outstanding=outstanding, pending_count=count, next_due_date=due)
+        for student_id, (outstanding, count, due) in totals.items()
+    ]
+
+    with transaction.atomic():
+        balances.exclude(student_id__in=list(totals)).delete()
+        StudentBalance.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=['outstanding', 'pending_count', 'next_due_date'],
+        )
+    return len(rows)
+
+
+def outstanding_balance(student):
+    """ ශිෂ්‍යයාගේ (Student හෝ pk) ගෙවිය යුතු මුළු මුදල - එක් query එකකි """
+    outstanding = (
+        StudentBalance.objects.filter(student=student).values_list('outstanding', flat=True).first()
+    )
+    return outstanding if outstanding is not None else Decimal('0.00')
+
+
+def overdue_payments(as_of=None):
+    """ as_of (අද) දිනට පෙර due_date ඇති Pending ගෙවීම් - payment_status_due_idx range scan """
+    as_of = as_of or datetime.date.today()
+    return Payment.objects.filter(status='Pending', due_date__lt=as_of).order_by('due_date', 'id')
+
+
+class _Echo:
+    """ csv.writer සඳහා - ලියන පේළිය buffer නොකර ආපසු ලබා දෙයි """
+
+    def write(self, value):
+        return value
+
+
+def overdue_csv_rows(as_of=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Overdue ගෙවීම් CSV පේළි ලෙස එකින් එක (generator) ලබා දෙයි.
+    .iterator() මගින් server-side cursor / chunks භාවිතා කරන නිසා පේළි මිලියනයක්
+    වුවද memory භාවිතය නියතයි (constant).
+    """
+    as_of = as_of or datetime.date.today()
+    writer = csv.writer(_Echo())
+    yield writer.writerow(OVERDUE_CSV_HEADER)
+    rows = overdue_payments(as_of).values_list(
+        'student__student_id', 'student__name', 'description', 'amount', 'due_date',
+    )
+    for student_id, name, description, amount, due_date in rows.iterator(chunk_size=chunk_size):
+        yield writer.writerow((student_id, name, description, amount, due_date, (as_of - due_date).days))
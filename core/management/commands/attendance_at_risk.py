@@ -0,0 +1,39 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from core.attendance import DEFAULT_AT_RISK_THRESHOLD, at_risk
+from core.replicas import use_replica
+
+
+class Command(BaseCommand):
+    help = "පැමිණීම threshold% ට අඩු (student, course) ලැයිස්තුව CSV ලෙස (nightly report)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=DEFAULT_AT_RISK_THRESHOLD)
+        parser.add_argument('--semester', type=int, help="වාරය (Semester)")
+        parser.add_argument('--min-sessions', type=int, default=1,
+                            help="මෙයට අඩු දින ගණනක් සටහන් කළ summaries මඟ හැරීම")
+        parser.add_argument('--output', help="CSV ගොනුව; නැත්නම් stdout")
+
+    def write(self, out, options):
+        writer = csv.writer(out)
+        writer.writerow(['course', 'student_id', 'name', 'present', 'absent', 'percentage'])
+        count = 0
+        rows = at_risk(options['threshold'], semester=options['semester'], min_sessions=options['min_sessions'])
+        for summary in rows.iterator(chunk_size=2000):
+            writer.writerow([
+                summary.course.code, summary.student.student_id, summary.student.name,
+                summary.present_count, summary.absent_count, f"{summary.percentage:.1f}",
+            ])
+            count += 1
+        return count
+
+    def handle(self, *args, **options):
+        with use_replica(): # Report එකක් - read replica එකක් ඇත්නම් එයින්
+            if options['output']:
+                with open(options['output'], 'w', newline='') as out:
+                    count = self.write(out, options)
+            else:
+                count = self.write(self.stdout, options)
+        self.stderr.write(f"{count} students below {options['threshold']:g}% attendance.")
@@ -0,0 +1,59 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.catalogue import catalogue_page
+from core.models import Course, Lecturer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Course catalogue පිටු 100 සිට 100k දක්වා පාඨමාලා ගණන් සමඟ මනියි (benchmark). "
+        "සියලු දත්ත transaction එකක් තුළ සාදා අවසානයේ rollback කරයි."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1_000, 10_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def timed(self, repeat, func):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        self.stdout.write(f"{'courses':>8} {'first page':>12} {'last page':>12} {'filtered':>12}  (median ms)")
+        for size in options['sizes']:
+            try:
+                with transaction.atomic():
+                    lecturers = Lecturer.objects.bulk_create([
+                        Lecturer(name=f"Bench Lecturer {i}", email=f"bench{i}@bench.invalid") for i in range(20)
+                    ])
+                    Course.objects.bulk_create([
+                        Course(
+                            code=f"BX{i:07}", name=f"Bench Course {i}", lecturer=lecturers[i % 20],
+                            credits=1 + i % 4, semester=1 + i % 8,
+                        )
+                        for i in range(size)
+                    ], batch_size=5000)
+                    middle_cursor = f"BX{size // 2:07}"
+                    last_cursor = f"BX{size - 20:07}"
+                    first = self.timed(repeat, lambda: catalogue_page())
+                    last = self.timed(repeat, lambda: catalogue_page(after=last_cursor))
+                    filtered = self.timed(repeat, lambda: catalogue_page(
+                        semester=3, lecturer_id=lecturers[2].pk, after=middle_cursor
+                    ))
+                    self.stdout.write(f"{size:>8} {first:>12.2f} {last:>12.2f} {filtered:>12.2f}")
+                    raise Rollback
+            except Rollback:
+                pass
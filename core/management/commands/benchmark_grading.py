@@ -0,0 +1,58 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import grading
+from core.grading import GradingScale
+from core.models import Enrollment
+
+
+def legacy_grade_from_mark(mark):
+    """ පැරණි Enrollment.get_grade_from_mark() if-chain එක (සැසඳීම සඳහා පමණි) """
+    if mark >= 85: return ('A+', Decimal('4.00'))
+    if mark >= 80: return ('A',  Decimal('4.00'))
+    if mark >= 75: return ('A-', Decimal('3.70'))
+    if mark >= 70: return ('B+', Decimal('3.30'))
+    if mark >= 65: return ('B',  Decimal('3.00'))
+    if mark >= 60: return ('B-', Decimal('2.70'))
+    if mark >= 55: return ('C+', Decimal('2.30'))
+    if mark >= 50: return ('C',  Decimal('2.00'))
+    if mark >= 45: return ('C-', Decimal('1.70'))
+    if mark >= 40: return ('D+', Decimal('1.30'))
+    if mark >= 35: return ('D',  Decimal('1.00'))
+    return ('E', Decimal('0.00')) # Fail
+
+
+class Command(BaseCommand):
+    help = "පැරණි if-chain එක, bisect සහ searchsorted ශ්‍රේණිගත කිරීම සමඟ සසඳයි (benchmark)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1_000_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        marks = [Decimal(rng.randrange(0, 10001)).scaleb(-2) for _ in range(options['count'])]
+        scale = GradingScale(grading.DEFAULT_GRADE_BANDS)
+
+        def timed(label, func):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{label:<28} {elapsed:8.3f}s  {len(marks) / elapsed:14,.0f} marks/s")
+            return result
+
+        expected = timed("if-chain (legacy)", lambda: [legacy_grade_from_mark(m) for m in marks])
+        single = timed("GradingScale.classify", lambda: [scale.classify(m) for m in marks])
+        batch_label = "classify_many (numpy)" if grading.np is not None else "classify_many (bisect)"
+        batch = timed(batch_label, lambda: scale.classify_many(marks))
+        # Enrollment.calculate_final_mark() භාවිතා කරන මාර්ගය (cache කළ active_scale() - DB bands අනුව)
+        grading.clear_scale_cache()
+        enrollment = Enrollment()
+        timed("get_grade_from_mark", lambda: [enrollment.get_grade_from_mark(m) for m in marks])
+
+        if single != expected or batch != expected:
+            raise CommandError("Grading scale results differ from the legacy if-chain.")
+        self.stdout.write(self.style.SUCCESS("All implementations agree."))
@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import DEFAULT_SIZES, compare, run_suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Synthetic දත්ත ප්‍රමාණ කිහිපයක් මත views, admin list views සහ model methods මනියි "
+        "(query ගණන, latency percentiles, memory). සියලු දත්ත අවසානයේ rollback කරයි."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="ශිෂ්‍ය ගණන්")
+        parser.add_argument('--courses', type=int, help="පාඨමාලා ගණන (පෙරනිමිය: ශිෂ්‍යයන් / 20)")
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--only', nargs='+', help="නමේ මෙම කොටස් ඇති cases පමණි (උදා: dashboard admin:)")
+        parser.add_argument('--output', help="JSON ප්‍රතිඵල ලියන ගොනුව")
+        parser.add_argument('--compare', help="පෙර JSON ප්‍රතිඵල - regressions ඇත්නම් දෝෂයක්")
+        parser.add_argument('--threshold', type=float, default=0.2, help="p50 latency ඉවසීම (0.2 = 20%%)")
+
+    def log(self, size, name, result):
+        self.stdout.write(
+            f"{size:>7} {name:<36} {result['queries']:>5}q "
+            f"p50 {result['ms']['p50']:>9.2f}ms  p95 {result['ms']['p95']:>9.2f}ms  {result['peak_kib']:>9.1f}KiB"
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as stream:
+                    baseline = json.load(stream)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline: {exc}")
+
+        results = run_suite(
+            sizes=options['sizes'], repeat=options['repeat'], courses=options['courses'],
+            seed=options['seed'], only=options['only'], log=self.log,
+        )
+        if options['output']:
+            with open(options['output'], 'w') as out:
+                json.dump(results, out, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        if baseline is not None:
+            regressions = compare(baseline, results, threshold=options['threshold'])
+            for size, name, field, before, after in regressions:
+                self.stderr.write(f"REGRESSION {size} {name}: {field} {before} -> {after}")
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['compare']}.")
+        self.stdout.write(self.style.SUCCESS("Benchmark complete."))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from core.grading import refresh_course_weights
+from core.models import Course
+
+
+class Command(BaseCommand):
+    help = (
+        "Assessment weights එකතුව 100% නොවන පාඨමාලා (කිසි දිනෙක final grade එකක් "
+        "නොලැබෙන - සැමවිටම Pending) ලැයිස්තුගත කරයි"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, help="වාරය (Semester)")
+        parser.add_argument('--refresh', action='store_true',
+                            help="පළමුව total_weight / assessment_count නැවත ගණනය කිරීම")
+        parser.add_argument('--strict', action='store_true', help="ගැටලු ඇත්නම් දෝෂයක් (CI සඳහා)")
+
+    def handle(self, *args, **options):
+        if options['refresh']:
+            self.stdout.write(f"Refreshed {refresh_course_weights()} course totals.")
+
+        courses = Course.objects.filter(~Q(total_weight=100)).order_by('semester', 'code')
+        if options['semester'] is not None:
+            courses = courses.filter(semester=options['semester'])
+
+        problems = 0
+        for code, semester, total_weight, count in courses.values_list(
+            'code', 'semester', 'total_weight', 'assessment_count',
+        ).iterator():
+            if count == 0:
+                reason = "no assessments"
+            elif total_weight < 100:
+                reason = f"weights add up to {total_weight}% (missing {100 - total_weight}%)"
+            else:
+                reason = f"weights add up to {total_weight}% (over by {total_weight - 100}%)"
+            self.stdout.write(f"Semester {semester} {code}: {reason}, {count} assessments")
+            problems += 1
+
+        if problems and options['strict']:
+            raise CommandError(f"{problems} courses can never reach 100%.")
+        style = self.style.WARNING if problems else self.style.SUCCESS
+        self.stdout.write(style(f"{problems} courses can never reach 100%."))
@@ -0,0 +1,36 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replicas import use_replica
+from core.snapshot import DEFAULT_CHUNK_SIZE, TABLES, export_snapshot
+
+
+class Command(BaseCommand):
+    help = "Enrollment, StudentMark සහ Attendance වගු analytics සඳහා columnar snapshot එකක් ලෙස export කරයි"
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help="Snapshot directory එක (තීරු ගොනු + manifest.json)")
+        parser.add_argument('--semester', type=int, help="එක් වාරයක (Semester) දත්ත පමණි")
+        parser.add_argument('--tables', help=f"කොමා වලින් වෙන් කළ වගු ({', '.join(TABLES)})")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        tables = None
+        if options['tables']:
+            tables = [table.strip() for table in options['tables'].split(',') if table.strip()]
+            unknown = set(tables) - set(TABLES)
+            if unknown:
+                raise CommandError(f"Unknown tables: {', '.join(sorted(unknown))}.")
+
+        with use_replica(): # Analytics export - read replica එකක් ඇත්නම් එයින්
+            manifest = export_snapshot(
+                options['directory'], tables=tables, semester=options['semester'], chunk_size=options['chunk_size'],
+            )
+        for table, meta in manifest['tables'].items():
+            size = sum(
+                os.path.getsize(os.path.join(options['directory'], column['file']))
+                for column in meta['columns'].values()
+            )
+            self.stdout.write(f"{table}: {meta['rows']} rows, {len(meta['columns'])} columns, {size:,} bytes")
+        self.stdout.write(self.style.SUCCESS(f"Snapshot written to {options['directory']}."))
@@ -0,0 +1,56 @@
+import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.fees import DEFAULT_BATCH_SIZE, FeeRunError, get_fee_run, run_fees
+from core.models import Course, FeeRun
+
+
+class Command(BaseCommand):
+    help = "ගාස්තු නියමයක් (fee rule) අනුව ශිෂ්‍යයන් සියල්ලටම එකවර Payments සාදයි (rerun ආරක්ෂිතයි)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('run_id', help="Fee run හඳුනාගැනීම (උදා: exam-fee-2026-sem1)")
+        parser.add_argument('--description', help="උදා: 'Exam Fee - Sem 1' (අලුත් run එකකට අවශ්‍යයි)")
+        parser.add_argument('--amount', help="මුදල (අලුත් run එකකට අවශ්‍යයි)")
+        parser.add_argument('--due-date', help="YYYY-MM-DD")
+        parser.add_argument('--course', help="Course code - එහි ලියාපදිංචි ශිෂ්‍යයන් පමණි")
+        parser.add_argument('--semester', type=int, help="එම වාරයේ පාඨමාලාවකට ලියාපදිංචි ශිෂ්‍යයන් පමණි")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def _rule(self, options):
+        rule = {}
+        if options['description']:
+            rule['description'] = options['description']
+        if options['amount']:
+            try:
+                rule['amount'] = Decimal(options['amount']).quantize(Decimal('0.01'))
+            except InvalidOperation:
+                raise CommandError(f"Invalid amount '{options['amount']}'.")
+        if options['due_date']:
+            try:
+                rule['due_date'] = datetime.date.fromisoformat(options['due_date'])
+            except ValueError:
+                raise CommandError(f"Invalid due date '{options['due_date']}'.")
+        if options['course']:
+            try:
+                rule['course'] = Course.objects.get(code=options['course'])
+            except Course.DoesNotExist:
+                raise CommandError(f"Course '{options['course']}' not found.")
+        if options['semester'] is not None:
+            rule['semester'] = options['semester']
+        return rule
+
+    def handle(self, *args, **options):
+        rule = self._rule(options)
+        is_new = not FeeRun.objects.filter(run_id=options['run_id']).exists()
+        if is_new and ('description' not in rule or 'amount' not in rule):
+            raise CommandError("--description and --amount are required for a new fee run.")
+        try:
+            fee_run = get_fee_run(options['run_id'], **rule)
+        except FeeRunError as exc:
+            raise CommandError(str(exc))
+
+        report = run_fees(fee_run, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(str(report)))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Student
+from core.synthetic import generate
+
+
+class Command(BaseCommand):
+    help = "Load testing සඳහා seed කළ synthetic ශිෂ්‍යයන්, පාඨමාලා, ලකුණු, පැමිණීම සහ ගෙවීම් සාදයි"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1_000)
+        parser.add_argument('--courses', type=int, default=50)
+        parser.add_argument('--enrollments-per-student', type=int, default=6)
+        parser.add_argument('--attendance-days', type=int, default=10)
+        parser.add_argument('--payments-per-student', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='SYN', help="student_id / course code පෙරවදන")
+
+    def handle(self, *args, **options):
+        if Student.objects.filter(student_id__startswith=options['prefix']).exists():
+            raise CommandError(f"Synthetic data with prefix '{options['prefix']}' already exists.")
+        counts = generate(
+            students=options['students'],
+            courses=options['courses'],
+            enrollments_per_student=options['enrollments_per_student'],
+            attendance_days=options['attendance_days'],
+            payments_per_student=options['payments_per_student'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            ", ".join(f"{count} {model}" for model, count in counts.items())
+        ))
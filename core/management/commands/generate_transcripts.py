@@ -0,0 +1,36 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Course, Student
+from core.replicas import use_replica
+from core.transcripts import DEFAULT_CHUNK_SIZE, write_transcripts
+
+
+class Command(BaseCommand):
+    help = "ශිෂ්‍යයන්ගේ (cohort) transcripts (HTML, PDF සඳහා සූදානම්) process pool එකකින් zip ගොනුවකට සාදයි"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Zip ගොනුව (උදා: transcripts-2026.zip)")
+        parser.add_argument('--prefix', help="student_id පෙරවදන (උදා: 2022/ - එම කණ්ඩායම පමණි)")
+        parser.add_argument('--course', help="මෙම පාඨමාලාවට ලියාපදිංචි ශිෂ්‍යයන් පමණි")
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help="Render processes ගණන (0 = මෙම process එකේම)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        students = Student.objects.all()
+        if options['prefix']:
+            students = students.filter(student_id__startswith=options['prefix'])
+        if options['course']:
+            try:
+                course = Course.objects.get(code=options['course'])
+            except Course.DoesNotExist:
+                raise CommandError(f"Course '{options['course']}' not found.")
+            students = students.filter(enrollment__course=course)
+
+        with use_replica(): # Transcript දත්ත read replica එකක් ඇත්නම් එයින්
+            report = write_transcripts(
+                students, options['output'], processes=options['processes'], chunk_size=options['chunk_size'],
+            )
+        self.stdout.write(self.style.SUCCESS(f"{report} -> {options['output']}"))
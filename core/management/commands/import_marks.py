@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import DEFAULT_CHUNK_SIZE, MarkImportError, import_marks, parse_mark_file
+from core.models import Assessment
+
+
+class Command(BaseCommand):
+    help = "CSV / XLSX ලකුණු පත්‍රිකාවක් (mark sheet) StudentMark වගුවට import කරයි"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV හෝ XLSX ගොනුව")
+        parser.add_argument('--assessment', type=int,
+                            help="Assessment ID (නැත්නම් ගොනුවේ 'course' සහ 'assessment' තීරු භාවිතා වේ)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--errors', help="දෝෂ වාර්තාව (CSV) ලියන ගොනුව; නැත්නම් stderr")
+
+    def handle(self, *args, **options):
+        assessment = None
+        if options['assessment']:
+            try:
+                assessment = Assessment.objects.get(pk=options['assessment'])
+            except Assessment.DoesNotExist:
+                raise CommandError(f"Assessment '{options['assessment']}' not found.")
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                rows = parse_mark_file(stream, options['path'])
+                report = import_marks(rows, assessment=assessment, chunk_size=options['chunk_size'])
+        except (OSError, MarkImportError) as exc:
+            raise CommandError(str(exc))
+
+        if report.errors:
+            if options['errors']:
+                with open(options['errors'], 'w', newline='') as out:
+                    report.write_errors(out)
+            else:
+                report.write_errors(sys.stderr)
+        self.stdout.write(self.style.SUCCESS(str(report)))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.attendance import build_summaries, rebuild_summaries
+from core.models import Attendance, AttendanceSummary, Course
+
+
+def _state(summary):
+    return (
+        summary.first_date, bytes(summary.recorded_bits), bytes(summary.present_bits),
+        summary.present_count, summary.absent_count,
+    )
+
+
+class Command(BaseCommand):
+    help = "Attendance summary (bitset) වගුව Attendance පේළි වලින් නැවත ගොඩනගා, සසඳයි"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', help="Course code (උදා: CS101) - නැත්නම් සියල්ල")
+        parser.add_argument('--verify-only', action='store_true',
+                            help="නැවත ගොඩනැගීමකින් තොරව සසඳා බැලීම පමණි")
+
+    def handle(self, *args, **options):
+        course_ids = None
+        attendance = Attendance.objects.all()
+        summaries = AttendanceSummary.objects.all()
+        if options['course']:
+            try:
+                course = Course.objects.get(code=options['course'])
+            except Course.DoesNotExist:
+                raise CommandError(f"Course '{options['course']}' not found.")
+            course_ids = [course.pk]
+            attendance = attendance.filter(course=course)
+            summaries = summaries.filter(course=course)
+
+        if not options['verify_only']:
+            rows = rebuild_summaries(course_ids)
+            self.stdout.write(f"Rebuilt {rows} attendance summary rows.")
+
+        stored = {
+            (s.student_id, s.course_id): s
+            for s in summaries.iterator(chunk_size=2000)
+        }
+        mismatches = 0
+        for expected in build_summaries(attendance):
+            actual = stored.pop((expected.student_id, expected.course_id), None)
+            if actual is None or _state(actual) != _state(expected):
+                mismatches += 1
+                self.stderr.write(f"Mismatch for student {expected.student_id}, course {expected.course_id}")
+        for student_id, course_id in stored:
+            mismatches += 1
+            self.stderr.write(f"Stale summary for student {student_id}, course {course_id}")
+
+        if mismatches:
+            raise CommandError(f"{mismatches} summaries do not match the Attendance table.")
+        self.stdout.write(self.style.SUCCESS("Attendance summary matches the Attendance table."))
@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.gpa import refresh_gpa_summaries, summary_gpa
+from core.models import Student
+
+
+class Command(BaseCommand):
+    help = "GPA summary වගුව මුල සිට නැවත ගොඩනගා, සජීවී (live) ගණනය කිරීම සමඟ සසඳයි"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify-only', action='store_true',
+                            help="නැවත ගොඩනැගීමකින් තොරව සසඳා බැලීම පමණි")
+
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            rows = refresh_gpa_summaries()
+            self.stdout.write(f"Rebuilt {rows} GPA summary rows.")
+
+        mismatches = 0
+        for student in Student.objects.iterator(chunk_size=500):
+            sgpa_by_semester, cgpa = summary_gpa(student)
+            semesters = set(student.enrollment_set.values_list('course__semester', flat=True))
+            stale = set(sgpa_by_semester) - semesters
+            wrong = [
+                semester for semester in semesters
+                if sgpa_by_semester.get(semester, Decimal('0.00')) != student.calculate_sgpa(semester)
+            ]
+            if stale or wrong or cgpa != student.calculate_cgpa():
+                mismatches += 1
+                self.stderr.write(f"Mismatch for {student.student_id}: semesters {sorted(stale | set(wrong))}")
+
+        if mismatches:
+            raise CommandError(f"{mismatches} students do not match the live GPA calculation.")
+        self.stdout.write(self.style.SUCCESS("GPA summary matches the live calculation."))
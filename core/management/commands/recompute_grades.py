@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.grading import DEFAULT_BATCH_SIZE, enrollments_for, recompute_final_marks
+from core.models import Course
+
+
+class Command(BaseCommand):
+    help = "Enrollments සඳහා final_mark, final_grade සහ grade_point bulk ලෙස නැවත ගණනය කරයි"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', help="Course code (උදා: CS101)")
+        parser.add_argument('--semester', type=int, help="වාරය (Semester)")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        course = None
+        if options['course']:
+            try:
+                course = Course.objects.get(code=options['course'])
+            except Course.DoesNotExist:
+                raise CommandError(f"Course '{options['course']}' not found.")
+
+        enrollments = enrollments_for(course=course, semester=options['semester'])
+        processed, changed = recompute_final_marks(enrollments, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {processed} enrollments ({changed} changed)."
+        ))
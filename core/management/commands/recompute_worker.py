@@ -0,0 +1,60 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import DEFAULT_BATCH_SIZE, DEFAULT_STALE_AFTER, requeue_stale, work
+
+
+def _worker(options, stopping):
+    # Parent process එකේ DB connection එක child processes අතර බෙදා නොගැනීමට
+    connections.close_all()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    work(
+        batch_size=options['batch_size'],
+        poll_interval=options['poll_interval'],
+        once=options['once'],
+        stop=stopping.is_set,
+    )
+
+
+class Command(BaseCommand):
+    help = "RecomputeJob පෝලිමේ ඇති Enrollments, process pool එකක් මගින් නැවත ගණනය කරයි"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help="Worker processes ගණන")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="පෝලිම හිස් විට රැඳී සිටින තත්පර")
+        parser.add_argument('--stale-after', type=int, default=DEFAULT_STALE_AFTER)
+        parser.add_argument('--once', action='store_true', help="පෝලිම හිස් වූ පසු නතර වීම")
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale(options['stale_after'])
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale jobs.")
+
+        if options['processes'] <= 1:
+            processed = work(
+                batch_size=options['batch_size'], poll_interval=options['poll_interval'], once=options['once'],
+            )
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
+            return
+
+        connections.close_all()
+        stopping = multiprocessing.Event()
+        workers = [
+            multiprocessing.Process(target=_worker, args=(options, stopping), daemon=True)
+            for _ in range(options['processes'])
+        ]
+        for process in workers:
+            process.start()
+        try:
+            for process in workers:
+                process.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers after their current batch...")
+            stopping.set()
+            for process in workers:
+                process.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
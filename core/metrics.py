@@ -0,0 +1,110 @@
+import json
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.backends.django import Template
+
+logger = logging.getLogger('core.metrics')
+
+# -----------------
+# Request metrics (query count, DB / template / wall time)
+# -----------------
+# සෑම worker process එකකටම තමන්ගේම ring buffer එකක් (deque maxlen) ඇත.
+# deque.append() GIL යටතේ atomic නිසා lock එකක් අවශ්‍ය නොවේ.
+
+FIELDS = ('view', 'method', 'status', 'queries', 'db_ms', 'template_ms', 'wall_ms')
+
+_buffer = deque(maxlen=getattr(settings, 'METRICS_BUFFER_SIZE', 2048))
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'template_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """ connection.execute_wrapper() - සෑම query එකක්ම ගණන් කර කාලය මනියි """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def start():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def _timed_render(render):
+    def wrapper(self, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return render(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            metrics.template_time += time.perf_counter() - started
+    wrapper.metrics_wrapped = True
+    return wrapper
+
+
+def install_template_timer():
+    """ Django template backend එකේ render() කාලය මැනීමට (එක් වරක් පමණි) """
+    if not getattr(Template.render, 'metrics_wrapped', False):
+        Template.render = _timed_render(Template.render)
+
+
+def record(view, method, status, metrics, wall_time):
+    entry = (
+        view, method, status, metrics.queries,
+        round(metrics.db_time * 1000, 2), round(metrics.template_time * 1000, 2), round(wall_time * 1000, 2),
+    )
+    _buffer.append(entry)
+
+    slow_ms = getattr(settings, 'METRICS_SLOW_REQUEST_MS', 500)
+    max_queries = getattr(settings, 'METRICS_MAX_QUERIES', 50)
+    if entry[-1] >= slow_ms or metrics.queries > max_queries:
+        logger.warning(json.dumps(dict(zip(FIELDS, entry))))
+
+
+def _percentile(ordered, fraction):
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summary():
+    """ Buffer එකේ ඇති requests, view එක අනුව p50 / p95 / p99 ලෙස """
+    by_view = {}
+    for entry in list(_buffer):
+        by_view.setdefault(entry[0], []).append(entry)
+
+    result = {}
+    for view, entries in sorted(by_view.items()):
+        wall = sorted(e[6] for e in entries)
+        queries = sorted(e[3] for e in entries)
+        result[view] = {
+            'requests': len(entries),
+            'wall_ms': {p: _percentile(wall, f) for p, f in (('p50', .5), ('p95', .95), ('p99', .99))},
+            'queries': {p: _percentile(queries, f) for p, f in (('p50', .5), ('p95', .95), ('max', 1))},
+            'db_ms_mean': round(sum(e[4] for e in entries) / len(entries), 2),
+            'template_ms_mean': round(sum(e[5] for e in entries) / len(entries), 2),
+        }
+    return result
+
+
+def clear():
+    _buffer.clear()
@@ -0,0 +1,127 @@
+import random
+import time
+from contextlib import ExitStack
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+from django.utils.functional import SimpleLazyObject
+
+from . import metrics, replicas
+from .models import Student
+
+
+class RequestMetricsMiddleware:
+    """
+    Sample කළ requests සඳහා view නාමය, DB query ගණන, DB / template / wall කාලය
+    සටහන් කරයි. METRICS_SAMPLE_RATE (0.0 - 1.0) මගින් වියදම පාලනය කරයි. සියලුම database
+    aliases (primary සහ read replicas) වල queries ගණන් කරයි.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+        metrics.install_template_timer()
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        request_metrics, token = metrics.start()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(request_metrics))
+                response = self.get_response(request)
+        finally:
+            metrics.stop(token)
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.record(view, request.method, response.status_code, request_metrics, time.perf_counter() - started)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Read-your-writes: POST (හෝ වෙනත් unsafe method) එකකට පසු REPLICA_STICKY_SECONDS
+    කාලයක් cookie එකක් තබා, එම කාලය තුළ පරිශීලකයාගේ සියලුම reads primary වෙත යොමු කරයි
+    (replica lag නිසා තමන් ලියූ දේ නොපෙනී යාම වැළැක්වීමට). Replicas නැත්නම් කිසිවක් නොකරයි.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 15)
+
+    def __call__(self, request):
+        if not replicas.replica_aliases():
+            return self.get_response(request)
+
+        unsafe = request.method not in replicas.SAFE_METHODS
+        if unsafe or replicas.STICKY_COOKIE in request.COOKIES:
+            with replicas.pin_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+
+        if unsafe:
+            response.set_cookie(
+                replicas.STICKY_COOKIE, '1', max_age=self.sticky_seconds, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class StudentLink:
+    """ ලොග් වූ පරිශීලකයාගේ Student pk, data version සහ භූමිකාව (role) """
+
+    def __init__(self, user, row):
+        self.student_id, self.version = row or (None, None)
+        if not user.is_authenticated:
+            self.role = 'anonymous'
+        else:
+            self.role = 'student' if self.student_id else 'staff' if user.is_staff else 'user'
+
+
+def _student_row(user):
+    return Student.objects.filter(user_id=user.pk).values_list('pk', 'data_version')
+
+
+def get_student_link(request):
+    """ User -> Student සම්බන්ධය (එක් query එකක්) - request එකකට එක් වරක් පමණි """
+    if not hasattr(request, '_cached_student_link'):
+        user = request.user
+        row = _student_row(user).first() if user.is_authenticated else None
+        request._cached_student_link = StudentLink(user, row)
+    return request._cached_student_link
+
+
+async def aget_student_link(request):
+    """ get_student_link() හි async ආකාරය (async views සඳහා) """
+    if not hasattr(request, '_cached_student_link'):
+        user = await request.auser()
+        row = await _student_row(user).afirst() if user.is_authenticated else None
+        request._cached_student_link = StudentLink(user, row)
+    return request._cached_student_link
+
+
+class StudentMiddleware:
+    """
+    ලොග් වූ පරිශීලකයාගේ Student pk, data version සහ භූමිකාව (role) request එකට lazy ලෙස
+    එක් කරයි - අවශ්‍ය views (dashboard, API) පමණක් query එක ගෙවයි, admin / staff පිටු නොවේ.
+    User -> Student සම්බන්ධය DB එකෙන් (එක් query එකක්) - per-process cache එකක් විශ්වාස නොකරයි,
+    Student.user වෙනස් වූ විට වෙනත් workers හි ද වහාම බලපායි:
+
+        request.student_link          StudentLink (student_id, version, role) - SimpleLazyObject
+        await request.astudent_link() එයම async views සඳහා
+
+    AuthenticationMiddleware ට පසුව තිබිය යුතුය.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.student_link = SimpleLazyObject(partial(get_student_link, request))
+        request.astudent_link = partial(aget_student_link, request)
+        return self.get_response(request)
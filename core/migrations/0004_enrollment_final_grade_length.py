@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_create_superuser'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='enrollment',
+            name='final_grade',
+            field=models.CharField(blank=True, max_length=10, null=True),
+        ),
+    ]
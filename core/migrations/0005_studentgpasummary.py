@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:50
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+
+def populate_gpa_summaries(apps, schema_editor):
+    """ දැනට ඇති Enrollments වලින් GPA summary වගුව පිරවීම """
+    Enrollment = apps.get_model('core', 'Enrollment')
+    StudentGPASummary = apps.get_model('core', 'StudentGPASummary')
+    rows = (
+        Enrollment.objects
+        .filter(grade_point__isnull=False)
+        .order_by()
+        .values('student_id', 'course__semester')
+        .annotate(
+            credit_points=Sum(ExpressionWrapper(
+                F('grade_point') * F('course__credits'),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )),
+            credits=Sum('course__credits'),
+        )
+    )
+    StudentGPASummary.objects.bulk_create([
+        StudentGPASummary(
+            student_id=row['student_id'],
+            semester=row['course__semester'],
+            credit_points=row['credit_points'],
+            credits=row['credits'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_enrollment_final_grade_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentGPASummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.PositiveIntegerField()),
+                ('credit_points', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10)),
+                ('credits', models.PositiveIntegerField(default=0)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gpa_summaries', to='core.student')),
+            ],
+            options={
+                'ordering': ('semester',),
+                'unique_together': {('student', 'semester')},
+            },
+        ),
+        migrations.RunPython(populate_gpa_summaries, migrations.RunPython.noop),
+    ]
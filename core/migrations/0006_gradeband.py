@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:52
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# core.grading.DEFAULT_GRADE_BANDS හි පිටපතක් (migrations app code මත රඳා නොපැවතිය යුතුය)
+GRADE_BANDS = [
+    ('85', 'A+', '4.00'), ('80', 'A', '4.00'), ('75', 'A-', '3.70'), ('70', 'B+', '3.30'),
+    ('65', 'B', '3.00'), ('60', 'B-', '2.70'), ('55', 'C+', '2.30'), ('50', 'C', '2.00'),
+    ('45', 'C-', '1.70'), ('40', 'D+', '1.30'), ('35', 'D', '1.00'), ('0', 'E', '0.00'),
+]
+
+
+def seed_grade_bands(apps, schema_editor):
+    GradeBand = apps.get_model('core', 'GradeBand')
+    GradeBand.objects.bulk_create([
+        GradeBand(min_mark=Decimal(min_mark), grade=grade, grade_point=Decimal(gp))
+        for min_mark, grade, gp in GRADE_BANDS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_studentgpasummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_mark', models.DecimalField(decimal_places=2, max_digits=5, unique=True)),
+                ('grade', models.CharField(max_length=10)),
+                ('grade_point', models.DecimalField(decimal_places=2, max_digits=3)),
+            ],
+            options={
+                'ordering': ('-min_mark',),
+            },
+        ),
+        migrations.RunPython(seed_grade_bands, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_student_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecomputeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Running', 'Running'), ('Failed', 'Failed')], default='Pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('claimed_by', models.CharField(blank=True, max_length=64)),
+                ('error', models.TextField(blank=True)),
+                ('enrollment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recompute_jobs', to='core.enrollment')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='recomputejob_status_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'Pending')), fields=('enrollment',), name='unique_pending_recompute_job')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:04
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def populate_balances(apps, schema_editor):
+    """ දැනට ඇති Pending ගෙවීම් වලින් ශේෂ වගුව පිරවීම """
+    Payment = apps.get_model('core', 'Payment')
+    StudentBalance = apps.get_model('core', 'StudentBalance')
+    rows = (
+        Payment.objects
+        .filter(status='Pending')
+        .order_by()
+        .values('student_id')
+        .annotate(outstanding=Sum('amount'), pending_count=Count('id'), next_due_date=Min('due_date'))
+    )
+    StudentBalance.objects.bulk_create([
+        StudentBalance(
+            student_id=row['student_id'],
+            outstanding=row['outstanding'],
+            pending_count=row['pending_count'],
+            next_due_date=row['next_due_date'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_recomputejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('outstanding', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('next_due_date', models.DateField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'due_date'], name='payment_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['student', 'status'], name='payment_student_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='studentbalance',
+            name='student',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='balance', to='core.student'),
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:12
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def check_assessment_weights(apps, schema_editor):
+    """
+    assessment_weight_range constraint එකට පෙර - 1-100 පරාසයෙන් පිටත weights ඇත්නම් ඒවා
+    ලැයිස්තුගත කර නවතී. ඒවා ස්වයංක්‍රීයව වෙනස් කිරීමෙන් (clamp) ශ්‍රේණි වෙනස් වන නිසා
+    admin හරහා (හෝ shell) නිවැරදි කර නැවත migrate කළ යුතුය.
+    """
+    Assessment = apps.get_model('core', 'Assessment')
+    invalid = (
+        Assessment.objects.filter(models.Q(weight__lt=1) | models.Q(weight__gt=100))
+        .order_by('course__code', 'name')
+        .values_list('course__code', 'name', 'weight')
+    )
+    if invalid:
+        rows = '\n'.join(f"  {code} - {name}: weight {weight}" for code, name, weight in invalid)
+        raise RuntimeError(
+            f"Cannot add assessment_weight_range: {len(invalid)} assessments have a weight outside 1-100.\n"
+            f"{rows}\nFix these weights and run migrate again."
+        )
+
+
+def populate_course_totals(apps, schema_editor):
+    """ දැනට ඇති Assessments වලින් පාඨමාලා වල මුළු weight සහ ගණන """
+    Assessment = apps.get_model('core', 'Assessment')
+    Course = apps.get_model('core', 'Course')
+    totals = (
+        Assessment.objects.order_by().values('course_id')
+        .annotate(total_weight=Sum('weight'), assessment_count=Count('id'))
+    )
+    courses = []
+    for row in totals:
+        courses.append(Course(
+            pk=row['course_id'], total_weight=row['total_weight'], assessment_count=row['assessment_count'],
+        ))
+    Course.objects.bulk_update(courses, ['total_weight', 'assessment_count'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_feerun'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_assessment_weights, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='course',
+            name='assessment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='total_weight',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_course_totals, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='assessment',
+            constraint=models.CheckConstraint(condition=models.Q(('weight__gte', 1), ('weight__lte', 100)), name='assessment_weight_range'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:14
+
+import django.db.models.deletion
+from itertools import groupby
+
+from django.db import migrations, models
+
+
+def populate_attendance_summaries(apps, schema_editor):
+    """ දැනට ඇති Attendance පේළි වලින් (student, course) bitsets සෑදීම """
+    Attendance = apps.get_model('core', 'Attendance')
+    AttendanceSummary = apps.get_model('core', 'AttendanceSummary')
+    rows = (
+        Attendance.objects.order_by('student_id', 'course_id', 'date')
+        .values_list('student_id', 'course_id', 'date', 'status')
+        .iterator(chunk_size=5000)
+    )
+    batch = []
+    for (student_id, course_id), records in groupby(rows, key=lambda row: row[:2]):
+        recorded = present = 0
+        first_date = None
+        for _, _, date, status in records:
+            first_date = first_date or date
+            bit = 1 << (date - first_date).days
+            recorded |= bit
+            if status == 'P':
+                present |= bit
+        batch.append(AttendanceSummary(
+            student_id=student_id, course_id=course_id, first_date=first_date,
+            recorded_bits=recorded.to_bytes((recorded.bit_length() + 7) // 8, 'little'),
+            present_bits=present.to_bytes((present.bit_length() + 7) // 8, 'little'),
+            present_count=bin(present).count('1'),
+            absent_count=bin(recorded).count('1') - bin(present).count('1'),
+        ))
+        if len(batch) >= 1000:
+            AttendanceSummary.objects.bulk_create(batch)
+            batch = []
+    AttendanceSummary.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_course_assessment_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_date', models.DateField()),
+                ('recorded_bits', models.BinaryField(default=bytes)),
+                ('present_bits', models.BinaryField(default=bytes)),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='core.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='core.student')),
+            ],
+            options={
+                'unique_together': {('student', 'course')},
+            },
+        ),
+        migrations.RunPython(populate_attendance_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_attendancesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recomputejob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
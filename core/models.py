@@ -1,7 +1,19 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from decimal import Decimal
 
+
+def _active_scale():
+    """
+    core.grading.active_scale() - circular import නිසා පළමු ඇමතුමේදී import කර, මෙම
+    function එක එයින් ප්‍රතිස්ථාපනය කරයි (සෑම ලකුණකටම import statement එකක් නැත).
+    """
+    global _active_scale
+    from .grading import active_scale
+    _active_scale = active_scale
+    return active_scale()
+
 # -----------------
 # 1. Lecturer Model
 # -----------------
@@ -20,6 +32,17 @@ class Course(models.Model):
     lecturer = models.ForeignKey(Lecturer, on_delete=models.SET_NULL, null=True, blank=True)
     credits = models.PositiveIntegerField(default=3) # පාඨමාලා ඒකක (Credits)
     semester = models.PositiveIntegerField(default=1) # කුමන වාරයද (Semester)
+    # Assessments වලින් ව්‍යුත්පන්න - core/grading.refresh_course_weights() මගින් (signals)
+    total_weight = models.PositiveIntegerField(default=0, editable=False) # Σ Assessment.weight
+    assessment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Course catalogue පෙරහන් (filters) + code අනුව keyset pagination සඳහා
+        indexes = [
+            models.Index(fields=['semester', 'code'], name='course_semester_code_idx'),
+            models.Index(fields=['credits', 'code'], name='course_credits_code_idx'),
+            models.Index(fields=['lecturer', 'code'], name='course_lecturer_code_idx'),
+        ]
     
     def __str__(self):
         return f"{self.code}: {self.name}"
@@ -32,10 +55,29 @@ class Student(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
+    # ETag / page cache keys - core.versioning.bump_student_versions මගින් පමණක් වැඩි වේ (F() update)
+    data_version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Student search (core/search.py) - prefix range scan සඳහා lower-case expression indexes
+        # (PostgreSQL හි trigram GIN indexes migration 0008 මගින් සාදයි)
+        indexes = [
+            models.Index(Lower('student_id'), name='student_id_lower_idx'),
+            models.Index(Lower('name'), name='student_name_lower_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student_id} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        # පරණ instance එකක් save කිරීමෙන් data_version පසුපසට නොයාමට (පරණ cache entries නැවත වලංගු නොවීමට)
+        if self.pk is not None and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'data_version'
+            ]
+        super().save(*args, **kwargs)
+
     def calculate_sgpa(self, semester):
         """ මෙම ශිෂ්‍යයාගේ, ලබා දෙන වාරය (semester) සඳහා SGPA ගණනය කරයි """
         
@@ -84,6 +126,11 @@ class Assessment(models.Model):
     name = models.CharField(max_length=100) # උදා: "Quizzes", "Midterm", "Final Exam"
     weight = models.PositiveIntegerField() # උදා: 20 (එනම් 20%)
 
+    class Meta:
+        constraints = [
+            models.CheckConstraint(condition=models.Q(weight__gte=1, weight__lte=100), name='assessment_weight_range'),
+        ]
+
     def __str__(self):
         return f"{self.course.code} - {self.name} ({self.weight}%)"
 
@@ -110,7 +157,7 @@ class Enrollment(models.Model):
     
     # ස්වයංක්‍රීයව ගණනය වන ක්ෂේත්‍ර
     final_mark = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
-    final_grade = models.CharField(max_length=2, null=True, blank=True) # A+, B- etc.
+    final_grade = models.CharField(max_length=10, null=True, blank=True) # A+, B-, Pending etc.
     grade_point = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True) # 4.0, 3.7 etc.
 
     class Meta:
@@ -119,22 +166,16 @@ class Enrollment(models.Model):
     def __str__(self):
         return f"{self.student.name} enrolled in {self.course.name}"
 
-    def get_grade_from_mark(self, mark):
-        """ ලකුණ (Mark) ශ්‍රේණිය (Grade) සහ ශ්‍රේණි ලක්ෂ්‍යය (GP) බවට පරිවර්තනය කරයි """
-        if mark >= 85: return ('A+', Decimal('4.00'))
-        if mark >= 80: return ('A',  Decimal('4.00'))
-        if mark >= 75: return ('A-', Decimal('3.70'))
-        if mark >= 70: return ('B+', Decimal('3.30'))
-        if mark >= 65: return ('B',  Decimal('3.00'))
-        if mark >= 60: return ('B-', Decimal('2.70'))
-        if mark >= 55: return ('C+', Decimal('2.30'))
-        if mark >= 50: return ('C',  Decimal('2.00'))
-        if mark >= 45: return ('C-', Decimal('1.70'))
-        if mark >= 40: return ('D+', Decimal('1.30'))
-        if mark >= 35: return ('D',  Decimal('1.00'))
-        return ('E', Decimal('0.00')) # Fail
-
-    def calculate_final_mark(self):
+    def get_grade_from_mark(self, mark, scale=None):
+        """
+        ලකුණ (Mark) ශ්‍රේණිය (Grade) සහ ශ්‍රේණි ලක්ෂ්‍යය (GP) බවට පරිවර්තනය කරයි (GradeBand වගුව අනුව).
+        scale (GradingScale) ලබා නොදුන්නේ නම් process එකේ cache කළ පරිමාණය.
+        """
+        if scale is None:
+            scale = _active_scale()
+        return scale.classify(mark)
+
+    def calculate_final_mark(self, scale=None):
         """ මෙම පාඨමාලාව සඳහා ශිෂ්‍යයාගේ අවසාන ලකුණ (Final Mark) ගණනය කරයි """
         
         # මෙම පාඨමාලාවට අදාළ සියලුම Assessments (CA කොටස්)
@@ -143,17 +184,17 @@ class Enrollment(models.Model):
         student_marks = self.student.studentmark_set.filter(assessment__in=assessments)
 
         total_weighted_mark = Decimal('0.0')
-        total_weight = Decimal('0.0')
+        marks_present = 0
 
         for mark in student_marks:
             weight = Decimal(str(mark.assessment.weight))
             total_weighted_mark += (mark.marks * (weight / Decimal('100.0')))
-            total_weight += weight
+            marks_present += 1
 
-        # සියලුම CA කොටස් සඳහා ලකුණු ඇතුළත් කර ඇත්නම් (උදා: 100% ක්ම)
-        if total_weight == 100:
+        # පාඨමාලාවේ weights 100% ක් වන අතර, සියලුම CA කොටස් සඳහා ලකුණු ඇතුළත් කර ඇත්නම්
+        if self.course.total_weight == 100 and marks_present == self.course.assessment_count:
             self.final_mark = total_weighted_mark.quantize(Decimal('0.01'))
-            grade, gp = self.get_grade_from_mark(self.final_mark)
+            grade, gp = self.get_grade_from_mark(self.final_mark, scale)
             self.final_grade = grade
             self.grade_point = gp
         else:
@@ -194,6 +235,189 @@ class Payment(models.Model):
         ('Paid', 'Paid'),     # ගෙවා ඇත
     ]
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Pending')
+    # Fee run එකකින් සාදන ලද්දේ නම් - (fee_run, student) අනුපිටපත් නොවේ (rerun idempotent)
+    fee_run = models.ForeignKey('FeeRun', on_delete=models.PROTECT, null=True, blank=True, related_name='payments')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['fee_run', 'student'], name='unique_fee_run_payment'),
+        ]
+        indexes = [
+            # Overdue වාර්තාව: status='Pending' AND due_date < අද (range scan)
+            models.Index(fields=['status', 'due_date'], name='payment_status_due_idx'),
+            # ශිෂ්‍යයාගේ ගෙවීම් / ශේෂය (student, status)
+            models.Index(fields=['student', 'status'], name='payment_student_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.student_id} - {self.description}: {self.amount} ({self.status})"
+
+# -----------------
+# 9. StudentGPASummary Model (ශිෂ්‍යයාගේ වාරය අනුව GPA සාරාංශය)
+# -----------------
+class StudentGPASummary(models.Model):
+    """
+    එක් ශිෂ්‍යයෙකුගේ, එක් වාරයක (semester) Credit Points සහ Credits එකතුව.
+    core/gpa.py මගින් Enrollment / Course වෙනස් වන විට යාවත්කාලීන කරයි.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='gpa_summaries')
+    semester = models.PositiveIntegerField()
+    credit_points = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00')) # Σ (GP x Credits)
+    credits = models.PositiveIntegerField(default=0) # Σ Credits (GP ඇති පාඨමාලා පමණි)
+
+    class Meta:
+        unique_together = ('student', 'semester')
+        ordering = ('semester',)
+
+    def __str__(self):
+        return f"{self.student_id} - Semester {self.semester}: {self.sgpa}"
+
+    @property
+    def sgpa(self):
+        if self.credits == 0:
+            return Decimal('0.00')
+        return (self.credit_points / Decimal(self.credits)).quantize(Decimal('0.01'))
+
+
+
+# -----------------
+# 10. GradeBand Model (ශ්‍රේණි පරිමාණය - Admin හරහා වෙනස් කළ හැක)
+# -----------------
+class GradeBand(models.Model):
+    """ min_mark හෝ ඊට වැඩි ලකුණකට ලැබෙන ශ්‍රේණිය සහ GP """
+    min_mark = models.DecimalField(max_digits=5, decimal_places=2, unique=True) # උදා: 85.00
+    grade = models.CharField(max_length=10) # උදා: A+
+    grade_point = models.DecimalField(max_digits=3, decimal_places=2) # උදා: 4.00
+
+    class Meta:
+        ordering = ('-min_mark',)
+
+    def __str__(self):
+        return f"{self.grade} (>= {self.min_mark}): {self.grade_point}"
+
+
+
+# -----------------
+# 11. RecomputeJob Model (ශ්‍රේණි නැවත ගණනය කිරීමේ පෝලිම - DB queue)
+# -----------------
+class RecomputeJob(models.Model):
+    """
+    Enrollment එකක් නැවත ගණනය කිරීමට ඇති ඉල්ලීමක්. `recompute_worker` command එක
+    මගින් ක්‍රියාත්මක කරයි. එක් Enrollment එකකට ඇත්තේ එක් Pending job එකක් පමණි.
+    """
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'), # පෝලිමේ ඇත
+        ('Running', 'Running'), # worker එකක් ගණනය කරමින් පවතී
+        ('Failed', 'Failed'),   # දෝෂයක් - error බලන්න
+    ]
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.CASCADE, related_name='recompute_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    claimed_by = models.CharField(max_length=64, blank=True) # worker claim token
+    attempts = models.PositiveSmallIntegerField(default=0) # අසාර්ථක වූ වාර ගණන (MAX_ATTEMPTS දක්වා නැවත උත්සාහ)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            # (student, course) එකකට එක් Pending job එකක් - අනුපිටපත් එකට එකතු වේ
+            models.UniqueConstraint(
+                fields=['enrollment'], condition=models.Q(status='Pending'), name='unique_pending_recompute_job',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id'], name='recomputejob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.enrollment} ({self.status})"
+
+
+
+# -----------------
+# 12. StudentBalance Model (ශිෂ්‍යයාගේ ගෙවිය යුතු ශේෂය - ledger aggregate)
+# -----------------
+class StudentBalance(models.Model):
+    """
+    එක් ශිෂ්‍යයෙකුගේ Pending ගෙවීම් වල එකතුව. core/ledger.py මගින් Payment
+    වෙනස් වන විට යාවත්කාලීන කරයි - ශේෂය සඳහා Payment වගුව scan කිරීම අවශ්‍ය නැත.
+    """
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, related_name='balance')
+    outstanding = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00')) # Σ Pending amount
+    pending_count = models.PositiveIntegerField(default=0)
+    next_due_date = models.DateField(null=True, blank=True) # ළඟම Pending due_date
+
+    def __str__(self):
+        return f"{self.student_id}: {self.outstanding} ({self.pending_count} pending)"
+
+
+
+# -----------------
+# 13. FeeRun Model (ශිෂ්‍යයන් සියල්ලටම / පාඨමාලාවකට / වාරයකට එකවර ගාස්තු)
+# -----------------
+class FeeRun(models.Model):
+    """
+    ගාස්තු නියමයක් (fee rule) - core/fees.py මගින් ඉලක්ක ශිෂ්‍යයන් සඳහා Payment
+    පේළි සාදයි. එකම run_id එක නැවත ධාවනය කළද අනුපිටපත් Payments නොසෑදේ.
+    """
+    run_id = models.SlugField(max_length=64, unique=True) # උදා: exam-fee-2026-sem1
+    description = models.CharField(max_length=200) # Payment.description ලෙස
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    due_date = models.DateField(null=True, blank=True)
+    # ඉලක්කය: course (එහි ලියාපදිංචි ශිෂ්‍යයන්), semester (එම වාරයේ පාඨමාලාවකට ලියාපදිංචි), හෝ දෙකම නැත්නම් සියලුම ශිෂ්‍යයන්
+    course = models.ForeignKey(Course, on_delete=models.PROTECT, null=True, blank=True)
+    semester = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    payments_created = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.run_id}: {self.description} ({self.amount})"
+
+
+
+# -----------------
+# 14. AttendanceSummary Model (එක් ශිෂ්‍යයෙක්, එක් පාඨමාලාවක පැමිණීම - bitset)
+# -----------------
+class AttendanceSummary(models.Model):
+    """
+    (student, course) එකකට එක් පේළියක්. first_date සිට n වන දිනය = n වන bit එක
+    (little-endian). recorded_bits = සටහන් කළ දින, present_bits = පැමිණි දින.
+    core/attendance.py මගින් Attendance පේළි එන විට යාවත්කාලීන කරයි.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_summaries')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='attendance_summaries')
+    first_date = models.DateField() # bit 0 දිනය
+    recorded_bits = models.BinaryField(default=bytes)
+    present_bits = models.BinaryField(default=bytes)
+    present_count = models.PositiveIntegerField(default=0) # popcount(present_bits)
+    absent_count = models.PositiveIntegerField(default=0)  # popcount(recorded_bits) - present_count
+
+    class Meta:
+        unique_together = ('student', 'course')
+
+    def __str__(self):
+        return f"{self.student_id} - {self.course_id}: {self.present_count}/{self.total}"
+
+    @property
+    def total(self):
+        return self.present_count + self.absent_count
+
+    @property
+    def percentage(self):
+        return self.present_count * 100.0 / self.total if self.total else None
+
+
+# -----------------
+# 15. CacheVersion Model (cache keys සඳහා DB එකේ version අංක - සියලු workers එකම අගය)
+# -----------------
+class CacheVersion(models.Model):
+    """
+    Course catalogue, පාඨමාලා සංඛ්‍යාලේඛන වැනි cache කළ දේවල version එක. Per-process
+    (LocMem) cache එකක version එකක් තැබුවහොත් වෙනත් workers හි invalidation නොපෙනේ.
+    core/versioning.py (cache_version / bump_cache_versions) මගින් පමණක් භාවිතා කරයි.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
-        return f"{self.student.student_id} - {self.description}: {self.amount} ({self.status})"
\ No newline at end of file
+        return f"{self.key}: {self.version}"
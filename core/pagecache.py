@@ -0,0 +1,76 @@
+import os
+import pickle
+import zlib
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+# -----------------
+# Rendered page cache (student_dashboard)
+# -----------------
+# settings.CACHES['pages'] - LocMemCache (LRU, worker එකකට) හෝ LRUFileBasedCache
+# (workers සියල්ලටම පොදු). Keys වල ශිෂ්‍යයාගේ data version (Student.data_version -
+# DB එකෙන්, සියලු processes එකම අගය) ඇති නිසා පැරණි entries කිසි විටෙකත් නැවත
+# භාවිතා නොවේ; ඒවා LRU ලෙස ඉවත් වේ.
+
+_stats = {'hits': 0, 'misses': 0}
+
+
+class LRUFileBasedCache(FileBasedCache):
+    """
+    FileBasedCache, නමුත් hit එකකදී ගොනුවේ mtime යාවත්කාලීන කර, MAX_ENTRIES
+    ඉක්මවූ විට අහඹු ලෙස නොව අවම වශයෙන් භාවිතා වූ (least recently used) ගොනු ඉවත් කරයි.
+    """
+
+    def get(self, key, default=None, version=None):
+        fname = self._key_to_file(key, version)
+        try:
+            with open(fname, 'rb') as f:
+                if not self._is_expired(f):
+                    value = pickle.loads(zlib.decompress(f.read()))
+                    os.utime(fname)
+                    return value
+        except FileNotFoundError:
+            pass
+        return default
+
+    def _cull(self):
+        filelist = self._list_cache_files()
+        num_entries = len(filelist)
+        if num_entries < self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            return self.clear()
+
+        def last_used(fname):
+            try:
+                return os.path.getmtime(fname)
+            except FileNotFoundError:
+                return 0
+
+        for fname in sorted(filelist, key=last_used)[:int(num_entries / self._cull_frequency)]:
+            self._delete(fname)
+
+
+def get_or_render(key, render, timeout=DEFAULT_TIMEOUT):
+    """ 'pages' cache එකෙන් HTML ලබා දෙයි; නැත්නම් render() කර ගබඩා කරයි """
+    cache = caches['pages']
+    html = cache.get(key)
+    if html is not None:
+        _stats['hits'] += 1
+        return html
+    _stats['misses'] += 1
+    html = render()
+    cache.set(key, html, timeout)
+    return html
+
+
+def stats():
+    """ මෙම worker process එකේ hit / miss ගණන් (tuning සඳහා) """
+    total = _stats['hits'] + _stats['misses']
+    return {**_stats, 'hit_ratio': round(_stats['hits'] / total, 3) if total else None}
+
+
+def reset_stats():
+    _stats.update(hits=0, misses=0)
@@ -0,0 +1,139 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils.connection import ConnectionDoesNotExist
+
+logger = logging.getLogger('core.replicas')
+
+# -----------------
+# Read replicas (DATABASE_REPLICA_URLS)
+# -----------------
+# Report-heavy views / commands පමණක් `use_replica()` තුළ replica එකකින් කියවයි;
+# අනෙක් සියල්ල (සහ සියලුම writes) primary ('default') වෙත. Request එකක් තුළ write
+# එකක් සිදු වූ පසු, සහ POST එකකට පසු REPLICA_STICKY_SECONDS කාලයක් (cookie), එම
+# පරිශීලකයාගේ reads primary වෙතම යයි (read-your-writes). Replica එකක් සම්බන්ධ කර
+# ගත නොහැකි නම් REPLICA_HEALTH_INTERVAL කාලයක් එය මඟ හැර primary භාවිතා කරයි.
+
+PRIMARY = 'default'
+STICKY_COOKIE = 'db_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_read_alias = ContextVar('db_read_alias', default=None)
+_health = {} # alias -> (healthy, checked_at) - worker process එකකට
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def check_replica(alias):
+    """ Replica එක සම්බන්ධ කර ගත හැකිද (persistent connection එකක් නම් is_usable() මගින්) """
+    try:
+        connection = connections[alias]
+        connection.ensure_connection()
+        if connection.is_usable():
+            return True
+        connection.close() # ඊළඟ වතාවේ අලුතින් සම්බන්ධ වීමට
+    except (ConnectionDoesNotExist, DatabaseError):
+        pass
+    return False
+
+
+def is_healthy(alias):
+    now = time.monotonic()
+    state = _health.get(alias)
+    if state is not None and now - state[1] < getattr(settings, 'REPLICA_HEALTH_INTERVAL', 30):
+        return state[0]
+    healthy = check_replica(alias)
+    if not healthy and (state is None or state[0]):
+        logger.warning("Replica %s is down, reading from primary.", alias)
+    elif healthy and state is not None and not state[0]:
+        logger.info("Replica %s is back up.", alias)
+    _health[alias] = (healthy, now)
+    return healthy
+
+
+def reset_health():
+    _health.clear()
+
+
+def choose_read_alias():
+    """ සෞඛ්‍ය සම්පන්න replica එකක් අහඹු ලෙස; කිසිවක් නැත්නම් primary """
+    aliases = [alias for alias in replica_aliases() if is_healthy(alias)]
+    return random.choice(aliases) if aliases else PRIMARY
+
+
+def reading_from_replica():
+    return _read_alias.get() not in (None, PRIMARY)
+
+
+@contextmanager
+def use_replica():
+    """
+    මෙම block එක තුළ reads replica එකකින් (block එකකට එකම replica එක - queries අතර
+    lag වෙනස් නොවීමට). Primary වෙත pin කර ඇත්නම් (pin_primary) වෙනසක් නැත.
+    """
+    if _read_alias.get() is not None:
+        yield
+        return
+    token = _read_alias.set(choose_read_alias())
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def pin_primary():
+    """ මෙම block එක තුළ `use_replica()` තිබුණත් reads primary වෙතින් """
+    token = _read_alias.set(PRIMARY)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def cache_timeout(timeout):
+    """
+    Replica එකකින් render කළ දේ (lag නිසා පරණ විය හැක) version key එකක් යටතේ දිගු
+    කලක් cache නොකිරීමට - REPLICA_STICKY_SECONDS දක්වා කෙටි කරයි.
+    """
+    if reading_from_replica():
+        return min(timeout, getattr(settings, 'REPLICA_STICKY_SECONDS', 15))
+    return timeout
+
+
+def replica_reads(view):
+    """ GET / HEAD requests replica එකකින් - TemplateResponse ද block එක තුළම render කරයි """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        with use_replica():
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        return response
+    return wrapper
+
+
+class ReplicaRouter:
+    """ settings.DATABASE_ROUTERS - `use_replica()` තුළ පමණක් reads replica වෙත """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        if reading_from_replica():
+            _read_alias.set(PRIMARY) # read-your-writes: block එකේ ඉතිරි reads primary වෙතින්
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas primary හි පිටපත් නිසා, එකකින් ලබාගත් objects අනෙකේ objects සමඟ සම්බන්ධ කළ හැක
+        return True
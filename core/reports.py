@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .catalogue import CACHE_TIMEOUT, catalogue_version
+from .models import Course, Lecturer
+
+# -----------------
+# Lecturer workload report
+# -----------------
+
+
+def lecturer_choices():
+    """ Lecturer dropdown එක සඳහා [(id, name)] - cache කර ඇත (Lecturer save වූ විට අවලංගු වේ) """
+    key = f"lecturer-choices:{catalogue_version()}"
+    choices = cache.get(key)
+    if choices is None:
+        choices = list(Lecturer.objects.order_by('name').values_list('id', 'name'))
+        cache.set(key, choices, CACHE_TIMEOUT)
+    return choices
+
+
+def lecturer_workload(semester=None):
+    """
+    සියලුම කථිකාචාර්යවරුන්ගේ පාඨමාලා ගණන, මුළු Credits, ලියාපදිංචි ශිෂ්‍යයන් සහ
+    තවමත් ශ්‍රේණි (grades) නැති Enrollments - එක් annotated query එකකින්.
+    """
+    course_filter = Q() if semester is None else Q(course__semester=semester)
+    courses = Course.objects.filter(lecturer=OuterRef('pk'))
+    if semester is not None:
+        courses = courses.filter(semester=semester)
+    # Enrollments සමඟ JOIN කළ විට credits කිහිප වරක් එකතු වන නිසා, subquery එකකින්
+    total_credits = courses.order_by().values('lecturer').annotate(total=Sum('credits')).values('total')
+
+    return Lecturer.objects.annotate(
+        course_count=Count('course', filter=course_filter, distinct=True),
+        total_credits=Coalesce(Subquery(total_credits, output_field=IntegerField()), 0),
+        enrolled_students=Count('course__enrollment__student', filter=course_filter, distinct=True),
+        pending_grades=Count(
+            'course__enrollment',
+            filter=course_filter & Q(course__enrollment__grade_point__isnull=True),
+        ),
+    ).order_by('name')
@@ -0,0 +1,125 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Max, Min, Q, StdDev, Window
+from django.db.models.functions import Ntile, PercentRank, Rank
+
+from .models import Enrollment
+from .versioning import bump_cache_versions, cache_version
+
+# -----------------
+# Per-course result statistics (exam boards / lecturers)
+# -----------------
+# සාමාන්‍යය, standard deviation, ලකුණු පරාස (distribution) එක් aggregate query
+# එකකින්; ශ්‍රේණි histogram එක GROUP BY එකකින්; ශ්‍රේණිගත කිරීම (rank) window
+# functions (RANK, PERCENT_RANK, NTILE) මගින් - Python එකේ sort කිරීමක් නැත.
+# ප්‍රතිඵල පාඨමාලාවකට cache කරයි - key එකේ පාඨමාලාවේ version එක (DB එකේ CacheVersion)
+# ඇති නිසා Enrollments වෙනස් වූ විට සියලුම workers හි අවලංගු වේ.
+
+BIN_WIDTH = 10 # ලකුණු පරාස (අර්ධ විවෘත): [0, 10), [10, 20), ..., [90, 100]
+QUARTILES = 4
+CACHE_TIMEOUT = 600 # තත්පර - පැරණි versions වල ප්‍රතිඵල memory එකේ රැඳෙන උපරිම කාලය
+
+
+def _version_key(course_pk):
+    return f"course-statistics:{course_pk}"
+
+
+def forget_course_statistics(course_pks):
+    """ Enrollments (final_mark / grade) වෙනස් වූ පාඨමාලා - signals සහ bulk recompute මගින් """
+    bump_cache_versions(_version_key(pk) for pk in set(course_pks))
+
+
+def _two_places(value):
+    # Backend අනුව Decimal හෝ float - දශමස්ථාන දෙකක Decimal එකක් ලෙස
+    return Decimal(value).quantize(Decimal('0.01')) if value is not None else None
+
+
+def class_ranking(course):
+    """
+    ශ්‍රේණිගත කළ ශිෂ්‍යයන් (final_mark ඇති අය පමණි):
+    rank (සමාන ලකුණු = සමාන rank), percent_rank (0.0 = අවම, 1.0 = ඉහළම) සහ
+    quartile (1 = ඉහළම 25%).
+    """
+    by_mark = [F('final_mark').desc(), F('student__student_id').asc()]
+    return (
+        Enrollment.objects.filter(course=course, final_mark__isnull=False)
+        .annotate(
+            rank=Window(Rank(), order_by=F('final_mark').desc()),
+            percent_rank=Window(PercentRank(), order_by=F('final_mark').asc()),
+            quartile=Window(Ntile(QUARTILES), order_by=by_mark),
+        )
+        .order_by('rank', 'student__student_id')
+        .values(
+            'student__student_id', 'student__name', 'final_mark', 'final_grade',
+            'rank', 'percent_rank', 'quartile',
+        )
+    )
+
+
+def compute_course_statistics(course):
+    """ Cache නොකර - queries තුනකි (summary + distribution, grades, ranking) """
+    enrollments = Enrollment.objects.filter(course=course)
+    graded = enrollments.filter(final_mark__isnull=False)
+
+    bins = list(range(0, 100, BIN_WIDTH))
+    summary = enrollments.aggregate(
+        enrolled=Count('pk'),
+        graded=Count('final_mark'),
+        mean=Avg('final_mark'),
+        # Population std dev (සම්පූර්ණ පන්තිය) - Pending (NULL) ඒවා නොමැතිව
+        std_dev=StdDev('final_mark', filter=Q(final_mark__isnull=False)),
+        minimum=Min('final_mark'),
+        maximum=Max('final_mark'),
+        **{
+            f'bin_{low}': Count('pk', filter=Q(final_mark__gte=low) & (
+                Q(final_mark__lt=low + BIN_WIDTH) if low + BIN_WIDTH < 100 else Q(final_mark__lte=100)
+            ))
+            for low in bins
+        },
+    )
+
+    grades = (
+        graded.order_by().values('final_grade')
+        .annotate(count=Count('pk'), best=Max('final_mark'))
+        .order_by('-best') # ඉහළම ශ්‍රේණිය මුලින් (A+ සහ A එකම GP = 4.00 නිසා ලකුණු අනුව)
+    )
+
+    return {
+        'course': course.code,
+        'name': course.name,
+        'enrolled': summary['enrolled'],
+        'graded': summary['graded'],
+        'pending': summary['enrolled'] - summary['graded'],
+        'mean': _two_places(summary['mean']),
+        'std_dev': _two_places(summary['std_dev']),
+        'min': summary['minimum'],
+        'max': summary['maximum'],
+        'distribution': [
+            {
+                # 89.50 වැනි දශම ලකුණු [80, 90) තුළ - "80-89" ලෙස වැරදියට නොකියවීමට
+                'range': f"[{low}, {low + BIN_WIDTH})" if low + BIN_WIDTH < 100 else f"[{low}, 100]",
+                'count': summary[f'bin_{low}'],
+            }
+            for low in bins
+        ],
+        'grades': [{'grade': row['final_grade'], 'count': row['count']} for row in grades],
+        'ranking': [
+            {
+                'student_id': row['student__student_id'],
+                'name': row['student__name'],
+                'final_mark': row['final_mark'],
+                'grade': row['final_grade'],
+                'rank': row['rank'],
+                'percentile': round(row['percent_rank'] * 100, 1),
+                'quartile': row['quartile'],
+            }
+            for row in class_ranking(course)
+        ],
+    }
+
+
+def course_statistics(course, timeout=CACHE_TIMEOUT):
+    """ Cache එකෙන් (නැත්නම් ගණනය කර ගබඩා කරයි) - version එක කියවීමට එක් query එකක් """
+    key = f"{_version_key(course.pk)}:{cache_version(_version_key(course.pk))}"
+    return cache.get_or_set(key, lambda: compute_course_statistics(course), timeout)
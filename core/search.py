@@ -0,0 +1,45 @@
+from django.db import connection
+from django.db.models import Prefetch, Q
+from django.db.models.functions import Lower
+
+from .models import Enrollment, Student
+
+# -----------------
+# Student search (student_id / name)
+# -----------------
+# PostgreSQL: UPPER(...) LIKE lookups, trigram GIN indexes (migration 0008) මගින් වේගවත් වේ.
+# SQLite: Lower() expression indexes මත prefix range scan (>= q සහ < q + '\uffff').
+
+PAGE_SIZE = 20
+PREFIX_END = '\uffff' # ඕනෑම prefix එකකට පසුව එන උපරිම අක්ෂරය
+
+
+def search_students(query):
+    """ student_id හෝ නම (name) අනුව ශිෂ්‍යයන් සොයයි - student_id අනුව පෙළගස්වා ඇත """
+    query = query.strip()
+    students = Student.objects.only('student_id', 'name').order_by('student_id')
+    if not query:
+        return students.none()
+
+    if connection.vendor == 'postgresql':
+        return students.filter(Q(student_id__istartswith=query) | Q(name__icontains=query))
+
+    prefix = query.lower()
+    return students.alias(
+        student_id_lower=Lower('student_id'), name_lower=Lower('name'),
+    ).filter(
+        Q(student_id_lower__gte=prefix, student_id_lower__lt=prefix + PREFIX_END)
+        | Q(name_lower__gte=prefix, name_lower__lt=prefix + PREFIX_END)
+    )
+
+
+def student_report(student_id):
+    """
+    වාර්තාව සඳහා ශිෂ්‍යයා, Enrollments (Course සමඟ) සහ GPA summary එකවර prefetch කරයි.
+    සොයා ගත නොහැකි නම් Student.DoesNotExist.
+    """
+    enrollments = Enrollment.objects.select_related('course').order_by('course__semester', 'course__code')
+    return Student.objects.prefetch_related(
+        Prefetch('enrollment_set', queryset=enrollments),
+        'gpa_summaries',
+    ).get(student_id=student_id)
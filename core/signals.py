@@ -0,0 +1,159 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .attendance import apply_attendance
+from .catalogue import bump_catalogue_version
+from .gpa import refresh_gpa_summaries
+from .grading import clear_scale_cache, refresh_course_weights
+from .jobs import enqueue_on_commit
+from .ledger import refresh_balances
+from .results import forget_course_statistics
+from .versioning import bump_student_versions
+from .models import (
+    Assessment, Attendance, Course, Enrollment, GradeBand, Lecturer, Payment, Student, StudentMark
+)
+
+# -----------------
+# GPA Summary signals
+# -----------------
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    """ Enrollment එකේ grade_point වෙනස් වූ විට එම ශිෂ්‍යයාගේ summary යාවත්කාලීන කිරීම """
+    refresh_gpa_summaries([instance.student_id])
+    forget_course_statistics([instance.course_id])
+
+
+@receiver(post_save, sender=Course)
+def course_changed(sender, instance, created, **kwargs):
+    """ Course එකේ credits / semester වෙනස් වූ විට ලියාපදිංචි ශිෂ්‍යයන්ගේ summary යාවත්කාලීන කිරීම """
+    if created:
+        return
+    student_ids = list(instance.enrollment_set.values_list('student_id', flat=True))
+    refresh_gpa_summaries(student_ids)
+    bump_student_versions(student_ids)
+
+
+# -----------------
+# Fee ledger (ශේෂය)
+# -----------------
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def payment_changed(sender, instance, **kwargs):
+    refresh_balances([instance.student_id])
+
+
+# -----------------
+# Course weight totals (total_weight / assessment_count)
+# -----------------
+
+@receiver(pre_save, sender=Assessment)
+def assessment_moving(sender, instance, **kwargs):
+    """ Assessment එක වෙනත් පාඨමාලාවකට මාරු කරන්නේ නම් පැරණි පාඨමාලාවද යාවත්කාලීන කිරීමට """
+    instance._previous_course_id = None
+    if instance.pk is not None:
+        instance._previous_course_id = (
+            Assessment.objects.filter(pk=instance.pk).values_list('course_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Assessment)
+@receiver(post_delete, sender=Assessment)
+def assessment_weights_changed(sender, instance, **kwargs):
+    refresh_course_weights([instance.course_id, getattr(instance, '_previous_course_id', None)])
+
+
+# -----------------
+# Attendance summary (bitset)
+# -----------------
+
+@receiver(pre_save, sender=Attendance)
+def attendance_changing(sender, instance, **kwargs):
+    """ දිනය / පාඨමාලාව වෙනස් කරන්නේ නම් පැරණි bit එක ඉවත් කිරීමට """
+    instance._previous_attendance = None
+    if instance.pk is not None:
+        instance._previous_attendance = (
+            Attendance.objects.filter(pk=instance.pk).values_list('student_id', 'course_id', 'date').first()
+        )
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, **kwargs):
+    changes = []
+    previous = getattr(instance, '_previous_attendance', None)
+    if previous is not None and previous != (instance.student_id, instance.course_id, instance.date):
+        changes.append((*previous, None))
+    changes.append((instance.student_id, instance.course_id, instance.date, instance.status))
+    apply_attendance(changes)
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, **kwargs):
+    apply_attendance([(instance.student_id, instance.course_id, instance.date, None)])
+
+
+# -----------------
+# Grading scale cache
+# -----------------
+
+@receiver(post_save, sender=GradeBand)
+@receiver(post_delete, sender=GradeBand)
+def grade_band_changed(sender, **kwargs):
+    clear_scale_cache()
+
+
+# -----------------
+# Course catalogue cache
+# -----------------
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Lecturer)
+@receiver(post_delete, sender=Lecturer)
+def catalogue_changed(sender, **kwargs):
+    bump_catalogue_version()
+
+
+# -----------------
+# Recompute job queue
+# -----------------
+
+@receiver(post_save, sender=StudentMark)
+@receiver(post_delete, sender=StudentMark)
+def student_mark_changed(sender, instance, **kwargs):
+    """ ලකුණක් වෙනස් වූ විට එම ශිෂ්‍යයාගේ, එම පාඨමාලාවේ Enrollment එක පමණක් පෝලිමට """
+    enqueue_on_commit(Enrollment.objects.filter(
+        student_id=instance.student_id, course__assessment=instance.assessment_id,
+    ))
+
+
+@receiver(post_save, sender=Assessment)
+@receiver(post_delete, sender=Assessment)
+def assessment_changed(sender, instance, **kwargs):
+    """ Assessment (weight) වෙනස් වූ විට පාඨමාලාවේ සියලුම Enrollments පෝලිමට """
+    enqueue_on_commit(Enrollment.objects.filter(course_id=instance.course_id))
+
+
+# -----------------
+# Per-student data version (ETag / page cache)
+# -----------------
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_save, sender=StudentMark)
+@receiver(post_delete, sender=StudentMark)
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def student_data_changed(sender, instance, **kwargs):
+    bump_student_versions([instance.student_id])
+
+
+@receiver(post_save, sender=Student)
+def student_changed(sender, instance, created, **kwargs):
+    """ නම වැනි Student ක්ෂේත්‍ර ද dashboard fragment එකේ ඇත (Student.save() data_version නොලියයි) """
+    if not created:
+        bump_student_versions([instance.pk])
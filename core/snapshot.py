@@ -0,0 +1,177 @@
+import datetime
+import json
+import math
+import mmap
+import os
+import sys
+from array import array
+
+from django.utils import timezone
+
+from .models import Attendance, Enrollment, StudentMark
+
+try:
+    import numpy as np
+except ImportError:  # NumPy නොමැති නම් read_table() memoryview ලබා දෙයි
+    np = None
+
+# -----------------
+# Columnar snapshot (Analytics සඳහා)
+# -----------------
+# සෑම තීරුවක්ම (column) වෙනම little-endian binary ගොනුවකි + manifest.json.
+# ගොනු mmap / numpy.memmap මගින් පිටපත් නොකර (zero-copy) කියවිය හැක.
+# Categorical තීරු (course code, grade, status ...) dictionary codes (int32) ලෙස
+# ගබඩා වේ; අගයන් ලැයිස්තුව manifest එකේ ඇත.
+
+FORMAT_NAME = 'university-mis-columnar'
+FORMAT_VERSION = 1
+DEFAULT_CHUNK_SIZE = 5000
+
+EPOCH = datetime.date(1970, 1, 1)
+NULL_CODE = -1 # category / date null
+NULL_DATE = -(2 ** 31)
+
+# kind -> (array typecode, numpy dtype)
+KINDS = {
+    'int': ('q', '<i8'),
+    'float': ('d', '<f8'), # null = NaN
+    'date': ('i', '<i4'),  # 1970-01-01 සිට දින ගණන
+    'category': ('i', '<i4'),
+}
+
+# table -> (queryset, [(column, ORM lookup, kind)])
+TABLES = {
+    'enrollment': (Enrollment.objects.all, 'course__semester', [
+        ('id', 'id', 'int'),
+        ('student', 'student_id', 'int'),
+        ('student_id', 'student__student_id', 'category'),
+        ('course', 'course__code', 'category'),
+        ('semester', 'course__semester', 'int'),
+        ('credits', 'course__credits', 'int'),
+        ('final_mark', 'final_mark', 'float'),
+        ('final_grade', 'final_grade', 'category'),
+        ('grade_point', 'grade_point', 'float'),
+    ]),
+    'studentmark': (StudentMark.objects.all, 'assessment__course__semester', [
+        ('student', 'student_id', 'int'),
+        ('course', 'assessment__course__code', 'category'),
+        ('assessment', 'assessment__name', 'category'),
+        ('weight', 'assessment__weight', 'int'),
+        ('marks', 'marks', 'float'),
+    ]),
+    'attendance': (Attendance.objects.all, 'course__semester', [
+        ('student', 'student_id', 'int'),
+        ('course', 'course__code', 'category'),
+        ('date', 'date', 'date'),
+        ('status', 'status', 'category'),
+    ]),
+}
+
+
+class _Column:
+    """ එක් තීරුවක් chunk වශයෙන් ගොනුවට append කරයි; categories incremental ලෙස සාදයි """
+
+    def __init__(self, directory, table, name, kind):
+        self.name = name
+        self.kind = kind
+        self.filename = f"{table}.{name}.bin"
+        self.typecode, self.dtype = KINDS[kind]
+        self.codes = {} if kind == 'category' else None
+        self.buffer = array(self.typecode)
+        self.file = open(os.path.join(directory, self.filename), 'wb')
+
+    def append(self, value):
+        if self.kind == 'float':
+            value = math.nan if value is None else float(value)
+        elif self.kind == 'date':
+            value = NULL_DATE if value is None else (value - EPOCH).days
+        elif self.kind == 'category':
+            value = NULL_CODE if value is None else self.codes.setdefault(value, len(self.codes))
+        self.buffer.append(value)
+
+    def flush(self):
+        if sys.byteorder == 'big':
+            self.buffer.byteswap()
+        self.buffer.tofile(self.file)
+        self.buffer = array(self.typecode)
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def describe(self):
+        meta = {'file': self.filename, 'kind': self.kind, 'dtype': self.dtype}
+        if self.codes is not None:
+            meta['categories'] = list(self.codes) # dict insertion order == code order
+            meta['null'] = NULL_CODE
+        elif self.kind == 'date':
+            meta['epoch'] = EPOCH.isoformat()
+            meta['null'] = NULL_DATE
+        return meta
+
+
+def write_table(directory, table, semester=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ එක් වගුවක් streaming ලෙස තීරු ගොනු වලට ලියයි; manifest කොටස ලබා දෙයි """
+    queryset, semester_lookup, spec = TABLES[table]
+    rows = queryset()
+    if semester is not None:
+        rows = rows.filter(**{semester_lookup: semester})
+    rows = rows.order_by('pk').values_list(*[lookup for column, lookup, kind in spec])
+
+    columns = [_Column(directory, table, column, kind) for column, lookup, kind in spec]
+    count = 0
+    try:
+        for row in rows.iterator(chunk_size=chunk_size):
+            for column, value in zip(columns, row):
+                column.append(value)
+            count += 1
+            if count % chunk_size == 0:
+                for column in columns:
+                    column.flush()
+    finally:
+        for column in columns:
+            column.close()
+    return {'rows': count, 'columns': {column.name: column.describe() for column in columns}}
+
+
+def export_snapshot(directory, tables=None, semester=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ තෝරාගත් වගු snapshot එකක් ලෙස directory එකට ලියා manifest එක ලබා දෙයි """
+    os.makedirs(directory, exist_ok=True)
+    manifest = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'created_at': timezone.now().isoformat(),
+        'semester': semester,
+        'tables': {},
+    }
+    for table in tables or TABLES:
+        manifest['tables'][table] = write_table(directory, table, semester=semester, chunk_size=chunk_size)
+    # manifest එක අවසානයේ ලියයි - එය නැත්නම් snapshot එක අසම්පූර්ණයි
+    with open(os.path.join(directory, 'manifest.json'), 'w') as out:
+        json.dump(manifest, out, indent=2)
+    return manifest
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, 'manifest.json')) as stream:
+        return json.load(stream)
+
+
+def read_table(directory, table):
+    """
+    Snapshot වගුවක තීරු {column: values} ලෙස mmap කර ලබා දෙයි (පිටපත් නොකරයි).
+    NumPy ඇත්නම් numpy.memmap, නැත්නම් memoryview. Categories manifest එකේ ඇත.
+    """
+    meta = read_manifest(directory)['tables'][table]
+    result = {}
+    for name, column in meta['columns'].items():
+        path = os.path.join(directory, column['file'])
+        if meta['rows'] == 0:
+            result[name] = [] if np is None else np.empty(0, dtype=column['dtype'])
+        elif np is not None:
+            result[name] = np.memmap(path, dtype=column['dtype'], mode='r', shape=(meta['rows'],))
+        else:
+            with open(path, 'rb') as stream:
+                mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            result[name] = memoryview(mapped).cast(KINDS[column['kind']][0])
+    return result
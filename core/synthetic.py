@@ -0,0 +1,99 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.db import transaction
+
+from .attendance import rebuild_summaries
+from .grading import recompute_final_marks, refresh_course_weights
+from .ledger import refresh_balances
+from .models import (
+    Assessment, Attendance, Course, Enrollment, Lecturer, Payment, Student, StudentMark
+)
+
+# -----------------
+# Synthetic data generator (benchmarks / load tests)
+# -----------------
+# එකම seed එකකින් සැමවිටම එකම දත්ත. සියලු වගු bulk_create මගින් පුරවයි;
+# අවසානයේ ශ්‍රේණි, GPA summary සහ ශේෂ (balances) set-based ලෙස ගණනය කරයි.
+
+BATCH_SIZE = 2000
+ASSESSMENT_WEIGHTS = ((40, 60), (20, 30, 50), (100,), (10, 20, 30, 40))
+START_DATE = datetime.date(2025, 1, 6)
+
+
+def generate(students, courses, enrollments_per_student=6, attendance_days=10, payments_per_student=2,
+             seed=42, prefix='SYN'):
+    """
+    students ශිෂ්‍යයන්, courses පාඨමාලා (assessments සමඟ), ලකුණු, පැමිණීම සහ ගෙවීම් සාදයි.
+    ගණන් {model: count} ලෙස ලබා දෙයි. prefix අනුව සැබෑ දත්ත වලින් වෙන් කර හඳුනාගත හැක.
+    """
+    rng = random.Random(seed)
+    counts = {}
+
+    def create(model, objects):
+        created = model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+        counts[model.__name__] = counts.get(model.__name__, 0) + len(created)
+        return created
+
+    with transaction.atomic():
+        lecturers = create(Lecturer, [
+            Lecturer(name=f"{prefix} Lecturer {i}", email=f"{prefix.lower()}-lecturer{i}@synthetic.invalid")
+            for i in range(max(1, courses // 10))
+        ])
+        course_list = create(Course, [
+            Course(
+                code=f"{prefix}{i:05}", name=f"{prefix} Course {i}", lecturer=lecturers[i % len(lecturers)],
+                credits=rng.randint(1, 4), semester=1 + i % 8,
+            )
+            for i in range(courses)
+        ])
+        assessments = {}
+        for course in course_list:
+            weights = ASSESSMENT_WEIGHTS[rng.randrange(len(ASSESSMENT_WEIGHTS))]
+            assessments[course.pk] = [
+                Assessment(course=course, name=f"Assessment {n + 1}", weight=weight)
+                for n, weight in enumerate(weights)
+            ]
+        create(Assessment, [a for course_assessments in assessments.values() for a in course_assessments])
+
+        student_list = create(Student, [
+            Student(student_id=f"{prefix}{i:07}", name=f"{prefix} Student {i}",
+                    email=f"{prefix.lower()}{i}@synthetic.invalid")
+            for i in range(students)
+        ])
+
+        per_student = min(enrollments_per_student, len(course_list))
+        enrollments, marks, attendance, payments = [], [], [], []
+        for student in student_list:
+            for course in rng.sample(course_list, per_student):
+                enrollments.append(Enrollment(student=student, course=course))
+                for assessment in assessments[course.pk]:
+                    if rng.random() < 0.97: # සමහර ලකුණු නැත (Pending)
+                        marks.append(StudentMark(
+                            student=student, assessment=assessment, marks=Decimal(rng.randrange(0, 10001)).scaleb(-2),
+                        ))
+                for day in range(attendance_days):
+                    attendance.append(Attendance(
+                        student=student, course=course, date=START_DATE + datetime.timedelta(days=7 * day),
+                        status='P' if rng.random() < 0.85 else 'A',
+                    ))
+            for n in range(payments_per_student):
+                payments.append(Payment(
+                    student=student, description=f"{prefix} Fee {n + 1}", amount=Decimal(rng.randrange(500, 5001)),
+                    due_date=START_DATE + datetime.timedelta(days=30 * n),
+                    status='Paid' if rng.random() < 0.6 else 'Pending',
+                ))
+        create(Enrollment, enrollments)
+        create(StudentMark, marks)
+        create(Attendance, attendance)
+        create(Payment, payments)
+
+        # bulk_create signals නොයවයි - weight totals, ශ්‍රේණි (+ GPA summary), පැමිණීම සහ ශේෂ set-based ලෙස
+        refresh_course_weights([course.pk for course in course_list])
+        rebuild_summaries([course.pk for course in course_list])
+        recompute_final_marks(Enrollment.objects.filter(course__in=course_list))
+        student_ids = [student.pk for student in student_list]
+        for start in range(0, len(student_ids), BATCH_SIZE):
+            refresh_balances(student_ids[start:start + BATCH_SIZE])
+    return counts
@@ -1,3 +1,1266 @@
-from django.test import TestCase
+import datetime
+import json
+import math
+import random
+import statistics
+import tempfile
+import zipfile
+from unittest import mock
+from io import BytesIO, StringIO
+from decimal import Decimal
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import admin as core_admin, benchmarks, catalogue, grading, metrics, pagecache, replicas, synthetic
+from .attendance import at_risk, record_roster, summary_days, with_attendance_percentage
+from .catalogue import catalogue_page
+from .fees import FeeRunError, get_fee_run, run_fees
+from .gpa import summary_gpa
+from .grading import GradingScale, active_scale, recompute_final_marks, refresh_course_weights
+from .forms import AssessmentForm
+from .importers import MarkImportError, import_marks, parse_mark_file
+from .jobs import MAX_ATTEMPTS, enqueue_enrollments, work
+from .middleware import ReplicaRoutingMiddleware, StudentMiddleware
+from .ledger import outstanding_balance, overdue_csv_rows
+from .management.commands.benchmark_grading import legacy_grade_from_mark
+from .reports import lecturer_workload
+from .results import course_statistics
+from .search import search_students
+from .snapshot import read_manifest, read_table
+from .transcripts import load_transcripts, write_transcripts
+from .versioning import bump_cache_versions, bump_student_versions
+from .models import (
+    Assessment, Attendance, AttendanceSummary, Course, Enrollment, FeeRun, GradeBand, Lecturer, Payment, RecomputeJob, Student,
+    StudentBalance, StudentGPASummary, StudentMark,
+)
+
+
+class GradingTestMixin:
+    """ පාඨමාලා දෙකක් සහ ශිෂ්‍යයන් කිහිප දෙනෙකු සහිත පොදු දත්ත """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(code='CS101', name='Programming', credits=3, semester=1)
+        cls.other_course = Course.objects.create(code='CS201', name='Databases', credits=2, semester=2)
+        ca = Assessment.objects.create(course=cls.course, name='CA', weight=40)
+        final = Assessment.objects.create(course=cls.course, name='Final Exam', weight=60)
+        other = Assessment.objects.create(course=cls.other_course, name='Final Exam', weight=100)
+
+        cls.students = []
+        for i, (ca_mark, final_mark) in enumerate([
+            ('84.99', '84.99'), ('85.00', '85.00'), ('34.98', '35.01'), ('72.35', '61.10'), ('50.00', None),
+        ]):
+            student = Student.objects.create(student_id=f'S{i:03}', name=f'Student {i}', email=f's{i}@uni.lk')
+            Enrollment.objects.create(student=student, course=cls.course)
+            Enrollment.objects.create(student=student, course=cls.other_course)
+            StudentMark.objects.create(student=student, assessment=ca, marks=Decimal(ca_mark))
+            if final_mark is not None:
+                StudentMark.objects.create(student=student, assessment=final, marks=Decimal(final_mark))
+            StudentMark.objects.create(student=student, assessment=other, marks=Decimal('66.66'))
+            cls.students.append(student)
+
+    def grades(self):
+        return {
+            e.pk: (e.final_mark, e.final_grade, e.grade_point)
+            for e in Enrollment.objects.all()
+        }
+
+
+class BulkGradingTests(GradingTestMixin, TestCase):
+
+    def test_matches_calculate_final_mark(self):
+        for enrollment in Enrollment.objects.all():
+            enrollment.calculate_final_mark()
+        expected = self.grades()
+        Enrollment.objects.update(final_mark=None, final_grade=None, grade_point=None)
+
+        processed, changed = recompute_final_marks(batch_size=3)
+
+        self.assertEqual(processed, 10)
+        self.assertEqual(changed, 10)
+        self.assertEqual(self.grades(), expected)
+
+    def test_pending_when_weights_incomplete(self):
+        recompute_final_marks()
+        enrollment = Enrollment.objects.get(student=self.students[4], course=self.course)
+        self.assertEqual(enrollment.final_grade, 'Pending')
+        self.assertIsNone(enrollment.final_mark)
+
+    def test_rerun_changes_nothing(self):
+        recompute_final_marks()
+        self.assertEqual(recompute_final_marks(), (10, 0))
+
+    def test_query_count_is_constant(self):
+        # grade bands, enrollments (+ course totals), assessment weights (පාඨමාලාවට එක් වරක්), marks,
+        # bulk_update + GPA summary refresh (aggregate, stale rows, upsert) + student data versions
+        # + course statistics versions
+        with self.assertNumQueries(14):
+            recompute_final_marks(Enrollment.objects.filter(course__semester=1))
+
+
+class GPASummaryTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        recompute_final_marks()
+
+    def assertSummaryMatchesLive(self):
+        for student in Student.objects.all():
+            sgpa_by_semester, cgpa = summary_gpa(student)
+            for semester in (1, 2):
+                self.assertEqual(sgpa_by_semester.get(semester, Decimal('0.00')), student.calculate_sgpa(semester))
+            self.assertEqual(cgpa, student.calculate_cgpa())
+
+    def test_bulk_recompute_maintains_summary(self):
+        self.assertSummaryMatchesLive()
+
+    def test_course_credit_change(self):
+        self.course.credits = 5
+        self.course.save()
+        self.assertSummaryMatchesLive()
+
+    def test_enrollment_delete(self):
+        Enrollment.objects.filter(course=self.other_course).delete()
+        self.assertFalse(StudentGPASummary.objects.filter(semester=2).exists())
+        self.assertSummaryMatchesLive()
+
+    def test_rebuild_command(self):
+        StudentGPASummary.objects.all().delete()
+        call_command('rebuild_gpa_summary', stdout=StringIO())
+        self.assertSummaryMatchesLive()
+
+
+class StudentDashboardTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches['pages'].clear()
+        recompute_final_marks()
+        self.student = self.students[0]
+        self.student.user = User.objects.create_user('s000', password='pass')
+        self.student.save()
+        self.client.force_login(self.student.user)
+
+    def test_renders_every_semester(self):
+        third = Course.objects.create(code='CS301', name='Compilers', semester=3)
+        Enrollment.objects.create(student=self.student, course=third)
+        response = self.client.get(reverse('student-dashboard'))
+        self.assertEqual(
+            [semester for semester, sgpa in response.context['semester_gpa_list']], [1, 2, 3]
+        )
+        self.assertEqual(response.context['cgpa'], self.student.calculate_cgpa())
+
+    def test_query_count_independent_of_enrollments(self):
+        # user, user -> student (data version සමඟ), student, enrollments, balance, GPA summary, attendance,
+        # payments - session cache එකෙන් (cached_db)
+        with self.assertNumQueries(8):
+            self.client.get(reverse('student-dashboard'))
+
+    def test_page_cache_hit_until_student_data_changes(self):
+        pagecache.reset_stats()
+        self.client.get(reverse('student-dashboard'))
+        # user සහ user -> student (data version සමඟ) පමණි - session සහ rendered page cache එකෙන්
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('student-dashboard'))
+        self.assertContains(response, 'CS101')
+        self.assertEqual(pagecache.stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+        Payment.objects.create(student=self.student, description='Library Fine', amount=Decimal('250'))
+        self.assertContains(self.client.get(reverse('student-dashboard')), 'Library Fine')
+        self.assertEqual(pagecache.stats()['misses'], 2)
+
+        # Student ක්ෂේත්‍ර (නම) ද fragment එකේ - save() version එක වෙනස් කරයි
+        student = Student.objects.get(pk=self.student.pk)
+        student.name = 'Renamed Student'
+        student.save()
+        self.assertContains(self.client.get(reverse('student-dashboard')), 'Renamed Student')
+
+
+class GradingScaleTests(TestCase):
+    EDGES = [
+        '0', '34.99', '35', '39.99', '40', '44.99', '45', '49.99', '50', '54.99', '55', '59.99',
+        '60', '64.99', '65', '69.99', '70', '74.99', '75', '79.99', '80', '84.99', '85', '100',
+    ]
+
+    def test_band_edges_match_legacy_if_chain(self):
+        scale = GradingScale.load()
+        marks = [Decimal(edge) for edge in self.EDGES]
+        expected = [legacy_grade_from_mark(mark) for mark in marks]
+        self.assertEqual([scale.classify(mark) for mark in marks], expected)
+        self.assertEqual(scale.classify_many(marks), expected)
+
+    def test_classify_many_without_numpy(self):
+        scale = GradingScale(grading.DEFAULT_GRADE_BANDS)
+        marks = [Decimal(edge) for edge in self.EDGES]
+        numpy, grading.np = grading.np, None
+        try:
+            self.assertEqual(scale.classify_many(marks), [legacy_grade_from_mark(m) for m in marks])
+        finally:
+            grading.np = numpy
+
+    def test_scale_must_start_at_zero(self):
+        with self.assertRaisesMessage(ValueError, 'must start at 0'):
+            GradingScale([(Decimal('40'), 'P', Decimal('2.00')), (Decimal('70'), 'A', Decimal('4.00'))])
+
+        self.client.force_login(User.objects.get(username='admin'))
+        band = GradeBand.objects.get(min_mark=0)
+        response = self.client.post(reverse('admin:core_gradeband_change', args=[band.pk]), {
+            'min_mark': '10', 'grade': band.grade, 'grade_point': band.grade_point,
+        })
+        self.assertContains(response, 'must start at 0')
+        self.assertEqual(self.client.get(reverse('admin:core_gradeband_delete', args=[band.pk])).status_code, 403)
+
+    def test_configured_band_is_used(self):
+        self.addCleanup(grading.clear_scale_cache) # rollback වූ bands process එකේ නොරැඳීමට
+        GradeBand.objects.get(grade='E').save()
+        self.assertEqual(active_scale().classify(Decimal('30')), ('E', Decimal('0.00')))
+        # එක් ලකුණක් සඳහා DB query නැත (cache කළ පරිමාණය)
+        with self.assertNumQueries(0):
+            Enrollment().get_grade_from_mark(Decimal('30'))
+        # Signals නොයවන update() - වෙනත් process එකක වෙනසක් ලෙස: SCALE_RECHECK_SECONDS පසු හඳුනා ගනී
+        GradeBand.objects.filter(grade='D').update(min_mark=Decimal('30'))
+        self.assertEqual(active_scale().classify(Decimal('30')), ('E', Decimal('0.00')))
+        with mock.patch.object(grading, 'SCALE_RECHECK_SECONDS', 0):
+            self.assertEqual(active_scale().classify(Decimal('30')), ('D', Decimal('1.00')))
+
+
+class MarkImportTests(GradingTestMixin, TestCase):
+    CSV = (
+        "Student_ID,Course,Assessment,Marks\n"
+        "S004,CS101,Final Exam,70\n"
+        "S003,cs101,final exam,80.5\n"
+        "S999,CS101,Final Exam,50\n"
+        "S000,CS101,Lab,50\n"
+        "S001,CS101,CA,abc\n"
+        "S001,CS101,CA,101\n"
+    )
+
+    def test_upserts_and_reports_bad_rows(self):
+        report = import_marks(parse_mark_file(BytesIO(self.CSV.encode()), 'marks.csv'), chunk_size=1)
+
+        self.assertEqual((report.rows_read, report.rows_imported), (6, 2))
+        self.assertEqual([line for line, message in report.errors], [4, 5, 6, 7])
+        mark = StudentMark.objects.get(
+            student=self.students[3], assessment__course=self.course, assessment__name='Final Exam'
+        )
+        self.assertEqual(mark.marks, Decimal('80.50'))
+        enrollment = Enrollment.objects.get(student=self.students[4], course=self.course)
+        self.assertEqual(enrollment.final_mark, Decimal('62.00'))
+
+    def test_short_and_non_finite_rows_are_reported(self):
+        csv_file = (
+            "student_id,course,assessment,marks\n"
+            "S004,CS101,Final Exam,70\n"
+            "S003,CS101,Final Exam\n"
+            "S002,CS101,Final Exam,NaN\n"
+            "S001,CS101,Final Exam,Infinity\n"
+        )
+        report = import_marks(parse_mark_file(BytesIO(csv_file.encode()), 'marks.csv'), chunk_size=1)
+        self.assertEqual((report.rows_read, report.rows_imported), (4, 1))
+        self.assertEqual([line for line, message in report.errors], [3, 4, 5])
+        # ගොනුව මැද නොනැවතුණු නිසා recompute ද සිදු විය
+        self.assertEqual(report.enrollments_recomputed, 1)
+
+    def test_missing_column_rejected_before_writing(self):
+        with self.assertRaises(MarkImportError):
+            import_marks(parse_mark_file(BytesIO(b"student_id,marks\nS004,70\n"), 'marks.csv'))
+        self.assertFalse(StudentMark.objects.filter(marks=Decimal('70')).exists())
+
+    def test_admin_upload_for_single_assessment(self):
+        admin_user = User.objects.get(username='admin')
+        self.client.force_login(admin_user)
+        final = Assessment.objects.get(course=self.course, name='Final Exam')
+        upload = SimpleUploadedFile('marks.csv', b"student_id,marks\nS004,70\n")
+        response = self.client.post(
+            reverse('admin:core_studentmark_import'), {'file': upload, 'assessment': final.pk}, follow=True
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(StudentMark.objects.filter(student=self.students[4], assessment=final).exists())
+
+
+class AttendanceRosterTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.get(username='admin'))
+
+    def post_roster(self, date, records):
+        return self.client.post(
+            reverse('api-attendance-roster', args=[self.course.code]),
+            json.dumps({'date': date, 'records': records}),
+            content_type='application/json',
+        )
+
+    def test_roster_upsert_in_constant_queries(self):
+        records = {student.student_id: 'P' for student in self.students}
+        records['S999'] = 'P'
+        # user, course, enrollments, savepoint, upsert, attendance summaries (select, upsert),
+        # data versions, release - session cache එකෙන් (cached_db), Student lookup එකක් නැත (lazy)
+        with self.assertNumQueries(9):
+            response = self.post_roster('2025-01-06', records)
+        self.assertEqual(response.json()['saved'], 5)
+        self.assertIn('S999', response.json()['errors'])
+
+        self.post_roster('2025-01-06', {'S000': 'A'})
+        self.assertEqual(Attendance.objects.filter(date='2025-01-06').count(), 5)
+        self.assertEqual(Attendance.objects.get(student=self.students[0], date='2025-01-06').status, 'A')
+
+    def test_non_string_status_reported(self):
+        response = self.post_roster('2025-01-06', {'S000': ['P'], 'S001': {'status': 'P'}, 'S002': 'P'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['saved'], 1)
+        self.assertEqual(set(response.json()['errors']), {'S000', 'S001'})
+
+    def test_percentages(self):
+        self.post_roster('2025-01-06', {'S000': 'P', 'S001': 'A'})
+        self.post_roster('2025-01-07', {'S000': 'A', 'S001': 'A'})
+        response = self.client.get(reverse('api-course-attendance', args=[self.course.code]))
+        data = response.json()
+        self.assertEqual(data['percentage'], 25.0)
+        self.assertEqual([row['percentage'] for row in data['students']], [50.0, 0.0])
+
+    def test_roster_page(self):
+        response = self.client.get(reverse('attendance-roster', args=[self.course.code]), {'date': '2025-01-06'})
+        self.assertEqual(len(response.context['roster']), 5)
+
+
+class CourseCatalogueTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer = Lecturer.objects.create(name='Dr. Perera', email='perera@uni.lk')
+        Course.objects.bulk_create([
+            Course(code=f'C{i:03}', name=f'Course {i}', semester=1 + i % 2, lecturer=cls.lecturer if i % 3 else None)
+            for i in range(25)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_keyset_pages_cover_every_course_once(self):
+        codes, cursor = [], None
+        while True:
+            courses, previous_cursor, cursor = catalogue_page(after=cursor, page_size=10)
+            codes += [course.code for course in courses]
+            if cursor is None:
+                break
+        self.assertEqual(codes, sorted(Course.objects.values_list('code', flat=True)))
+
+        courses, previous_cursor, next_cursor = catalogue_page(before='C020', page_size=10)
+        self.assertEqual([c.code for c in courses], [f'C{i:03}' for i in range(10, 20)])
+        self.assertEqual((previous_cursor, next_cursor), ('C010', 'C019'))
+
+    def test_filters(self):
+        courses, _, _ = catalogue_page(semester=2, lecturer_id=self.lecturer.pk)
+        self.assertTrue(courses)
+        self.assertTrue(all(c.semester == 2 and c.lecturer_id == self.lecturer.pk for c in courses))
+
+    def test_cached_fragment_is_invalidated_on_save(self):
+        self.client.get(reverse('course-list'))
+        # catalogue version (DB එකෙන් - සියලු workers එකම අගය) පමණි
+        with self.assertNumQueries(1):
+            self.client.get(reverse('course-list'))
+
+        # වෙනත් worker එකක save එකක් (මෙම process එකේ cache එක ස්පර්ශ නොකරයි)
+        Course.objects.filter(code='C000').update(name='Renamed Course')
+        bump_cache_versions([catalogue.VERSION_KEY])
+        self.assertContains(self.client.get(reverse('course-list')), 'Renamed Course')
+
+        self.lecturer.name = 'Prof. Perera'
+        self.lecturer.save()
+        self.assertContains(self.client.get(reverse('course-list')), 'Prof. Perera')
+
+
+class StudentReportSearchTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        recompute_final_marks()
+
+    def test_prefix_and_name_search(self):
+        self.assertEqual(search_students('s00').count(), 5)
+        self.assertEqual(list(search_students('student 3').values_list('student_id', flat=True)), ['S003'])
+        self.assertFalse(search_students('x').exists())
+
+    def test_exact_id_renders_report_from_prefetched_queries(self):
+        # student, enrollments + courses, GPA summaries
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('student-report-search'), {'student_id_query': 'S001'})
+        self.assertEqual(response.context['student_found'], self.students[1])
+        self.assertEqual(response.context['cgpa'], self.students[1].calculate_cgpa())
+        self.assertContains(response, 'A+')
+
+    def test_multiple_matches_are_paginated(self):
+        self.client.force_login(User.objects.get(username='admin'))
+        response = self.client.get(reverse('student-report-search'), {'student_id_query': 'Student'})
+        self.assertEqual(response.context['results_page'].paginator.count, 5)
+
+    def test_search_list_is_staff_only(self):
+        for user in (None, User.objects.create_user('s000', password='pass')):
+            if user is not None:
+                self.client.force_login(user)
+            response = self.client.get(reverse('student-report-search'), {'student_id_query': 'S'})
+            self.assertNotIn('results_page', response.context)
+            self.assertEqual(response.context['error_message'], "Student ID 'S' not found.")
+            self.assertNotContains(response, 'Student 1')
+
+
+class LecturerWorkloadTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.lecturer = Lecturer.objects.create(name='Dr. Silva', email='silva@uni.lk')
+        Lecturer.objects.create(name='Dr. Idle', email='idle@uni.lk')
+        Course.objects.filter(pk__in=[self.course.pk, self.other_course.pk]).update(lecturer=self.lecturer)
+        recompute_final_marks()
+
+    def test_workload_totals(self):
+        silva, idle = lecturer_workload().filter(name__in=['Dr. Silva', 'Dr. Idle']).order_by('-name')
+        self.assertEqual(
+            (silva.course_count, silva.total_credits, silva.enrolled_students, silva.pending_grades), (2, 5, 5, 1)
+        )
+        self.assertEqual((idle.course_count, idle.total_credits, idle.enrolled_students), (0, 0, 0))
+
+        silva = lecturer_workload(semester=2).get(pk=self.lecturer.pk)
+        self.assertEqual((silva.course_count, silva.total_credits, silva.pending_grades), (1, 2, 0))
+
+    def test_single_query_per_request(self):
+        self.client.get(reverse('lecturer-report-search'))  # dropdown cache
+        # workload + catalogue version (dropdown cache key)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('lecturer-report-search'), {'semester': 1})
+
+
+@override_settings(METRICS_SAMPLE_RATE=1.0, METRICS_MAX_QUERIES=2)
+class RequestMetricsTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        metrics.clear()
+
+    def test_records_queries_and_percentiles(self):
+        with self.assertLogs('core.metrics', 'WARNING') as logs:
+            self.client.get(reverse('student-report-search'), {'student_id_query': 'S001'})
+        self.assertIn('"view": "student-report-search"', logs.output[0])
+        self.assertIn('"queries": 3', logs.output[0])
+
+        self.client.force_login(User.objects.get(username='admin'))
+        data = self.client.get(reverse('request-metrics')).json()['views']
+        self.assertEqual(data['student-report-search']['requests'], 1)
+        self.assertEqual(data['student-report-search']['queries']['max'], 3)
+        self.assertGreater(data['student-report-search']['template_ms_mean'], 0)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        response = self.client.get(reverse('request-metrics'))
+        self.assertEqual(response.status_code, 302)
+
+
+class RecomputeQueueTests(GradingTestMixin, TestCase):
+
+    def test_trigger_only_enqueues_and_collapses_duplicates(self):
+        student = self.students[0]
+        student.user = User.objects.create_user('s000', password='pass')
+        student.save()
+        self.client.force_login(student.user)
+
+        self.client.get(reverse('trigger-calculations'))
+        self.client.get(reverse('trigger-calculations'))
+        self.assertEqual(RecomputeJob.objects.filter(status='Pending').count(), 2)
+        self.assertFalse(Enrollment.objects.filter(final_grade__isnull=False).exists())
+
+        response = self.client.get(reverse('student-dashboard'))
+        self.assertEqual(response.context['job_status'], {'Pending': 2})
+
+        self.assertEqual(work(once=True), 2)
+        self.assertFalse(RecomputeJob.objects.exists())
+        self.assertEqual(Enrollment.objects.get(student=student, course=self.course).final_grade, 'A')
+
+    def test_dashboard_sees_results_from_a_worker_with_its_own_caches(self):
+        student = self.students[0]
+        student.user = User.objects.create_user('s000', password='pass')
+        student.save()
+        self.client.force_login(student.user)
+        self.assertNotContains(self.client.get(reverse('student-dashboard')), '84.99')
+        self.client.get(reverse('trigger-calculations'))
+
+        # වෙනම process එකක worker එකක් - web worker ගේ LocMem caches එයට නොපෙනේ
+        private = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker-process'}
+        with override_settings(CACHES={'default': private, 'pages': private}):
+            work(once=True)
+        self.assertContains(self.client.get(reverse('student-dashboard')), '84.99')
+
+    def test_mark_and_assessment_saves_enqueue_affected_enrollments(self):
+        mark = StudentMark.objects.filter(student=self.students[1], assessment__course=self.course).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            mark.marks = Decimal('10')
+            mark.save()
+        self.assertEqual(
+            list(RecomputeJob.objects.values_list('enrollment__student', 'enrollment__course')),
+            [(self.students[1].pk, self.course.pk)],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Assessment.objects.filter(course=self.other_course).first().save()
+        self.assertEqual(RecomputeJob.objects.count(), 6)
+
+    def test_failing_enrollment_is_isolated_and_retried_then_failed(self):
+        bad = Enrollment.objects.get(student=self.students[2], course=self.course)
+        enqueue_enrollments(Enrollment.objects.all())
+
+        def recompute(enrollments):
+            if bad.pk in {e.pk for e in enrollments}:
+                raise ValueError("bad enrollment")
+            return recompute_final_marks(enrollments)
+
+        with mock.patch('core.jobs.recompute_final_marks', side_effect=recompute), self.assertLogs('core.jobs'):
+            # අනෙක් jobs සාර්ථකයි; දෝෂ සහිත එක RETRY_DELAY තෙක් Pending
+            self.assertEqual(work(once=True), 9)
+            job = RecomputeJob.objects.get()
+            self.assertEqual((job.enrollment_id, job.status, job.attempts), (bad.pk, 'Pending', 1))
+            self.assertIn('bad enrollment', job.error)
+
+            with mock.patch('core.jobs.RETRY_DELAY', 0):
+                self.assertEqual(work(once=True), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('Failed', MAX_ATTEMPTS))
+
+
+class DashboardApiTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        recompute_final_marks()
+        self.student = self.students[0]
+        self.student.user = User.objects.create_user('s000', password='pass')
+        self.student.save()
+        self.client.force_login(self.student.user)
+
+    def test_returns_dashboard_data(self):
+        response = self.client.get(reverse('api-student-dashboard'))
+        data = response.json()
+        self.assertEqual([e['course'] for e in data['enrollments']], ['CS101', 'CS201'])
+        self.assertEqual(data['gpa']['cgpa'], str(self.student.calculate_cgpa()))
+        self.assertEqual((data['attendance'], data['payments']), ([], []))
+
+    def test_etag_returns_304_until_student_data_changes(self):
+        etag = self.client.get(reverse('api-student-dashboard'))['ETag']
+
+        # user සහ user -> student (data version සමඟ) පමණි - session cache එකෙන්, student data ස්පර්ශ නොකරයි
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('api-student-dashboard'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Attendance.objects.create(student=self.student, course=self.course, date='2025-01-06', status='P')
+        response = self.client.get(reverse('api-student-dashboard'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['attendance'][0]['percentage'], 100.0)
+
+    def test_version_is_shared_through_the_database(self):
+        etag = self.client.get(reverse('api-student-dashboard'))['ETag']
+        stale = Student.objects.get(pk=self.student.pk)
+
+        # වෙනත් process එකක bump එකක් (signals නැති update) - local cache එක හිස් කළද version නොනැසේ
+        bump_student_versions([self.student.pk])
+        cache.clear()
+        self.assertNotEqual(self.client.get(reverse('api-student-dashboard'))['ETag'], etag)
+
+        # පරණ instance එකක් save කිරීම version එක පසුපසට නොගෙනයයි
+        stale.name = 'Renamed'
+        stale.save()
+        response = self.client.get(reverse('api-student-dashboard'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_relinked_user_loses_access(self):
+        self.client.get(reverse('api-student-dashboard'))
+        self.student.user = None
+        self.student.save()
+        self.assertEqual(self.client.get(reverse('api-student-dashboard')).status_code, 404)
+
+
+class FeeLedgerTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        self.student = self.students[0]
+        self.today = datetime.date(2026, 3, 1)
+        self.fee = Payment.objects.create(
+            student=self.student, description='Exam Fee', amount=Decimal('1500'), due_date=datetime.date(2026, 2, 1),
+        )
+        Payment.objects.create(
+            student=self.student, description='Library Fine', amount=Decimal('250.50'), due_date=datetime.date(2026, 4, 1),
+        )
+        Payment.objects.create(
+            student=self.students[1], description='Exam Fee', amount=Decimal('1500'), status='Paid',
+            due_date=datetime.date(2026, 1, 1),
+        )
+
+    def test_balance_follows_payment_changes(self):
+        balance = StudentBalance.objects.get(student=self.student)
+        self.assertEqual((balance.outstanding, balance.pending_count), (Decimal('1750.50'), 2))
+        self.assertEqual(balance.next_due_date, datetime.date(2026, 2, 1))
+        self.assertEqual(outstanding_balance(self.students[1]), Decimal('0.00'))
+
+        self.fee.status = 'Paid'
+        self.fee.save()
+        self.assertEqual(outstanding_balance(self.student), Decimal('250.50'))
+
+        Payment.objects.filter(student=self.student).delete()
+        self.assertFalse(StudentBalance.objects.filter(student=self.student).exists())
+
+    def test_overdue_export_streams_pending_past_due_only(self):
+        rows = list(overdue_csv_rows(self.today))
+        self.assertEqual(rows, [
+            'student_id,name,description,amount,due_date,days_overdue\r\n',
+            'S000,Student 0,Exam Fee,1500.00,2026-02-01,28\r\n',
+        ])
+
+    def test_export_view_is_staff_only_streaming(self):
+        self.assertEqual(self.client.get(reverse('overdue-payments-export')).status_code, 302)
+        self.client.force_login(User.objects.get(username='admin'))
+        response = self.client.get(reverse('overdue-payments-export'))
+        self.assertTrue(response.streaming)
+        self.assertIn(b'S000,Student 0,Exam Fee', b''.join(response.streaming_content))
+
+
+class FeeRunTests(GradingTestMixin, TestCase):
+
+    def test_rerun_is_idempotent(self):
+        fee_run = get_fee_run('exam-fee-sem1', description='Exam Fee - Sem 1', amount=Decimal('1500.00'), semester=1)
+        report = run_fees(fee_run, batch_size=2)
+        self.assertEqual((report.targeted, report.created), (5, 5))
+        self.assertEqual(outstanding_balance(self.students[0]), Decimal('1500.00'))
+
+        Student.objects.create(student_id='S999', name='Late Student', email='late@uni.lk').enrollment_set.create(
+            course=self.course,
+        )
+        report = run_fees(get_fee_run('exam-fee-sem1', amount=Decimal('1500.00')))
+        self.assertEqual((report.created, report.skipped), (1, 5))
+        self.assertEqual(Payment.objects.filter(fee_run=fee_run).count(), 6)
+        self.assertEqual(FeeRun.objects.get(pk=fee_run.pk).payments_created, 6)
+
+    def test_changed_rule_is_rejected(self):
+        get_fee_run('library', description='Library Fee', amount=Decimal('100.00'))
+        with self.assertRaises(FeeRunError):
+            get_fee_run('library', amount=Decimal('200.00'))
+
+    def test_command_targets_course_and_reports_throughput(self):
+        out = StringIO()
+        call_command('fee_run', 'lab-fee', '--description', 'Lab Fee', '--amount', '750',
+                     '--course', 'CS201', '--due-date', '2026-03-01', stdout=out)
+        self.assertIn('5 payments created, 0 already present', out.getvalue())
+        self.assertIn('students/s', out.getvalue())
+        self.assertEqual(
+            set(Payment.objects.values_list('description', 'amount', 'due_date')),
+            {('Lab Fee', Decimal('750.00'), datetime.date(2026, 3, 1))},
+        )
+
+
+class ColumnarSnapshotTests(GradingTestMixin, TestCase):
+
+    def test_snapshot_round_trips_through_mmap(self):
+        recompute_final_marks()
+        Attendance.objects.create(student=self.students[0], course=self.course, date='2025-01-06', status='P')
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('export_snapshot', directory, '--semester', '1', '--chunk-size', '2', stdout=StringIO())
+            manifest = read_manifest(directory)
+            self.assertEqual({t: m['rows'] for t, m in manifest['tables'].items()},
+                             {'enrollment': 5, 'studentmark': 9, 'attendance': 1})
+
+            columns = read_table(directory, 'enrollment')
+            grades = manifest['tables']['enrollment']['columns']['final_grade']['categories']
+            expected = Enrollment.objects.filter(course=self.course).order_by('pk')
+            self.assertEqual([grades[code] for code in columns['final_grade']], [e.final_grade for e in expected])
+            self.assertEqual(
+                [None if math.isnan(mark) else mark for mark in columns['final_mark']],
+                [None if e.final_mark is None else float(e.final_mark) for e in expected],
+            )
+
+            attendance = read_table(directory, 'attendance')
+            self.assertEqual(datetime.date(1970, 1, 1) + datetime.timedelta(days=attendance['date'][0]),
+                             datetime.date(2025, 1, 6))
+            del columns, attendance # mmap වසා දැමීම (Windows සඳහා)
+
+
+class SyntheticDataTests(TestCase):
+
+    def test_generator_is_seeded_and_grades_results(self):
+        counts = synthetic.generate(students=20, courses=10, seed=7, prefix='T')
+        self.assertEqual((counts['Student'], counts['Course'], counts['Enrollment']), (20, 10, 120))
+        self.assertEqual(counts['Attendance'], 1200)
+        marks = list(StudentMark.objects.order_by('pk').values_list('marks', flat=True))
+        self.assertFalse(Enrollment.objects.filter(final_grade__isnull=True).exists())
+
+        StudentMark.objects.all().delete()
+        Student.objects.all().delete()
+        Course.objects.all().delete()
+        Lecturer.objects.all().delete()
+        synthetic.generate(students=20, courses=10, seed=7, prefix='T')
+        self.assertEqual(list(StudentMark.objects.order_by('pk').values_list('marks', flat=True)), marks)
+
+    def test_suite_reports_json_and_rolls_back(self):
+        cache.set('outside-benchmark', 1)
+        caches['pages'].set('outside-benchmark', 1)
+        results = benchmarks.run_suite(sizes=[20], repeat=2, only=['calculate_cgpa', 'dashboard (cached)'])
+        # Suite එකේ caches පමණක් clear වේ
+        self.assertEqual((cache.get('outside-benchmark'), caches['pages'].get('outside-benchmark')), (1, 1))
+        cases = results['sizes']['20']['cases']
+        self.assertEqual(set(cases), {'Student.calculate_cgpa', 'view:student_dashboard (cached)'})
+        self.assertEqual(cases['view:student_dashboard (cached)']['queries'], 2)
+        self.assertEqual(set(cases['Student.calculate_cgpa']['ms']), {'p50', 'p95', 'p99', 'mean'})
+        json.dumps(results)
+        self.assertFalse(Student.objects.exists())
+
+        baseline = json.loads(json.dumps(results))
+        baseline['sizes']['20']['cases']['Student.calculate_cgpa']['queries'] -= 1
+        self.assertEqual(benchmarks.compare(baseline, results)[0][:3], ('20', 'Student.calculate_cgpa', 'queries'))
+
+
+class LargeTableAdminTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.get(username='admin'))
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        urls = ['admin:core_enrollment_changelist', 'admin:core_studentmark_changelist', 'admin:core_attendance_changelist']
+        active_scale() # grade filter විකල්ප - process එකේ cache කළ පරිමාණයෙන්
+        for student in self.students:
+            Attendance.objects.create(student=student, course=self.course, date='2025-01-06', status='P')
+        before = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as captured:
+                self.client.get(reverse(url))
+            before[url] = len(captured)
+
+        extra = Student.objects.create(student_id='S100', name='Extra', email='extra@uni.lk')
+        Enrollment.objects.create(student=extra, course=self.course)
+        Attendance.objects.create(student=extra, course=self.course, date='2025-01-06', status='A')
+        for url in urls:
+            with self.assertNumQueries(before[url]):
+                self.client.get(reverse(url))
+
+    def test_paginator_count_is_bounded(self):
+        with mock.patch.object(core_admin, 'EXACT_COUNT_LIMIT', 3):
+            paginator = core_admin.EstimatedCountPaginator(StudentMark.objects.order_by('pk'), 2)
+            self.assertEqual(paginator.count, 4) # 14 පේළි, නමුත් LIMIT 4
+        self.assertEqual(core_admin.EstimatedCountPaginator(StudentMark.objects.order_by('pk'), 2).count, 14)
+
+    def test_grade_filter_does_not_scan_enrollments(self):
+        recompute_final_marks()
+        url = reverse('admin:core_enrollment_changelist')
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertFalse([q for q in captured if 'DISTINCT' in q['sql'] and 'final_grade' in q['sql']])
+        choices = [choice['display'] for choice in response.context['cl'].filter_specs[1].choices(response.context['cl'])]
+        self.assertEqual(choices[:3], ['All', 'A+', 'A'])
+        self.assertEqual(choices[-2:], ['E', 'Pending'])
+        self.assertEqual(self.client.get(url, {'final_grade': 'Pending'}).context['cl'].result_count, 1)
+
+    def test_capped_count_pages_past_the_limit(self):
+        url = reverse('admin:core_studentmark_changelist')
+        with mock.patch.object(core_admin, 'EXACT_COUNT_LIMIT', 3), \
+                mock.patch.object(core_admin.StudentMarkAdmin, 'list_per_page', 2):
+            response = self.client.get(url)
+            self.assertContains(response, '3+ student marks')
+            self.assertContains(response, '?p=2')
+            self.assertNotContains(response, 'Previous')
+
+            # 14 පේළි = පිටු 7 - ගණන (4) අනුව පිටු 2 ක් පමණක් වුවද අවසාන පිටුවට යා හැක
+            response = self.client.get(url, {'p': 7})
+            self.assertEqual(len(response.context['cl'].result_list), 2)
+            self.assertContains(response, '?p=6')
+            self.assertNotContains(response, '?p=8')
+
+            # දත්ත නැති පිටුවක් exists() මගින් ප්‍රතික්ෂේප වේ
+            self.assertRedirects(self.client.get(url, {'p': 8}), f'{url}?e=1', fetch_redirect_response=False)
+
+        response = self.client.get(url)
+        self.assertContains(response, '14 student marks')
+
+    def test_course_code_search(self):
+        response = self.client.get(reverse('admin:core_enrollment_changelist'), {'q': 'CS201'})
+        self.assertEqual(response.context['cl'].result_count, 5)
+
+
+class AdminRecomputeActionTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        recompute_final_marks()
+        self.client.force_login(User.objects.get(username='admin'))
+
+    def test_course_action_regrades_after_weight_change(self):
+        Assessment.objects.filter(course=self.course).update(weight=50) # signals නැත - grades පැරණියි
+        with mock.patch.object(Enrollment, 'save', side_effect=AssertionError("save() per row")):
+            response = self.client.post(reverse('admin:core_course_changelist'), {
+                'action': 'recompute_grades', '_selected_action': [self.course.pk],
+            }, follow=True)
+        messages = [str(m) for m in response.context['messages']]
+        self.assertIn('[1/1] CS101: 5 enrollments, 1 changed.', messages)
+        self.assertIn('Recomputed 5 enrollments in 1 courses (1 grades changed).', messages)
+        enrollment = Enrollment.objects.get(student=self.students[3], course=self.course)
+        self.assertEqual(enrollment.final_mark, Decimal('66.72'))
+
+    def test_enrollment_action_reports_changed_count(self):
+        selected = Enrollment.objects.filter(course=self.other_course)
+        selected.update(final_grade=None)
+        response = self.client.post(reverse('admin:core_enrollment_changelist'), {
+            'action': 'recompute_grades', '_selected_action': list(selected.values_list('pk', flat=True)),
+        }, follow=True)
+        self.assertContains(response, 'Recomputed 5 enrollments (5 grades changed).')
+
+
+class CourseWeightTests(GradingTestMixin, TestCase):
+
+    def test_totals_follow_assessment_changes(self):
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.total_weight, self.course.assessment_count), (100, 2))
+
+        final = Assessment.objects.get(course=self.course, name='Final Exam')
+        final.course = self.other_course
+        final.save()
+        self.assertEqual(
+            list(Course.objects.order_by('code').values_list('total_weight', 'assessment_count')),
+            [(40, 1), (160, 2)],
+        )
+        final.delete()
+        self.assertEqual(Course.objects.get(pk=self.other_course.pk).total_weight, 100)
+
+        Course.objects.update(total_weight=0, assessment_count=0)
+        self.assertEqual(refresh_course_weights(), 2)
+
+    def test_course_not_totalling_100_stays_pending(self):
+        Assessment.objects.create(course=self.other_course, name='Quiz', weight=10)
+        StudentMark.objects.create(student=self.students[0], assessment=Assessment.objects.get(name='Quiz'),
+                                   marks=Decimal('50'))
+        recompute_final_marks()
+        self.assertEqual(
+            set(Enrollment.objects.filter(course=self.other_course).values_list('final_grade', flat=True)),
+            {'Pending'},
+        )
+
+    def test_admin_rejects_weights_over_100(self):
+        form = AssessmentForm({'course': self.course.pk, 'name': 'Quiz', 'weight': 10})
+        self.assertFalse(form.is_valid())
+        self.assertIn('at most 0% can be added', form.errors['weight'][0])
+
+        ca = Assessment.objects.get(course=self.course, name='CA')
+        self.assertTrue(AssessmentForm({'course': self.course.pk, 'name': 'CA', 'weight': 40}, instance=ca).is_valid())
+
+        self.client.force_login(User.objects.get(username='admin'))
+        assessments = list(Assessment.objects.filter(course=self.course).order_by('pk'))
+        data = {
+            'code': 'CS101', 'name': 'Programming', 'credits': 3, 'semester': 1,
+            'assessment_set-TOTAL_FORMS': 3, 'assessment_set-INITIAL_FORMS': 2,
+            'assessment_set-2-name': 'Quiz', 'assessment_set-2-weight': 5,
+        }
+        for n, assessment in enumerate(assessments):
+            data.update({
+                f'assessment_set-{n}-id': assessment.pk, f'assessment_set-{n}-course': self.course.pk,
+                f'assessment_set-{n}-name': assessment.name, f'assessment_set-{n}-weight': assessment.weight,
+            })
+        response = self.client.post(reverse('admin:core_course_change', args=[self.course.pk]), data)
+        self.assertContains(response, 'Assessment weights add up to 105%')
+
+    def test_check_command_flags_courses(self):
+        Assessment.objects.create(course=self.other_course, name='Quiz', weight=10)
+        Course.objects.create(code='CS999', name='Empty', semester=2)
+        out = StringIO()
+        call_command('check_assessment_weights', stdout=out)
+        self.assertIn('CS201: weights add up to 110% (over by 10%)', out.getvalue())
+        self.assertIn('CS999: no assessments', out.getvalue())
+        self.assertNotIn('CS101', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('check_assessment_weights', '--strict', stdout=StringIO())
+
+
+class AttendanceSummaryTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        rng = random.Random(3)
+        start = datetime.date(2025, 1, 6)
+        for day in rng.sample(range(60), 20): # අනුපිළිවෙළින් තොරව - පෙර දින bits shift වේ
+            record_roster(self.course, start + datetime.timedelta(days=day),
+                          {s.student_id: rng.choice('PPPA') for s in self.students})
+        for student in self.students[:2]:
+            Attendance.objects.create(student=student, course=self.other_course, date=start, status='A')
+        self.records = list(Attendance.objects.filter(course=self.course).order_by('pk')[:6])
+
+    def assertParity(self):
+        raw = {
+            (row['student_id'], row['course_id']): (row['present'], row['total'] - row['present'])
+            for row in with_attendance_percentage(
+                Attendance.objects.order_by().values('student_id', 'course_id')
+            )
+        }
+        summaries = {
+            (s.student_id, s.course_id): (s.present_count, s.absent_count) for s in AttendanceSummary.objects.all()
+        }
+        self.assertEqual(summaries, raw)
+        for summary in AttendanceSummary.objects.all():
+            self.assertEqual(summary_days(summary), dict(
+                Attendance.objects.filter(student=summary.student_id, course=summary.course_id)
+                .values_list('date', 'status')
+            ))
+        call_command('rebuild_attendance_summary', '--verify-only', stdout=StringIO())
+
+    def test_parity_with_attendance_table(self):
+        self.assertParity()
+        self.records[0].status = 'A' if self.records[0].status == 'P' else 'P'
+        self.records[0].save()
+        self.records[1].date = datetime.date(2024, 12, 25) # පළමු දිනයට පෙර
+        self.records[1].save()
+        self.records[2].delete()
+        Attendance.objects.filter(course=self.other_course, student=self.students[1]).delete()
+        self.assertParity()
+        self.assertFalse(AttendanceSummary.objects.filter(course=self.other_course, student=self.students[1]).exists())
+
+    def test_deleting_or_moving_the_first_date_keeps_parity(self):
+        first = Attendance.objects.filter(course=self.course).order_by('date').first().date
+        Attendance.objects.filter(course=self.course, date=first).first().delete()
+        for record in Attendance.objects.filter(course=self.course, date=first):
+            record.date = first + datetime.timedelta(days=90) # අවසාන දිනයට පසු
+            record.save()
+        self.assertParity()
+        self.assertTrue(all(
+            summary.first_date > first for summary in AttendanceSummary.objects.filter(course=self.course)
+        ))
+
+    def test_rebuild_matches_incremental(self):
+        before = {s.pk: (bytes(s.present_bits), s.present_count) for s in AttendanceSummary.objects.all()}
+        AttendanceSummary.objects.update(present_count=0)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_attendance_summary', '--verify-only', stdout=StringIO(), stderr=StringIO())
+        call_command('rebuild_attendance_summary', stdout=StringIO())
+        self.assertEqual(
+            sorted(before.values()),
+            sorted((bytes(s.present_bits), s.present_count) for s in AttendanceSummary.objects.all()),
+        )
+
+    def test_at_risk_scan(self):
+        expected = sorted(
+            (s.course.code, s.student.student_id) for s in AttendanceSummary.objects.select_related('course', 'student')
+            if s.present_count * 100 < s.total * 80
+        )
+        self.assertIn(('CS201', 'S000'), expected)
+        with self.assertNumQueries(1):
+            found = [(s.course.code, s.student.student_id) for s in at_risk(80)]
+        self.assertEqual(found, expected)
+
+        out = StringIO()
+        call_command('attendance_at_risk', '--semester', '2', stdout=out, stderr=StringIO())
+        self.assertEqual(out.getvalue().splitlines()[1:], ['CS201,S000,Student 0,0,1,0.0', 'CS201,S001,Student 1,0,1,0.0'])
+
+
+class TranscriptTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        recompute_final_marks()
+
+    def test_loads_chunks_in_constant_queries(self):
+        # students, chunk 1 (enrollments, GPA summaries), chunk 2 (enrollments, GPA summaries)
+        with self.assertNumQueries(5):
+            batches = list(load_transcripts(Student.objects.all(), chunk_size=3))
+        self.assertEqual([len(batch) for batch in batches], [3, 2])
+        transcript = batches[0][1]
+        student = self.students[1]
+        self.assertEqual(transcript['cgpa'], student.calculate_cgpa())
+        self.assertEqual([s['sgpa'] for s in transcript['semesters']],
+                         [student.calculate_sgpa(1), student.calculate_sgpa(2)])
+
+    def test_zip_archive_with_process_pool(self):
+        for processes in (0, 2):
+            with tempfile.TemporaryDirectory() as directory:
+                path = f"{directory}/transcripts.zip"
+                report = write_transcripts(Student.objects.all(), path, processes=processes, chunk_size=2)
+                self.assertEqual(report.students, 5)
+                with zipfile.ZipFile(path) as archive:
+                    self.assertEqual(archive.namelist(), [f'S{i:03}.html' for i in range(5)])
+                    html = archive.read('S001.html').decode()
+                self.assertIn('CS101', html)
+                self.assertIn('A+', html)
+                self.assertIn('CGPA: ' + str(self.students[1].calculate_cgpa()), html)
+
+    def test_admin_action_streams_zip(self):
+        self.client.force_login(User.objects.get(username='admin'))
+        response = self.client.post(reverse('admin:core_student_changelist'), {
+            'action': 'download_transcripts', '_selected_action': [self.students[0].pk, self.students[2].pk],
+        })
+        self.assertTrue(response.streaming)
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(archive.namelist(), ['S000.html', 'S002.html'])
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_STICKY_SECONDS=15)
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        replicas.reset_health()
+        self.addCleanup(replicas.reset_health)
+        self.real_check_replica = replicas.check_replica
+        healthy = mock.patch.object(replicas, 'check_replica', return_value=True)
+        self.check_replica = healthy.start()
+        self.addCleanup(healthy.stop)
+
+    def test_reads_use_replica_only_inside_block(self):
+        self.assertEqual(Student.objects.all().db, 'default')
+        with replicas.use_replica():
+            self.assertEqual(Student.objects.all().db, 'replica_1')
+            self.assertEqual(replicas.cache_timeout(300), 15)
+        self.assertEqual(Student.objects.all().db, 'default')
+        self.assertEqual(replicas.cache_timeout(300), 300)
+
+    def test_write_pins_rest_of_block_to_primary(self):
+        with replicas.use_replica():
+            self.assertEqual(router.db_for_write(Student), 'default')
+            self.assertEqual(Student.objects.all().db, 'default')
+            self.assertEqual(Student.objects.select_for_update().db, 'default')
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        self.check_replica.return_value = False
+        with self.assertLogs('core.replicas', 'WARNING'), replicas.use_replica():
+            self.assertEqual(Student.objects.all().db, 'default')
+        # REPLICA_HEALTH_INTERVAL තුළ නැවත පරීක්ෂා නොකරයි
+        with replicas.use_replica():
+            self.assertEqual(Student.objects.all().db, 'default')
+        self.assertEqual(self.check_replica.call_count, 1)
+
+    def test_missing_replica_alias_is_unhealthy(self):
+        self.assertFalse(self.real_check_replica('replica_1'))
+
+    def test_post_sets_sticky_cookie_and_pins_reads(self):
+        seen = []
+
+        @replicas.replica_reads
+        def view(request):
+            seen.append(Student.objects.all().db)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        factory = RequestFactory()
+        middleware(factory.get('/'))
+        response = middleware(factory.post('/'))
+        self.assertEqual(response.cookies[replicas.STICKY_COOKIE]['max-age'], 15)
+
+        sticky = factory.get('/')
+        sticky.COOKIES[replicas.STICKY_COOKIE] = '1'
+        middleware(sticky)
+        self.assertEqual(seen, ['replica_1', 'default', 'default'])
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        response = ReplicaRoutingMiddleware(lambda request: HttpResponse())(RequestFactory().post('/'))
+        self.assertNotIn(replicas.STICKY_COOKIE, response.cookies)
+        with replicas.use_replica():
+            self.assertEqual(Student.objects.all().db, 'default')
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], METRICS_SAMPLE_RATE=1.0)
+class ReplicaViewTests(TransactionTestCase):
+    """
+    'replica_1' = default test DB එකේ MIRROR එකක් (commit කළ දත්ත පෙනේ - TransactionTestCase).
+    Test runner එක databases පරීක්ෂා කළ පසු (setUpClass) alias එක සහ databases එක් කරයි.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        default = connections['default'].settings_dict
+        connections.settings['replica_1'] = {**default, 'TEST': {**default['TEST'], 'MIRROR': 'default'}}
+        cls.databases = {'default', 'replica_1'}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica_1'].close()
+        del connections['replica_1']
+        del connections.settings['replica_1']
+        super().tearDownClass()
+
+    def setUp(self):
+        replicas.reset_health()
+        self.addCleanup(replicas.reset_health)
+        metrics.clear()
+        self.addCleanup(metrics.clear)
+        Student.objects.create(student_id='S001', name='Replica Student', email='s1@uni.lk')
+
+    def test_report_view_reads_from_replica_and_counts_its_queries(self):
+        with CaptureQueriesContext(connections['replica_1']) as replica, \
+                CaptureQueriesContext(connection) as primary:
+            response = self.client.get(reverse('student-report-search'), {'student_id_query': 'S001'})
+        self.assertContains(response, 'Replica Student')
+        self.assertGreater(len(replica), 0)
+        self.assertEqual(len(primary), 0)
+        # RequestMetricsMiddleware - replica එකේ queries ද ගණන් කරයි
+        self.assertEqual(metrics.summary()['student-report-search']['queries']['max'], len(replica))
+
+    def test_post_pins_following_reads_to_primary(self):
+        self.client.post(reverse('student-report-search'))
+        with CaptureQueriesContext(connections['replica_1']) as replica:
+            self.client.get(reverse('student-report-search'), {'student_id_query': 'S001'})
+        self.assertEqual(len(replica), 0)
+
+
+class StudentMiddlewareTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.middleware = StudentMiddleware(lambda request: HttpResponse())
+
+    def resolve(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        self.middleware(request)
+        return request
+
+    def test_resolves_student_version_and_role_in_one_query(self):
+        student = self.students[0]
+        student.user = User.objects.create_user('s000', password='pass')
+        student.save()
+        with self.assertNumQueries(0):
+            request = self.resolve(student.user) # lazy - භාවිතා කරන තුරු query එකක් නැත
+        with self.assertNumQueries(1):
+            link = request.student_link
+            self.assertEqual((link.student_id, link.role), (student.pk, 'student'))
+            self.assertEqual(request.student_link.version, link.version) # request එකකට එක් වරක් පමණි
+
+        bump_student_versions([student.pk])
+        self.assertEqual(self.resolve(student.user).student_link.version, link.version + 1)
+
+    def test_async_lookup(self):
+        student = self.students[0]
+        student.user = User.objects.create_user('s000', password='pass')
+        student.save()
+        request = self.resolve(student.user)
+
+        async def auser():
+            return student.user
+        request.auser = auser
+        link = async_to_sync(request.astudent_link)()
+        self.assertEqual((link.student_id, link.role), (student.pk, 'student'))
+        with self.assertNumQueries(0):
+            self.assertIs(request.student_link.student_id, student.pk)
+
+    def test_link_is_checked_against_the_database(self):
+        admin_user = User.objects.get(username='admin')
+        link = self.resolve(admin_user).student_link
+        self.assertEqual((link.student_id, link.version, link.role), (None, None, 'staff'))
+        self.assertEqual(self.resolve(AnonymousUser()).student_link.role, 'anonymous')
+
+        # වෙනත් process එකක (signals / cache invalidation නැති) වෙනසක් ද වහාම පෙනේ
+        Student.objects.filter(pk=self.students[0].pk).update(user=admin_user)
+        self.assertEqual(self.resolve(admin_user).student_link.student_id, self.students[0].pk)
+
+    def test_relinking_student_takes_effect_immediately(self):
+        first, second = User.objects.create_user('first'), User.objects.create_user('second')
+        student = self.students[0]
+        student.user = first
+        student.save()
+        self.assertEqual(self.resolve(first).student_link.student_id, student.pk)
+        self.assertIsNone(self.resolve(second).student_link.student_id)
+
+        student.user = second
+        student.save()
+        self.assertIsNone(self.resolve(first).student_link.student_id)
+        self.assertEqual(self.resolve(first).student_link.role, 'user')
+        self.assertEqual(self.resolve(second).student_link.student_id, student.pk)
+
+    def test_staff_and_public_pages_skip_student_lookup(self):
+        self.client.force_login(User.objects.get(username='admin'))
+        for url in (reverse('home'), reverse('admin:index')):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertFalse([q for q in queries if 'core_student' in q['sql']], url)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_sessions(self):
+        student = self.students[0]
+        student.user = User.objects.create_user('s000', password='pass')
+        student.save()
+        self.client.force_login(student.user)
+        self.client.get(reverse('trigger-calculations'))
+        # user, user -> student, enrollments, enqueue - session cookie එකේම
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('trigger-calculations'))
+        self.assertRedirects(response, reverse('student-dashboard'), fetch_redirect_response=False)
+
+        self.client.force_login(User.objects.get(username='admin'))
+        self.assertRedirects(self.client.get(reverse('trigger-calculations')), reverse('home'))
+
+
+class CourseStatisticsTests(GradingTestMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        recompute_final_marks()
+
+    def test_statistics_and_ranking_in_database(self):
+        # version එක + ගණනය කිරීමට queries 3
+        with self.assertNumQueries(4):
+            stats = course_statistics(self.course)
+        self.assertEqual((stats['enrolled'], stats['graded'], stats['pending']), (5, 4, 1))
+        marks = [Decimal('85.00'), Decimal('84.99'), Decimal('65.60'), Decimal('35.00')]
+        self.assertEqual([row['final_mark'] for row in stats['ranking']], marks)
+        self.assertEqual([row['student_id'] for row in stats['ranking']], ['S001', 'S000', 'S003', 'S002'])
+        self.assertEqual([row['rank'] for row in stats['ranking']], [1, 2, 3, 4])
+        self.assertEqual([row['percentile'] for row in stats['ranking']], [100.0, 66.7, 33.3, 0.0])
+        self.assertEqual([row['quartile'] for row in stats['ranking']], [1, 2, 3, 4])
+        self.assertEqual(stats['mean'], (sum(marks) / 4).quantize(Decimal('0.01')))
+        self.assertEqual(stats['std_dev'], statistics.pstdev(marks).quantize(Decimal('0.01')))
+        self.assertEqual((stats['min'], stats['max']), (Decimal('35.00'), Decimal('85.00')))
+        self.assertEqual(
+            {row['range']: row['count'] for row in stats['distribution'] if row['count']},
+            {'[30, 40)': 1, '[60, 70)': 1, '[80, 90)': 2},
+        )
+        self.assertEqual(stats['distribution'][-1]['range'], '[90, 100]')
+        self.assertEqual(sum(row['count'] for row in stats['grades']), 4)
+        self.assertEqual(stats['grades'][0]['grade'], 'A+')
+
+        with self.assertNumQueries(1):
+            course_statistics(self.course)
+
+    def test_ties_share_rank(self):
+        stats = course_statistics(self.other_course)
+        self.assertEqual({row['rank'] for row in stats['ranking']}, {1})
+        self.assertEqual([row['quartile'] for row in stats['ranking']], [1, 1, 2, 3, 4])
+        self.assertEqual(stats['std_dev'], Decimal('0.00'))
+
+    def test_cache_cleared_when_enrollments_change(self):
+        self.assertEqual(course_statistics(self.course)['graded'], 4)
+        StudentMark.objects.create(
+            student=self.students[4], assessment=self.course.assessment_set.get(name='Final Exam'), marks=Decimal('90'),
+        )
+        recompute_final_marks(course=self.course)
+        self.assertEqual(course_statistics(self.course)['graded'], 5)
+
+        Enrollment.objects.filter(student=self.students[4], course=self.course).get().delete()
+        self.assertEqual(course_statistics(self.course)['enrolled'], 4)
+
+    def test_version_bumped_by_another_worker(self):
+        # වෙනත් worker එකක වෙනස්කම: මෙම process එකේ cache එක ඉවත් නොවේ, DB version එක පමණක් වැඩි වේ
+        self.assertEqual(course_statistics(self.course)['enrolled'], 5)
+        Enrollment.objects.filter(student=self.students[4], course=self.course)._raw_delete('default')
+        self.assertEqual(course_statistics(self.course)['enrolled'], 5)
+        bump_cache_versions([f"course-statistics:{self.course.pk}"])
+        self.assertEqual(course_statistics(self.course)['enrolled'], 4)
+
+    def test_json_endpoint_and_admin_page(self):
+        url = reverse('api-course-statistics', args=['CS101'])
+        self.assertEqual(self.client.get(url).status_code, 302) # staff පමණි
+
+        self.client.force_login(User.objects.get(username='admin'))
+        data = self.client.get(url).json()
+        self.assertEqual(data['ranking'][0], {
+            'student_id': 'S001', 'name': 'Student 1', 'final_mark': '85.00', 'grade': 'A+',
+            'rank': 1, 'percentile': 100.0, 'quartile': 1,
+        })
+        self.assertEqual(self.client.get(reverse('api-course-statistics', args=['XX999'])).status_code, 404)
+
+        change = self.client.get(reverse('admin:core_course_change', args=[self.course.pk]))
+        self.assertContains(change, reverse('admin:core_course_statistics', args=[self.course.pk]))
+        response = self.client.get(reverse('admin:core_course_statistics', args=[self.course.pk]))
+        self.assertContains(response, 'Class ranking')
+        self.assertContains(response, 'Student 1')
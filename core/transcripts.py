@@ -0,0 +1,182 @@
+import multiprocessing
+import time
+import zipfile
+from collections import defaultdict
+from decimal import Decimal
+
+import django
+from django.db import connection, connections
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .gpa import gpa_from_summaries
+from .models import Enrollment, StudentGPASummary
+
+# -----------------
+# Transcripts (සම්පූර්ණ කණ්ඩායමක් - cohort - සඳහා)
+# -----------------
+# ශිෂ්‍යයන් chunk වශයෙන්: chunk එකකට bulk queries දෙකක් (enrollments + GPA summary),
+# HTML render කිරීම process pool එකක, ප්‍රතිඵල zip එකට එකින් එක ලියයි. Memory
+# භාවිතය chunk_size මගින් සීමා වේ (සම්පූර්ණ cohort එක memory එකේ නොරඳවයි).
+
+DEFAULT_CHUNK_SIZE = 200
+TEMPLATE = 'core/transcript.html'
+
+
+class TranscriptReport:
+    """ Transcript batch එකක ප්‍රතිඵල සහ වේගය (throughput) """
+
+    def __init__(self):
+        self.students = 0
+        self.bytes_written = 0
+        self.seconds = 0.0
+
+    @property
+    def rate(self):
+        return self.students / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.students} transcripts, {self.bytes_written:,} bytes "
+            f"in {self.seconds:.2f}s ({self.rate:,.1f} students/s)"
+        )
+
+
+def _student_chunks(students, chunk_size):
+    chunk = []
+    for student in students.order_by('student_id').values('pk', 'student_id', 'name', 'email').iterator(
+        chunk_size=chunk_size,
+    ):
+        chunk.append(student)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_transcripts(students, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Students queryset එක සඳහා transcript දත්ත (pickle කළ හැකි dicts) chunk වශයෙන්
+    ලබා දෙයි - chunk එකකට queries දෙකකි.
+    """
+    generated_at = timezone.now()
+    for chunk in _student_chunks(students, chunk_size):
+        pks = [student['pk'] for student in chunk]
+
+        courses = defaultdict(lambda: defaultdict(list))
+        for row in (
+            Enrollment.objects.filter(student_id__in=pks)
+            .order_by('course__semester', 'course__code')
+            .values(
+                'student_id', 'course__semester', 'course__code', 'course__name', 'course__credits',
+                'final_mark', 'final_grade', 'grade_point',
+            )
+        ):
+            courses[row['student_id']][row['course__semester']].append({
+                'code': row['course__code'],
+                'name': row['course__name'],
+                'credits': row['course__credits'],
+                'final_mark': row['final_mark'],
+                'final_grade': row['final_grade'] or 'Pending',
+                'grade_point': row['grade_point'],
+            })
+
+        summaries = defaultdict(list)
+        for summary in StudentGPASummary.objects.filter(student_id__in=pks):
+            summaries[summary.student_id].append(summary)
+
+        batch = []
+        for student in chunk:
+            sgpa_by_semester, cgpa = gpa_from_summaries(summaries[student['pk']])
+            by_semester = courses[student['pk']]
+            batch.append({
+                'student': student,
+                'semesters': [
+                    {
+                        'semester': semester,
+                        'courses': by_semester[semester],
+                        'credits': sum(course['credits'] for course in by_semester[semester]),
+                        'sgpa': sgpa_by_semester.get(semester, Decimal('0.00')),
+                    }
+                    for semester in sorted(by_semester)
+                ],
+                'cgpa': cgpa,
+                'total_credits': sum(summary.credits for summary in summaries[student['pk']]),
+                'generated_at': generated_at,
+            })
+        yield batch
+
+
+def render_transcript(transcript):
+    """ (ගොනු නාමය, HTML bytes) - DB query නැත, worker process එකක ධාවනය කළ හැක """
+    html = render_to_string(TEMPLATE, transcript)
+    return f"{transcript['student']['student_id']}.html", html.encode('utf-8')
+
+
+def _init_worker():
+    # spawn start method එකේදී Django සැකසීම (fork නම් දැනටමත් සකසා ඇත). Workers DB භාවිතා නොකරයි.
+    django.setup()
+
+
+def write_transcripts(students, output, processes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Transcripts zip archive එකකට (output = ගොනු path හෝ file object) ලියයි.
+    processes=0 නම් මෙම process එකේම render කරයි (web requests සඳහා).
+    """
+    report = TranscriptReport()
+    started = time.perf_counter()
+    pool = None
+    if processes != 0:
+        if not connection.in_atomic_block:
+            connections.close_all() # fork කිරීමට පෙර - children parent ගේ DB socket එක උරුම නොකර ගැනීමට
+        pool = multiprocessing.Pool(processes, initializer=_init_worker)
+    try:
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for batch in load_transcripts(students, chunk_size=chunk_size):
+                rendered = pool.imap(render_transcript, batch, chunksize=8) if pool else map(render_transcript, batch)
+                for filename, html in rendered:
+                    archive.writestr(filename, html)
+                    report.students += 1
+                    report.bytes_written += len(html)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+class _ZipStream:
+    """ zipfile සඳහා non-seekable ලිවීමේ buffer - ලියූ bytes chunks ලෙස ඉවත් කරයි """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_transcripts(students, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Zip archive එක bytes chunks ලෙස (StreamingHttpResponse සඳහා) - එක් transcript එකකට එක් chunk """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for batch in load_transcripts(students, chunk_size=chunk_size):
+            for filename, html in map(render_transcript, batch):
+                archive.writestr(filename, html)
+                yield stream.drain()
+    yield stream.drain()
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 from django.contrib.auth import views as auth_views
 
 urlpatterns = [
@@ -21,4 +21,21 @@ urlpatterns = [
     path('courses/', views.course_list, name='course-list'),
     path('student_report/', views.student_report_search, name='student-report-search'),
     path('lecturer_report/', views.lecturer_report_search, name='lecturer-report-search'),
+
+    # Attendance Roster (Staff)
+    path('attendance/<str:course_code>/', views.attendance_roster, name='attendance-roster'),
+    path('api/attendance/<str:course_code>/', views.attendance_roster_api, name='api-attendance-roster'),
+    path('api/attendance/<str:course_code>/summary/', views.course_attendance_api, name='api-course-attendance'),
+
+    # Course result statistics & ranking (Staff)
+    path('api/courses/<str:course_code>/statistics/', views.course_statistics_api, name='api-course-statistics'),
+
+    # Overdue payments CSV (Finance / Staff)
+    path('payments/overdue.csv', views.overdue_payments_export, name='overdue-payments-export'),
+
+    # Async JSON API (Mobile app)
+    path('api/dashboard/', api.student_dashboard_api, name='api-student-dashboard'),
+
+    # Request metrics (Staff)
+    path('metrics/', views.request_metrics, name='request-metrics'),
 ]
\ No newline at end of file
@@ -0,0 +1,38 @@
+from django.db.models import F
+
+from .models import CacheVersion, Student
+
+# -----------------
+# Per-student data version
+# -----------------
+# ශිෂ්‍යයෙකුගේ Enrollment / StudentMark / Attendance / Payment දත්ත වෙනස් වන සෑම
+# විටම Student.data_version වැඩි වේ. ETag සහ cache keys සඳහා භාවිතා කරයි -
+# StudentMiddleware එය request.student_link.version ලෙස කියවයි. Version එක DB එකේ ඇති
+# නිසා සියලුම workers / processes එකම අගය දකී (per-process cache එකක නම් එක්
+# process එකක bump එකක් අනෙක් ඒවාට නොපෙනේ). Transaction එක rollback වුවහොත්
+# bump එකද rollback වේ.
+
+
+def bump_student_versions(student_pks):
+    """ ශිෂ්‍යයන්ගේ දත්ත වෙනස් විය - එක් UPDATE query එකකින් version වැඩි කරයි """
+    student_pks = set(student_pks)
+    if student_pks:
+        Student.objects.filter(pk__in=student_pks).update(data_version=F('data_version') + 1)
+
+
+# -----------------
+# Shared cache versions (catalogue, course statistics)
+# -----------------
+
+def cache_version(key):
+    """ key එකේ වත්මන් version එක (DB query එකක්) - පේළියක් නැත්නම් 0 """
+    return CacheVersion.objects.filter(key=key).values_list('version', flat=True).first() or 0
+
+
+def bump_cache_versions(keys):
+    """ Keys වල version වැඩි කරයි (F() update); නොමැති keys version 1 සමඟ සාදයි """
+    keys = set(keys)
+    if not keys:
+        return
+    if CacheVersion.objects.filter(key__in=keys).update(version=F('version') + 1) < len(keys):
+        CacheVersion.objects.bulk_create([CacheVersion(key=key, version=1) for key in keys], ignore_conflicts=True)
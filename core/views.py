@@ -1,9 +1,34 @@
-from django.shortcuts import render, redirect
+import datetime
+import json
+from decimal import Decimal
+
+from django.shortcuts import get_object_or_404, render, redirect
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.http import JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.http import urlencode
+from django.views.decorators.http import require_POST
 from .models import (
     Course, Student, Enrollment, Lecturer, Attendance,
-    Assessment, StudentMark, Payment
+    Assessment, StudentMark, Payment, AttendanceSummary
+)
+from . import metrics, pagecache
+from .attendance import (
+    course_attendance_percentages, record_roster, student_attendance_percentages
 )
+from .catalogue import CACHE_TIMEOUT, catalogue_page, fragment_cache_key
+from .gpa import summary_gpa
+from .jobs import enqueue_enrollments, job_status
+from .ledger import outstanding_balance, overdue_csv_rows
+from .replicas import cache_timeout, replica_reads
+from .reports import lecturer_choices, lecturer_workload
+from .results import CACHE_TIMEOUT as STATISTICS_CACHE_TIMEOUT, course_statistics
+from .search import PAGE_SIZE as SEARCH_PAGE_SIZE, search_students, student_report
 
 # -----------------
 # Public Views
@@ -11,39 +36,94 @@ from .models import (
 def home_page(request):
     return render(request, 'core/home.html')
 
+def _int_param(request, name):
+    try:
+        return int(request.GET[name])
+    except (KeyError, ValueError):
+        return None
+
+@replica_reads
 def course_list(request):
-    courses = Course.objects.all().order_by('code')
-    context = { 'course_list': courses }
+    params = {
+        'semester': _int_param(request, 'semester'),
+        'credits': _int_param(request, 'credits'),
+        'lecturer_id': _int_param(request, 'lecturer'),
+        'after': request.GET.get('after') or None,
+        'before': request.GET.get('before') or None,
+    }
+    # Render කළ පාඨමාලා වගුව cache එකෙන් (Course / Lecturer save වූ විට අවලංගු වේ)
+    key = fragment_cache_key(**params)
+    fragment = cache.get(key)
+    if fragment is None:
+        courses, previous_cursor, next_cursor = catalogue_page(**params)
+        filters = {name: params[name] for name in ('semester', 'credits', 'lecturer_id')}
+        fragment = render_to_string('core/course_list_fragment.html', {
+            'course_list': courses,
+            'all_lecturers_list': Lecturer.objects.order_by('name').only('id', 'name'),
+            'filters': filters,
+            'filter_query': urlencode({
+                ('lecturer' if name == 'lecturer_id' else name): value
+                for name, value in filters.items() if value is not None
+            }),
+            'previous_cursor': previous_cursor,
+            'next_cursor': next_cursor,
+        })
+        cache.set(key, fragment, cache_timeout(CACHE_TIMEOUT))
+    context = { 'course_list_fragment': fragment }
     return render(request, 'core/course_list.html', context)
 
+@replica_reads
 def student_report_search(request):
-    # (මෙම වාර්තාව තවදුරටත් ක්‍රියා නොකරනු ඇත, 
-    # මක්නිසාද 'Enrollment' හි 'grade' ක්ෂේත්‍රය වෙනස් වී ඇත. 
-    # නමුත් අපි එය දැනට මෙසේම තබමු.)
-    context = {}
-    if request.method == 'GET' and 'student_id_query' in request.GET:
-        query = request.GET.get('student_id_query')
+    """
+    තෝරාගත් ශිෂ්‍යයාගේ වාර්තාව (හරියටම student_id). student_id prefix / නම අනුව සෙවීම
+    (පිටු සහිතව) staff සඳහා පමණි - නැත්නම් ඕනෑම කෙනෙකුට සියලු ශිෂ්‍යයන් ලැයිස්තුගත කළ හැක.
+    """
+    query = request.GET.get('student_id_query', '').strip()
+    selected = request.GET.get('student', '').strip() or query
+    context = { 'query': query }
+
+    if selected:
         try:
-            student = Student.objects.get(student_id=query)
-            enrollments = Enrollment.objects.filter(student=student)
+            # හරියටම ගැලපෙන student_id එකක් නම්, වාර්තාවම පෙන්වීම
+            student = student_report(selected)
+            sgpa_by_semester, cgpa = summary_gpa(student)
             context['student_found'] = student
-            context['enrollments_list'] = enrollments
+            context['enrollments_list'] = student.enrollment_set.all()
+            context['semester_gpa_list'] = sorted(sgpa_by_semester.items())
+            context['cgpa'] = cgpa
         except Student.DoesNotExist:
-            context['error_message'] = f"Student ID '{query}' not found."
+            if selected != query or not request.user.is_staff:
+                context['error_message'] = f"Student ID '{selected}' not found."
+            else:
+                # නැත්නම් student_id prefix / නම අනුව සෙවීම
+                page = Paginator(search_students(query), SEARCH_PAGE_SIZE).get_page(request.GET.get('page'))
+                if page.paginator.count:
+                    context['results_page'] = page
+                else:
+                    context['error_message'] = f"No students match '{query}'."
     return render(request, 'core/student_report.html', context)
 
+@replica_reads
 def lecturer_report_search(request):
-    all_lecturers = Lecturer.objects.all()
-    context = { 'all_lecturers_list': all_lecturers }
+    """ සියලුම කථිකාචාර්යවරුන්ගේ වැඩ බර (workload) - එක් query එකකින්; සහ තෝරාගත් අයගේ පාඨමාලා """
+    semester = _int_param(request, 'semester')
+    workload = list(lecturer_workload(semester=semester))
+    context = {
+        'all_lecturers_list': lecturer_choices(),
+        'workload_list': workload,
+        'semester': semester,
+    }
     if request.method == 'GET' and 'lecturer_query' in request.GET:
         query_id = request.GET.get('lecturer_query')
         if query_id:
-            try:
-                lecturer = Lecturer.objects.get(id=query_id)
-                courses_taught = Course.objects.filter(lecturer=lecturer)
+            lecturer = next((l for l in workload if str(l.id) == query_id), None)
+            if lecturer is not None:
+                courses_taught = Course.objects.filter(lecturer=lecturer).order_by('code')
+                if semester is not None:
+                    courses_taught = courses_taught.filter(semester=semester)
                 context['lecturer_found'] = lecturer
                 context['courses_taught_list'] = courses_taught
-            except Lecturer.DoesNotExist:
+            else:
                 context['error_message'] = f"Lecturer with ID '{query_id}' not found."
     return render(request, 'core/lecturer_report.html', context)
 
@@ -51,60 +131,198 @@ def lecturer_report_search(request):
 # -----------------
 # Student Dashboard & Calculation Views
 # -----------------
+def _render_dashboard(student_pk):
+    """ Dashboard එකේ ශිෂ්‍ය දත්ත කොටස (fragment) render කිරීම - cache miss එකකදී පමණි """
+    student = Student.objects.get(pk=student_pk)
+
+    # ශිෂ්‍යයා ලියාපදිංචි වූ පාඨමාලා (Enrollments) - Course සමඟ එකම query එකකින්
+    enrollments = list(
+        Enrollment.objects.filter(student=student)
+        .select_related('course')
+        .order_by('course__semester', 'course__code')
+    )
+    
+    # පැමිණීම - පාඨමාලාවට එක් පේළියක් (AttendanceSummary), සියලුම දින නොවේ
+    attendance_summaries = (
+        AttendanceSummary.objects.filter(student=student).select_related('course').order_by('course__code')
+    )
+    
+    
+    payments = Payment.objects.filter(student=student).order_by('status', '-due_date') # Pending ඒවා මුලින් පෙන්වයි
+    outstanding = outstanding_balance(student) # StudentBalance වගුවෙන් - Payments නැවත එකතු නොකරයි
+    
+    # ශිෂ්‍යයාට ඇති සෑම වාරයක් (semester) සඳහාම SGPA, සහ CGPA - GPA summary වගුවෙන්
+    sgpa_by_semester, cgpa = summary_gpa(student)
+    semesters = sorted({e.course.semester for e in enrollments} | set(sgpa_by_semester))
+    semester_gpa_list = [
+        (semester, sgpa_by_semester.get(semester, Decimal('0.00'))) for semester in semesters
+    ]
+    
+    context = {
+        'student': student,
+        'enrollments_list': enrollments,
+        'attendance_list': attendance_summaries,
+        'semester_gpa_list': semester_gpa_list,
+        'cgpa': cgpa,
+        'payment_list': payments,
+        'outstanding': outstanding,
+    }
+    return render_to_string('core/dashboard_fragment.html', context)
+
 @login_required
+@replica_reads
 def student_dashboard(request):
-    try:
-        student = request.user.student
-        
-        # ශිෂ්‍යයා ලියාපදිංචි වූ පාඨමාලා (Enrollments)
-        enrollments = Enrollment.objects.filter(student=student).order_by('course__semester', 'course__code')
-        
-        # පැමිණීමේ වාර්තා (Attendance)
-        attendance_records = Attendance.objects.filter(student=student).order_by('-date')
-        
-        
-        payments = Payment.objects.filter(student=student).order_by('status', '-due_date') # Pending ඒවා මුලින් පෙන්වයි
-        
-        # SGPA සහ CGPA ගණනය කිරීම
-        sgpa_s1 = student.calculate_sgpa(semester=1)
-        sgpa_s2 = student.calculate_sgpa(semester=2) # 2nd Semester එකක් ඇතැයි උපකල්පනය කරමු
-        cgpa = student.calculate_cgpa()
-        
-        context = {
-            'student': student,
-            'enrollments_list': enrollments,
-            'attendance_list': attendance_records,
-            'sgpa_s1': sgpa_s1,
-            'sgpa_s2': sgpa_s2,
-            'cgpa': cgpa,
-            'payment_list': payments,
-        }
-        return render(request, 'core/dashboard.html', context)
-    
-    except Student.DoesNotExist:
-        # Admin කෙනෙක් ලොග් වුවහොත්, ඔහුව මුල් පිටුවට යොමු කිරීම
-        return redirect('home')
-    except AttributeError:
-        # User ගිණුමක් නැති Student කෙනෙක් (මෙය සිදු නොවිය යුතුය)
+    link = request.student_link # StudentMiddleware - pk සහ data version එකම query එකකින්
+    student_pk = link.student_id
+    if student_pk is None:
+        # Admin කෙනෙක් (හෝ Student නොවන User කෙනෙක්) ලොග් වුවහොත්, මුල් පිටුවට යොමු කිරීම
         return redirect('home')
 
+    # ශිෂ්‍යයාගේ data version (DB එකෙන් - සියලු workers එකම අගය) key එකේ ඇති නිසා, දත්ත වෙනස් වූ විට පමණක් නැවත render වේ
+    key = f"dashboard:{student_pk}:{link.version}"
+    # Replica එකකින් render කළ HTML (lag නිසා පරණ විය හැක) කෙටි කාලයකට පමණක් cache කරයි
+    dashboard_fragment = pagecache.get_or_render(
+        key, lambda: _render_dashboard(student_pk), timeout=cache_timeout(settings.PAGE_CACHE_TIMEOUT),
+    )
+
+    # පෝලිමේ ඇති නැවත ගණනය කිරීම් (recompute jobs) - trigger_calculations පසුව පමණක් බලයි
+    status = {}
+    if request.session.get('recompute_requested'):
+        status = job_status(student_pk)
+        if not status.get('Pending') and not status.get('Running'):
+            del request.session['recompute_requested']
+
+    context = {
+        'dashboard_fragment': dashboard_fragment,
+        'job_status': status,
+    }
+    return render(request, 'core/dashboard.html', context)
+
 @login_required
 def trigger_calculations(request):
     """ 
-    ශිෂ්‍යයාගේ සියලුම ලකුණු, ශ්‍රේණි, සහ GP අගයන් 
-    ස්වයංක්‍රීයව ගණනය කිරීම ආරම්භ කරයි (trigger)
+    ශිෂ්‍යයාගේ සියලුම ලකුණු, ශ්‍රේණි, සහ GP අගයන් නැවත ගණනය කිරීම පෝලිමට (queue) එක් කරයි.
+    `recompute_worker` command එක පසුබිමින් ගණනය කරයි - මෙම request එක රැඳී නොසිටී.
+    """
+    student_pk = request.student_link.student_id
+    if student_pk is None:
+        return redirect('home')
+
+    # දැනටමත් පෝලිමේ ඇති Enrollments නැවත එකතු නොවේ (duplicate jobs collapse)
+    enqueue_enrollments(Enrollment.objects.filter(student_id=student_pk))
+    request.session['recompute_requested'] = True
+    messages.info(request, "Your marks are being recalculated. Refresh in a moment to see the results.")
+
+    # නැවත Dashboard එකට යොමු කිරීම
+    return redirect('student-dashboard')
+
+
+# -----------------
+# Attendance Roster (Staff) Views
+# -----------------
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+@staff_member_required
+def attendance_roster(request, course_code):
+    """ එක් පාඨමාලාවක, එක් දිනයක සම්පූර්ණ නාමලේඛනය (roster) එකවර සටහන් කිරීම """
+    course = get_object_or_404(Course, code=course_code)
+    date = _parse_date(request.POST.get('date') or request.GET.get('date')) or datetime.date.today()
+
+    if request.method == 'POST':
+        statuses = {
+            key[len('status_'):]: value
+            for key, value in request.POST.items() if key.startswith('status_')
+        }
+        saved, errors = record_roster(course, date, statuses)
+        messages.success(request, f"Saved attendance for {saved} students on {date}.")
+        for student_id, message in errors.items():
+            messages.error(request, f"{student_id}: {message}")
+        return redirect(f"{request.path}?date={date.isoformat()}")
+
+    enrollments = (
+        Enrollment.objects.filter(course=course)
+        .select_related('student')
+        .order_by('student__student_id')
+    )
+    marked = dict(
+        Attendance.objects.filter(course=course, date=date).values_list('student_id', 'status')
+    )
+    roster = [(e.student, marked.get(e.student_id, 'P')) for e in enrollments]
+    context = {
+        'course': course,
+        'date': date,
+        'roster': roster,
+        'percentages': student_attendance_percentages(course),
+    }
+    return render(request, 'core/attendance_roster.html', context)
+
+@staff_member_required
+@require_POST
+def attendance_roster_api(request, course_code):
+    """
+    JSON: {"date": "2025-01-31", "records": {"S001": "P", "S002": "A", ...}}
     """
+    course = get_object_or_404(Course, code=course_code)
     try:
-        student = request.user.student
-        enrollments = student.enrollment_set.all()
-        
-        # ශිෂ්‍යයා ලියාපදිංචි වී ඇති සෑම පාඨමාලාවක් සඳහාම
-        for enrollment in enrollments:
-            # calculate_final_mark() function එක ක්‍රියාත්මක කිරීම
-            enrollment.calculate_final_mark() 
-            
-        # ගණනය කිරීම් අවසන් වූ පසු, නැවත Dashboard එකට යොමු කිරීම
-        return redirect('student-dashboard')
-        
-    except Student.DoesNotExist:
-        return redirect('home')
\ No newline at end of file
+        payload = json.loads(request.body)
+        date = _parse_date(payload.get('date'))
+        records = payload['records']
+    except (ValueError, KeyError, AttributeError):
+        return JsonResponse({'error': "Expected JSON with 'date' and 'records'."}, status=400)
+    if date is None or not isinstance(records, dict):
+        return JsonResponse({'error': "Invalid 'date' or 'records'."}, status=400)
+
+    saved, errors = record_roster(course, date, records)
+    return JsonResponse({'course': course.code, 'date': date.isoformat(), 'saved': saved, 'errors': errors})
+
+@staff_member_required
+def course_attendance_api(request, course_code):
+    """ පාඨමාලාවේ සමස්ත සහ එක් එක් ශිෂ්‍යයාගේ පැමිණීමේ ප්‍රතිශතය (JSON) """
+    course = get_object_or_404(Course, code=course_code)
+    overall = course_attendance_percentages([course]).first()
+    return JsonResponse({
+        'course': course.code,
+        'percentage': overall['percentage'] if overall else None,
+        'students': [
+            {
+                'student_id': row['student__student_id'],
+                'present': row['present'],
+                'total': row['total'],
+                'percentage': row['percentage'],
+            }
+            for row in student_attendance_percentages(course)
+        ],
+    })
+
+@staff_member_required
+@replica_reads
+def course_statistics_api(request, course_code):
+    """ පාඨමාලාවේ ලකුණු distribution, සාමාන්‍යය / std dev, ශ්‍රේණි histogram සහ class ranking (JSON) """
+    course = get_object_or_404(Course, code=course_code)
+    return JsonResponse(course_statistics(course, timeout=cache_timeout(STATISTICS_CACHE_TIMEOUT)))
+
+
+
+# -----------------
+# Overdue Payments Export (Finance / Staff)
+# -----------------
+@staff_member_required
+def overdue_payments_export(request):
+    """ Overdue (Pending, due_date < අද) ගෙවීම් CSV ලෙස - පේළි stream කරයි, memory එකේ නොරඳවයි """
+    today = datetime.date.today()
+    response = StreamingHttpResponse(overdue_csv_rows(today), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="overdue_payments_{today.isoformat()}.csv"'
+    return response
+
+
+# -----------------
+# Request Metrics (Staff)
+# -----------------
+@staff_member_required
+def request_metrics(request):
+    """ මෙම worker process එකේ sample කළ requests වල percentiles (JSON) """
+    return JsonResponse({'views': metrics.summary(), 'page_cache': pagecache.stats()})
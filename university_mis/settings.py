@@ -47,10 +47,16 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     # WhiteNoise Middleware (CSS සඳහා)
     'whitenoise.middleware.WhiteNoiseMiddleware', 
+    # POST එකකට පසු reads primary DB වෙත (read-your-writes) - core/middleware.py
+    'core.middleware.ReplicaRoutingMiddleware',
+    # Request metrics (query ගණන / කාලය) - core/middleware.py
+    'core.middleware.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # request.student_link (Student pk / data version / role - lazy, DB එකෙන්) - core/middleware.py
+    'core.middleware.StudentMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -88,10 +94,91 @@ DATABASES = {
     'default': dj_database_url.config(
         # db.sqlite3 වෙත නැවත යොමු වීම (fallback)
         default=f'sqlite:///{BASE_DIR / "db.sqlite3"}',
-        conn_max_age=600
+        conn_max_age=600,
+        conn_health_checks=True, # Persistent connection එක නැවත භාවිතයට පෙර පරීක්ෂා කිරීම
     )
 }
 
+# Read replicas (විකල්ප): කොමා වලින් වෙන් කළ URLs -> 'replica_1', 'replica_2', ...
+# Report-heavy views / commands පමණක් මේවායින් කියවයි (core/replicas.py). Local
+# පරීක්ෂාවට: db.sqlite3 පිටපතක් සාදා DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3
+# Tests වලදී replicas 'default' test DB එකම පිළිබිඹු කරයි (MIRROR).
+DATABASE_REPLICAS = []
+for url in filter(None, (u.strip() for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(','))):
+    alias = f'replica_{len(DATABASE_REPLICAS) + 1}'
+    DATABASES[alias] = dj_database_url.parse(
+        url, conn_max_age=600, conn_health_checks=True, test_options={'MIRROR': 'default'},
+    )
+    DATABASE_REPLICAS.append(alias)
+
+# PostgreSQL connection pool (psycopg_pool අවශ්‍යයි): DATABASE_POOL=true නම් persistent
+# connections (CONN_MAX_AGE) වෙනුවට සෑම worker එකකම pool එකක් (Django 5.1+)
+if os.environ.get('DATABASE_POOL', 'False').lower() == 'true':
+    for database in DATABASES.values():
+        if database['ENGINE'] == 'django.db.backends.postgresql':
+            database['CONN_MAX_AGE'] = 0
+            database.setdefault('OPTIONS', {})['pool'] = True
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+# POST එකකට පසු මෙම කාලය (තත්පර) පරිශීලකයාගේ reads primary වෙත - replica lag එකට වඩා වැඩි විය යුතුය
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', '15'))
+# අක්‍රිය (down) replica එකක් නැවත පරීක්ෂා කරන්නේ මෙම කාලයකට (තත්පර) වරක්
+REPLICA_HEALTH_INTERVAL = int(os.environ.get('REPLICA_HEALTH_INTERVAL', '30'))
+
+
+# -----------------------------------------------------------------
+# CACHE (Course catalogue, sessions, rendered pages)
+# -----------------------------------------------------------------
+# පෙරනිමිය: LocMemCache (worker process එකකට). Workers කිහිපයක් අතර
+# invalidation බෙදා ගැනීමට CACHE_DIR ලබා දී file-based cache භාවිතා කරන්න.
+# ශිෂ්‍යයන්ගේ data version (ETags / page keys) සහ catalogue / course statistics
+# versions cache එකේ නොව DB එකේ (Student.data_version, CacheVersion) - එබැවින්
+# worker කිසිවක පරණ version එකක් නොරැඳේ.
+CACHE_DIR = os.environ.get('CACHE_DIR')
+
+# Render කළ පිටු (student_dashboard) සඳහා වෙනම cache එකක් - LRU ලෙස ඉවත් කරයි.
+# Keys වල DB එකෙන් කියවූ data version ඇති නිසා LocMem (worker එකකට) වුවද පරණ පිටු
+# නොපෙන්වයි - PAGE_CACHE_DIR ලබා දුන්නේ නම් workers සියල්ලටම පොදු LRU file cache එකකි
+# (hit ratio සඳහා පමණි).
+PAGE_CACHE_DIR = os.environ.get('PAGE_CACHE_DIR')
+PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', '1000'))
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', '86400'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+    } if CACHE_DIR else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'university-mis',
+    },
+    'pages': {
+        'BACKEND': 'core.pagecache.LRUFileBasedCache' if PAGE_CACHE_DIR
+                   else 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': PAGE_CACHE_DIR or 'university-mis-pages',
+        'TIMEOUT': PAGE_CACHE_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': PAGE_CACHE_MAX_ENTRIES},
+    },
+}
+
+
+# -----------------------------------------------------------------
+# SESSIONS (ප්‍රතිඵල නිකුත් කරන දින - results day - login spikes සඳහා)
+# -----------------------------------------------------------------
+# SESSION_BACKEND:
+#   'cached_db'      (පෙරනිමිය) cache එකෙන් කියවයි, DB එකට ද ලියයි (write-through) -
+#                    cache evict / restart වුවද sessions නැති නොවේ. Workers කිහිපයක්
+#                    අතර hit ratio සඳහා CACHE_DIR (පොදු cache) ලබා දෙන්න.
+#   'signed_cookies' Session දත්ත signed cookie එකේම - DB / cache query නැත
+#                    (SECRET_KEY මත රඳා පවතී; logout කළ session cookie අවලංගු නොවේ).
+#   'db'             සෑම request එකකටම session query එකක් (පැරණි හැසිරීම).
+SESSION_ENGINE = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'db': 'django.contrib.sessions.backends.db',
+}[os.environ.get('SESSION_BACKEND', 'cached_db')]
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -124,4 +211,26 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Login URL (වෙනසක් නැත)
 LOGIN_URL = 'login'
-LOGOUT_REDIRECT_URL = 'home'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'home'
+
+# -----------------------------------------------------------------
+# 5. REQUEST METRICS සහ LOGGING
+# -----------------------------------------------------------------
+# Sample කරන requests ප්‍රමාණය (0.0 - 1.0), worker එකකට ring buffer ප්‍රමාණය,
+# සහ 'core.metrics' log එකට ලියන සීමාවන්
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '0.1'))
+METRICS_BUFFER_SIZE = int(os.environ.get('METRICS_BUFFER_SIZE', '2048'))
+METRICS_SLOW_REQUEST_MS = int(os.environ.get('METRICS_SLOW_REQUEST_MS', '500'))
+METRICS_MAX_QUERIES = int(os.environ.get('METRICS_MAX_QUERIES', '50'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.metrics': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+        'core.replicas': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}